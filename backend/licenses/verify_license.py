@@ -1,6 +1,13 @@
 import base64
+import binascii
+import os
+import threading
 import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Optional
+from cryptography.exceptions import InvalidSignature, UnsupportedAlgorithm
 from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
 from cryptography.hazmat.primitives import serialization
 
@@ -12,6 +19,14 @@ def b64u_decode(value):
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
 
+VALID = "valid"
+MALFORMED = "malformed"
+BAD_SIGNATURE = "bad-signature"
+WRONG_PRODUCT = "wrong-product"
+WRONG_VERSION = "wrong-version"
+EXPIRED = "expired"
+KEY_UNAVAILABLE = "key-unavailable"
+
 
 def resolve_repo_path(path):
     candidate = Path(path)
@@ -20,24 +35,119 @@ def resolve_repo_path(path):
     return candidate
 
 
-def verify_token(pub_path, token, expected_product=None, expected_version=None):
-    try:
-        payload_b64, sig_b64 = token.split(".")
-        payload = b64u_decode(payload_b64)
-        sig = b64u_decode(sig_b64)
+@dataclass(frozen=True)
+class VerificationResult:
+    """Outcome of a license check; truthy only when the token is valid."""
+
+    valid: bool
+    reason: str
+    detail: str = ""
+    identifier: Optional[str] = None
+    product: Optional[str] = None
+    version: Optional[str] = None
+    expiry: Optional[int] = None
+
+    def __bool__(self):
+        return self.valid
+
+
+class LicenseVerifier:
+    """Verifies license tokens with cached public keys and memoized results.
+
+    Public keys are parsed once per file and re-read when the file's mtime or
+    size changes. Valid results are remembered until the token's embedded
+    expiry, or until the key file changes, so repeated checks of the same
+    token on request paths cost one ``stat``.
+    """
+
+    def __init__(self, max_memoized=1024):
+        self.max_memoized = max_memoized
+        self._keys = {}
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _public_key(self, pub_path):
         pub_file = resolve_repo_path(pub_path)
+        stat = os.stat(pub_file)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._keys.get(pub_file)
+        if cached is not None and cached[0] == signature:
+            return signature, cached[1]
         with pub_file.open("rb") as handle:
             pub = serialization.load_pem_public_key(handle.read())
         if not isinstance(pub, Ed25519PublicKey):
             raise TypeError("Expected an Ed25519 public key")
-        pub.verify(sig, payload)
-        identifier, product, version, expiry = payload.decode().split("|")
+        with self._lock:
+            self._keys[pub_file] = (signature, pub)
+        return signature, pub
+
+    def verify(self, pub_path, token, expected_product=None, expected_version=None):
+        try:
+            key_signature, pub = self._public_key(pub_path)
+        except (OSError, ValueError, TypeError, UnsupportedAlgorithm) as exc:
+            return VerificationResult(False, KEY_UNAVAILABLE, str(exc))
+
+        memo_key = (str(resolve_repo_path(pub_path)), token, expected_product, expected_version)
+        now = time.time()
+        with self._lock:
+            memoized = self._memo.get(memo_key)
+            if memoized is not None:
+                if memoized[0] == key_signature and memoized[1].expiry >= now:
+                    self._memo.move_to_end(memo_key)
+                    return memoized[1]
+                del self._memo[memo_key]
+
+        result = self._verify_uncached(pub, token, expected_product, expected_version, now)
+        if result.valid:
+            with self._lock:
+                self._memo[memo_key] = (key_signature, result)
+                while len(self._memo) > self.max_memoized:
+                    self._memo.popitem(last=False)
+        return result
+
+    @staticmethod
+    def _verify_uncached(pub, token, expected_product, expected_version, now):
+        try:
+            payload_b64, sig_b64 = token.split(".")
+            payload = b64u_decode(payload_b64)
+            sig = b64u_decode(sig_b64)
+        except (AttributeError, ValueError, binascii.Error) as exc:
+            return VerificationResult(False, MALFORMED, str(exc))
+        try:
+            pub.verify(sig, payload)
+        except InvalidSignature:
+            return VerificationResult(False, BAD_SIGNATURE, "Signature does not match the public key")
+        try:
+            identifier, product, version, expiry = payload.decode().split("|")
+            expiry = int(expiry)
+        except ValueError as exc:  # includes UnicodeDecodeError
+            return VerificationResult(False, MALFORMED, str(exc))
+        fields = dict(identifier=identifier, product=product, version=version, expiry=expiry)
         if expected_product and product != expected_product:
-            return False
+            return VerificationResult(False, WRONG_PRODUCT, f"Token is for {product}", **fields)
         if expected_version and version != expected_version:
-            return False
-        if int(expiry) < time.time():
-            return False
-        return True
-    except Exception:
-        return False
+            return VerificationResult(False, WRONG_VERSION, f"Token is for version {version}", **fields)
+        if expiry < now:
+            return VerificationResult(False, EXPIRED, f"Token expired at {expiry}", **fields)
+        return VerificationResult(True, VALID, **fields)
+
+    def verify_many(self, pub_path, tokens, expected_product=None, expected_version=None):
+        """Verify ``tokens`` against one key and return results in the same order."""
+        return [self.verify(pub_path, token, expected_product, expected_version) for token in tokens]
+
+    def clear(self):
+        with self._lock:
+            self._keys.clear()
+            self._memo.clear()
+
+
+_DEFAULT_VERIFIER = LicenseVerifier()
+
+
+def default_verifier():
+    return _DEFAULT_VERIFIER
+
+
+def verify_token(pub_path, token, expected_product=None, expected_version=None):
+    return _DEFAULT_VERIFIER.verify(pub_path, token, expected_product, expected_version).valid
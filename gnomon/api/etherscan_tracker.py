@@ -1,20 +1,59 @@
 """
 Etherscan Tracker Integration for GNOMAN
 Tracks Safe transactions and performs lookup queries.
+
+Besides plain transactions (``txlist``) the tracker can ingest internal
+transactions (``txlistinternal``) and ERC-20/721 transfers (``tokentx``,
+``tokennfttx``). Each endpoint keeps its own cursor; one poll fetches them
+concurrently and logs a single block-ordered stream of normalized records.
+Logged records are also written to a SQLite index (:mod:`gnomon.api.tx_index`)
+for lookups by hash, counterparty, block range or method selector.
 """
 
+import heapq
 import json
 import os
+import queue
+import threading
 import time
 from pathlib import Path
+from typing import Iterable, Iterator
+from urllib.parse import urlencode
 
 import requests
 from keyring import get_password
 
+from gnomon.api.tx_index import INDEX_FILENAME, TxIndex, open_index
+from gnomon.core.safe_manager import safe_state_store
+from gnomon.utils import metrics
+from gnomon.utils.fs import atomic_write_json
+from gnomon.utils.poll_schedule import AdaptiveInterval
+from gnomon.utils.rate_limiter import RateLimiter, etherscan_rate_limiter
+from gnomon.utils.segment_log import SegmentedLogStore
+
 SAFE_STATE_PATH = Path("state/gnosis_safe_state.json")
-LOG_PATH = Path("logs/safe_tx_log.json")
+LOG_PATH = Path("logs/safe_tx_log.json")  # legacy single-file log, imported once
+LOG_ROOT = Path("logs/safe_tx_log")
+CURSOR_PATH = Path("state/etherscan_cursors.json")
 ETHERSCAN_BASE_URL = "https://api.etherscan.io/api"
 POLL_INTERVAL = 30  # seconds
+MAX_POLL_INTERVAL = 600  # idle Safes back off up to this many seconds
+MAX_RESULT_WINDOW = 10_000  # Etherscan caps page * offset per query
+DEFAULT_PAGE_SIZE = 1_000
+LATEST_BLOCK = 99_999_999
+ACTIONS = ("txlist", "txlistinternal", "tokentx", "tokennfttx")
+RECORD_KINDS = {"txlist": "normal", "txlistinternal": "internal", "tokentx": "erc20", "tokennfttx": "erc721"}
+
+_CURSOR_LOCK = threading.Lock()
+_PROBE_TURNS: dict[str, int] = {}  # per Safe: which secondary endpoint the next probe checks
+
+_POLL_SECONDS = metrics.histogram(
+    "gnoman_tracker_poll_seconds", "Duration of one incremental Safe poll by outcome", ("outcome",)
+)
+_ROWS_LOGGED = metrics.counter("gnoman_tracker_rows_logged_total", "New transaction rows appended to Safe logs")
+_PROBES = metrics.counter(
+    "gnoman_tracker_probes_total", "One-row change probes run before full polls by result", ("result",)
+)
 
 
 def get_etherscan_api_key() -> str:
@@ -26,46 +65,479 @@ def get_etherscan_api_key() -> str:
 
 
 def get_safe_address() -> str:
-    with open(SAFE_STATE_PATH, encoding="utf-8") as handle:
-        data = json.load(handle)
-    return data["address"]
+    return load_safe_state()["address"]
 
 
-def load_safe_state() -> dict:
-    if not SAFE_STATE_PATH.exists():
+def load_safe_state(address: str | None = None) -> dict:
+    state = safe_state_store(SAFE_STATE_PATH).get(address)
+    if state is None:
         raise RuntimeError("Safe state missing — persistence failure detected.")
-    with open(SAFE_STATE_PATH, encoding="utf-8") as handle:
-        state = json.load(handle)
     if not state.get("owners") or len(state["owners"]) < 3:
         raise ValueError("Safe loaded without correct owner list (3 required).")
     return state
 
 
-def fetch_transactions(address: str, api_key: str | None = None):
-    api_key = api_key or get_etherscan_api_key()
-    url = (
-        f"{ETHERSCAN_BASE_URL}?module=account&action=txlist&address={address}"
-        f"&apikey={api_key}"
-    )
+def record_key(row: dict, action: str = "txlist") -> str:
+    """Identity of ``row`` within its endpoint.
+
+    A transaction hash is unique in ``txlist`` only; internal transactions add
+    the trace id and token transfers the log index. Transfers returned without
+    a log index are told apart by token, sender, recipient and amount instead.
+    """
+    if action == "txlistinternal":
+        return f"{row['hash']}:{row.get('traceId', '')}"
+    if action in ("tokentx", "tokennfttx"):
+        log_index = row.get("logIndex")
+        if log_index not in (None, ""):
+            return f"{row['hash']}:{log_index}"
+        transfer = (row.get(name) or "" for name in ("contractAddress", "from", "to", "tokenID", "value"))
+        return f"{row['hash']}:" + ":".join(str(part).lower() for part in transfer)
+    return row["hash"]
+
+
+def normalize_record(row: dict, action: str = "txlist") -> dict:
+    """Return ``row`` tagged with its ``kind`` and ``key`` and the common fields filled in."""
+    record = dict(row)
+    record["kind"] = RECORD_KINDS[action]
+    record["key"] = record_key(row, action)
+    for name in ("timeStamp", "from", "to"):
+        record.setdefault(name, "")
+    record.setdefault("value", "0")
+    return record
+
+
+def _etherscan_base_url() -> str:
+    return os.getenv("ETHERSCAN_BASE_URL", ETHERSCAN_BASE_URL)
+
+
+def _get_txlist_result(url: str, rate_limiter: RateLimiter | None = None) -> list:
+    if rate_limiter is not None:
+        rate_limiter.acquire()
     response = requests.get(url, timeout=20)
     response.raise_for_status()
     data = response.json()
     if data["status"] != "1":
+        if data.get("message") == "No transactions found":
+            return []
         raise ValueError(f"Etherscan error: {data['message']}")
     return data["result"]
 
 
+def _iter_txlist_result(url: str, rate_limiter: RateLimiter | None = None) -> Iterator[dict]:
+    """Streaming :func:`_get_txlist_result`: rows are decoded one by one as the reply arrives."""
+    if rate_limiter is not None:
+        rate_limiter.acquire()
+    response = requests.get(url, timeout=20, stream=True)
+    try:
+        response.raise_for_status()
+        rows = requests.JsonArrayStream(response.iter_content(), "result")
+        yield from rows
+    finally:
+        response.close()
+    if rows.fields.get("status") != "1" and rows.fields.get("message") != "No transactions found":
+        raise ValueError(f"Etherscan error: {rows.fields.get('message')}")
+
+
+def fetch_transactions(address: str, api_key: str | None = None, start_block: int | None = None):
+    api_key = api_key or get_etherscan_api_key()
+    url = (
+        f"{_etherscan_base_url()}?module=account&action=txlist&address={address}"
+        f"&apikey={api_key}"
+    )
+    if start_block is not None:
+        url += f"&startblock={int(start_block)}&sort=asc"
+    return _get_txlist_result(url)
+
+
+def iter_transactions(
+    address: str,
+    start_block: int = 0,
+    end_block: int = LATEST_BLOCK,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    api_key: str | None = None,
+    rate_limiter: RateLimiter | None = None,
+    action: str = "txlist",
+) -> Iterator[dict]:
+    """Yield ``action`` rows (``txlist`` by default) oldest-first, one page at a time.
+
+    Etherscan refuses ``page * offset`` beyond :data:`MAX_RESULT_WINDOW`. When a
+    window fills up, the remaining range is re-queried from the last block seen,
+    skipping the rows already yielded at that boundary block.
+    """
+
+    api_key = api_key or get_etherscan_api_key()
+    page_size = max(1, min(int(page_size), MAX_RESULT_WINDOW))
+    window_start = int(start_block)
+    boundary_hashes: set[str] = set()
+    while True:
+        last_block = None
+        hashes_at_last: set[str] = set()
+        page = 1
+        while page * page_size <= MAX_RESULT_WINDOW:
+            query = urlencode(
+                {
+                    "module": "account",
+                    "action": action,
+                    "address": address,
+                    "startblock": window_start,
+                    "endblock": int(end_block),
+                    "page": page,
+                    "offset": page_size,
+                    "sort": "asc",
+                    "apikey": api_key,
+                }
+            )
+            received = 0
+            for row in _iter_txlist_result(f"{_etherscan_base_url()}?{query}", rate_limiter):
+                received += 1
+                block = int(row["blockNumber"])
+                key = record_key(row, action)
+                if block == window_start and key in boundary_hashes:
+                    continue
+                if block != last_block:
+                    last_block = block
+                    hashes_at_last = set()
+                hashes_at_last.add(key)
+                yield row
+            if received < page_size:
+                return
+            page += 1
+
+        if last_block is None:
+            return
+        if last_block == window_start:
+            raise RuntimeError(
+                f"Block {window_start} holds more than {MAX_RESULT_WINDOW} {action} rows for {address}"
+            )
+        window_start, boundary_hashes = last_block, hashes_at_last
+
+
+def _load_cursors() -> dict:
+    if not CURSOR_PATH.exists():
+        return {}
+    with open(CURSOR_PATH, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def _cursor_key(address: str, action: str) -> str:
+    # ``txlist`` keeps the bare address so cursors saved before other
+    # endpoints were tracked stay valid.
+    return address.lower() if action == "txlist" else f"{address.lower()}:{action}"
+
+
+def load_cursor(address: str, action: str = "txlist") -> dict:
+    """Return the saved block cursor for ``address`` and ``action`` (empty when never polled).
+
+    ``hashes`` holds the :func:`record_key` of the rows logged at ``lastBlock``.
+    ``polledThrough``, once present, is the highest block any endpoint of the
+    Safe had reached when a full poll last completed; it marks an endpoint
+    that has never returned a row (``lastBlock`` ``None``) as polled.
+    """
+    cursor = _load_cursors().get(_cursor_key(address, action))
+    if not cursor:
+        return {"lastBlock": None, "hashes": []}
+    return cursor
+
+
+def save_cursor(address: str, cursor: dict, action: str = "txlist") -> None:
+    _save_cursors(address, {action: cursor})
+
+
+def _save_cursors(address: str, cursors_by_action: dict[str, dict]) -> None:
+    with _CURSOR_LOCK:
+        cursors = _load_cursors()
+        for action, cursor in cursors_by_action.items():
+            cursors[_cursor_key(address, action)] = cursor
+        atomic_write_json(CURSOR_PATH, cursors)
+
+
+class _CursorFilter:
+    """Streaming filter that drops rows covered by a cursor and advances it."""
+
+    def __init__(self, cursor: dict, action: str = "txlist"):
+        self._action = action
+        self._polled_through = cursor.get("polledThrough")
+        self._last_block = cursor.get("lastBlock")
+        self._seen_at_last = set(cursor.get("hashes") or [])
+        self._top_block = self._last_block
+        self._top_hashes = set(self._seen_at_last)
+
+    def accept(self, tx: dict) -> bool:
+        block = int(tx.get("blockNumber", 0))
+        key = record_key(tx, self._action)
+        if self._last_block is not None:
+            if block < self._last_block:
+                return False
+            if block == self._last_block and key in self._seen_at_last:
+                return False
+        if self._top_block is None or block > self._top_block:
+            self._top_block = block
+            self._top_hashes = set()
+        if block == self._top_block:
+            self._top_hashes.add(key)
+        return True
+
+    @property
+    def top_block(self) -> int | None:
+        return self._top_block
+
+    def cursor(self, polled_through: int | None = None) -> dict:
+        cursor = {"lastBlock": self._top_block, "hashes": sorted(self._top_hashes)}
+        through = max((b for b in (polled_through, self._polled_through) if b is not None), default=None)
+        if through is not None:
+            cursor["polledThrough"] = through
+        return cursor
+
+
+def merge_transactions(txs: Iterable[dict], cursor: dict) -> tuple[list, dict]:
+    """Drop rows already covered by ``cursor`` and return ``(new_rows, next_cursor)``.
+
+    The cursor keeps the last block seen plus the hashes logged at that block,
+    so re-requesting from ``lastBlock`` (inclusive) never duplicates rows.
+    """
+
+    cursor_filter = _CursorFilter(cursor)
+    fresh = [tx for tx in txs if cursor_filter.accept(tx)]
+    if not fresh:
+        return [], cursor
+    return fresh, cursor_filter.cursor()
+
+
+def poll_new_transactions(
+    address: str, api_key: str | None = None, rate_limiter: RateLimiter | None = None
+) -> list:
+    """Fetch only rows newer than the saved cursor and advance it."""
+    cursor = load_cursor(address)
+    rows = iter_transactions(
+        address, start_block=cursor.get("lastBlock") or 0, api_key=api_key, rate_limiter=rate_limiter
+    )
+    fresh, next_cursor = merge_transactions(rows, cursor)
+    if next_cursor is not cursor:
+        save_cursor(address, next_cursor)
+    return fresh
+
+
+def has_new_transactions(
+    address: str,
+    api_key: str | None = None,
+    rate_limiter: RateLimiter | None = None,
+    actions: Iterable[str] = ("txlist",),
+) -> bool:
+    """Cheaply check whether ``address`` has rows newer than its cursors.
+
+    Fetches only the newest row at or after the cursor block, and only from
+    the first endpoint (normally ``txlist``) plus one of the others in turn,
+    so an idle probe costs at most two tiny replies however many endpoints
+    are tracked, and each of them is still looked at every few probes. An
+    endpoint that was polled but never returned a row changes as soon as it
+    returns any. A Safe with an endpoint never polled always reports new rows.
+    """
+
+    actions = tuple(actions)
+    cursors = {action: load_cursor(address, action) for action in actions}
+    if any(cursor.get("lastBlock") is None and cursor.get("polledThrough") is None for cursor in cursors.values()):
+        return True
+    probed = actions[:1]
+    if len(actions) > 1:
+        turn = _PROBE_TURNS.get(address.lower(), 0)
+        _PROBE_TURNS[address.lower()] = turn + 1
+        probed += (actions[1 + turn % (len(actions) - 1)],)
+
+    for action in probed:
+        cursor = cursors[action]
+        last_block = cursor.get("lastBlock")
+        query = urlencode(
+            {
+                "module": "account",
+                "action": action,
+                "address": address,
+                "startblock": int(last_block or 0),
+                "endblock": LATEST_BLOCK,
+                "page": 1,
+                "offset": 1,
+                "sort": "desc",
+                "apikey": api_key or get_etherscan_api_key(),
+            }
+        )
+        rows = _get_txlist_result(f"{_etherscan_base_url()}?{query}", rate_limiter)
+        changed = bool(rows) and (
+            last_block is None
+            or int(rows[0]["blockNumber"]) > int(last_block)
+            or record_key(rows[0], action) not in (cursor.get("hashes") or [])
+        )
+        _PROBES.inc(result="changed" if changed else "unchanged")
+        if changed:
+            return True
+    return False
+
+
+def _prefetch(rows: Iterator[dict], depth: int) -> Iterator[dict]:
+    """Drain ``rows`` on a worker thread, at most ``depth`` rows ahead of the consumer."""
+    buffer: queue.Queue = queue.Queue(maxsize=max(1, depth))
+    stop = threading.Event()
+
+    def _put(item: tuple) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _worker() -> None:
+        try:
+            for row in rows:
+                if not _put(("row", row)):
+                    return
+        except BaseException as exc:  # re-raised on the consumer side
+            _put(("error", exc))
+        else:
+            _put(("done", None))
+
+    threading.Thread(target=_worker, name="etherscan-prefetch", daemon=True).start()
+    try:
+        while True:
+            kind, item = buffer.get()
+            if kind == "done":
+                return
+            if kind == "error":
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+
+def _tagged(action: str, rows: Iterator[dict]) -> Iterator[tuple[str, dict]]:
+    for row in rows:
+        yield action, row
+
+
+def ingest_new_transactions(
+    address: str,
+    store: SegmentedLogStore,
+    api_key: str | None = None,
+    batch_size: int = DEFAULT_PAGE_SIZE,
+    rate_limiter: RateLimiter | None = None,
+    actions: Iterable[str] = ("txlist",),
+    index: TxIndex | None = None,
+) -> int:
+    """Stream rows newer than the cursors into ``store`` and return the count.
+
+    Every endpoint in ``actions`` is paged on its own worker thread (all
+    drawing from ``rate_limiter``) and the streams are merged by block into
+    :func:`normalize_record` records. Rows are appended in batches, added to
+    ``index`` (by default :func:`open_tx_index`), and the cursors are saved
+    after every batch, so memory stays bounded by ``batch_size`` and a crash
+    never skips rows. Once every stream is drained, each cursor records the
+    highest block reached as ``polledThrough`` (see :func:`load_cursor`).
+    """
+
+    started = time.perf_counter()
+    actions = tuple(actions)
+    index = index or open_tx_index()
+    cursors = {action: load_cursor(address, action) for action in actions}
+    filters = {action: _CursorFilter(cursor, action) for action, cursor in cursors.items()}
+    sources = []
+    for action, cursor in cursors.items():
+        rows = iter_transactions(
+            address,
+            start_block=cursor.get("lastBlock") or 0,
+            api_key=api_key,
+            rate_limiter=rate_limiter,
+            action=action,
+        )
+        sources.append(_prefetch(rows, DEFAULT_PAGE_SIZE) if len(actions) > 1 else rows)
+    # heapq.merge is stable, so rows of one block keep the order of ``actions``.
+    merged = heapq.merge(
+        *(_tagged(action, rows) for action, rows in zip(actions, sources)),
+        key=lambda item: int(item[1]["blockNumber"]),
+    )
+    batch: list[dict] = []
+    total = 0
+    try:
+        for action, row in merged:
+            if not filters[action].accept(row):
+                continue
+            batch.append(normalize_record(row, action))
+            if len(batch) >= batch_size:
+                total += store.append(batch)
+                index.add(address, batch)
+                _save_cursors(address, {name: f.cursor() for name, f in filters.items()})
+                batch = []
+        if batch:
+            total += store.append(batch)
+            index.add(address, batch)
+        # Endpoints without rows are marked polled through the highest block any endpoint reached.
+        through = max((f.top_block for f in filters.values() if f.top_block is not None), default=0)
+        _save_cursors(address, {name: f.cursor(polled_through=through) for name, f in filters.items()})
+    except Exception:
+        _POLL_SECONDS.observe(time.perf_counter() - started, outcome="error")
+        _ROWS_LOGGED.inc(total)
+        raise
+    finally:
+        for rows in sources:
+            rows.close()  # stops prefetch workers still paging after an error
+    _POLL_SECONDS.observe(time.perf_counter() - started, outcome="ok")
+    _ROWS_LOGGED.inc(total)
+    return total
+
+
+def open_tx_log(address: str) -> SegmentedLogStore:
+    """Open the append-only transaction log for ``address``."""
+    return SegmentedLogStore(LOG_ROOT / address.lower())
+
+
+def open_tx_index() -> TxIndex:
+    """Open the transaction index kept next to the Safe logs."""
+    return open_index(LOG_ROOT / INDEX_FILENAME)
+
+
+def _legacy_log_owner() -> str | None:
+    """Address of the Safe the legacy log was written for: the persisted primary Safe."""
+    state = safe_state_store(SAFE_STATE_PATH).get()
+    return state["address"].lower() if state else None
+
+
+def _prepare_tx_log(address: str) -> SegmentedLogStore:
+    store = open_tx_log(address)
+    if len(store) == 0:
+        # Without a log the cursors are meaningless; start from genesis again.
+        cursors = {action: {"lastBlock": None, "hashes": []} for action in ACTIONS}
+        if LOG_PATH.exists() and _legacy_log_owner() == address.lower():
+            with open(LOG_PATH, encoding="utf-8") as handle:
+                legacy = [normalize_record(row) for row in json.load(handle)]
+            _, cursors["txlist"] = merge_transactions(legacy, cursors["txlist"])
+            store.append(legacy)
+            open_tx_index().add(address, legacy)
+            # Imported once: later starts (and other Safes) must not pick it up again.
+            LOG_PATH.replace(LOG_PATH.with_name(f"{LOG_PATH.name}.migrated"))
+        _save_cursors(address, cursors)
+    return store
+
+
 def track_safe_transactions():
     safe = load_safe_state()
     api_key = get_etherscan_api_key()
-    LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
     print(f"[EtherscanTracker] Tracking transactions for Safe: {safe['address']}")
+    store = _prepare_tx_log(safe["address"])
+    schedule = AdaptiveInterval(POLL_INTERVAL, MAX_POLL_INTERVAL)
+    rate_limiter = etherscan_rate_limiter()
     while True:
-        txs = fetch_transactions(safe["address"], api_key)
-        with open(LOG_PATH, "w", encoding="utf-8") as handle:
-            json.dump(txs, handle, indent=2)
-        print(f"[EtherscanTracker] {len(txs)} transactions logged.")
-        time.sleep(POLL_INTERVAL)
+        # Once idle, a one-row probe decides whether the full poll is needed.
+        if schedule.idle_streak and not has_new_transactions(
+            safe["address"], api_key, rate_limiter=rate_limiter, actions=ACTIONS
+        ):
+            schedule.record(False)
+            print(f"[EtherscanTracker] No new transactions ({len(store)} total).")
+        else:
+            logged = ingest_new_transactions(
+                safe["address"], store, api_key, rate_limiter=rate_limiter, actions=ACTIONS
+            )
+            schedule.record(logged > 0)
+            print(f"[EtherscanTracker] {logged} new transactions logged ({len(store)} total).")
+        metrics.write_file()
+        time.sleep(schedule.next_delay())
 
 
 if __name__ == "__main__":
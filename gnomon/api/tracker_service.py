@@ -0,0 +1,228 @@
+"""
+Asyncio tracker service polling many Safes from a single process.
+Every poller draws from one shared Etherscan rate budget; idle Safes are
+checked with a one-row probe and polled less often the longer they stay idle.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+
+from gnomon.api import etherscan_tracker
+from gnomon.core.safe_manager import safe_state_store
+from gnomon.utils import metrics
+from gnomon.utils.poll_schedule import DEFAULT_JITTER, AdaptiveInterval
+from gnomon.utils.rate_limiter import RateLimiter, etherscan_rate_limiter
+from gnomon.utils.segment_log import SegmentedLogStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 8
+METRICS_WRITE_INTERVAL = 15.0  # seconds between metrics file snapshots
+
+
+@dataclass
+class TrackedSafe:
+    """Scheduling and bookkeeping for one tracked Safe."""
+
+    address: str
+    poll_interval: float
+    store: SegmentedLogStore
+    schedule: AdaptiveInterval
+    next_due: float = 0.0
+    polls: int = 0
+    probes: int = 0
+    skipped: int = 0
+    logged: int = 0
+    last_error: str | None = field(default=None)
+
+
+class TrackerService:
+    """Poll a set of Safes concurrently on one event loop.
+
+    Blocking HTTP work runs in worker threads; ``rate_limiter`` is shared by
+    all of them (by default the process-wide, optionally cross-process,
+    Etherscan limiter), so the API key's budget holds no matter how many
+    Safes are tracked. Each Safe keeps its own due time and an
+    :class:`AdaptiveInterval` starting at its poll interval: idle polls back
+    it off towards ``max_interval`` and activity resets it. With ``probe``
+    set, a Safe whose last poll found nothing is first checked with
+    :func:`etherscan_tracker.has_new_transactions` and the full poll runs
+    only when that reports a change; active Safes skip the probe since it
+    would usually just add a call. ``actions`` picks the Etherscan endpoints
+    ingested per poll (see :data:`etherscan_tracker.ACTIONS`).
+    """
+
+    def __init__(
+        self,
+        addresses: list[str],
+        *,
+        api_key: str | None = None,
+        poll_interval: float = etherscan_tracker.POLL_INTERVAL,
+        intervals: dict[str, float] | None = None,
+        rate_limiter: RateLimiter | None = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_interval: float = etherscan_tracker.MAX_POLL_INTERVAL,
+        jitter: float = DEFAULT_JITTER,
+        probe: bool = True,
+        rng: random.Random | None = None,
+        actions: tuple[str, ...] = ("txlist",),
+    ):
+        if not addresses:
+            raise ValueError("At least one Safe address is required")
+        self.api_key = api_key or etherscan_tracker.get_etherscan_api_key()
+        self.rate_limiter = rate_limiter or etherscan_rate_limiter()
+        unknown = set(actions) - set(etherscan_tracker.ACTIONS)
+        if unknown:
+            raise ValueError(f"Unsupported Etherscan actions: {sorted(unknown)}")
+        self.actions = tuple(actions)
+        self.probe = probe
+        self._rng = rng or random.Random()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._stopping = asyncio.Event()
+        intervals = {key.lower(): value for key, value in (intervals or {}).items()}
+        self.safes: dict[str, TrackedSafe] = {}
+        for address in addresses:
+            key = address.lower()
+            interval = intervals.get(key, poll_interval)
+            self.safes[key] = TrackedSafe(
+                address=address,
+                poll_interval=interval,
+                store=etherscan_tracker._prepare_tx_log(address),
+                schedule=AdaptiveInterval(interval, max_interval, jitter=jitter),
+            )
+
+    async def poll_safe(self, safe: TrackedSafe) -> int:
+        """Run one incremental poll for ``safe`` and return the rows logged."""
+        async with self._semaphore:
+            started = time.monotonic()
+            try:
+                if self.probe and safe.schedule.idle_streak:
+                    safe.probes += 1
+                    changed = await asyncio.to_thread(
+                        etherscan_tracker.has_new_transactions,
+                        safe.address,
+                        self.api_key,
+                        rate_limiter=self.rate_limiter,
+                        actions=self.actions,
+                    )
+                    if not changed:
+                        safe.skipped += 1
+                        safe.last_error = None
+                        safe.schedule.record(False)
+                        return 0
+                logged = await asyncio.to_thread(
+                    etherscan_tracker.ingest_new_transactions,
+                    safe.address,
+                    safe.store,
+                    self.api_key,
+                    rate_limiter=self.rate_limiter,
+                    actions=self.actions,
+                )
+            except Exception as exc:  # one failing Safe must not stop the others
+                safe.last_error = str(exc)
+                safe.schedule.record(False)
+                logger.warning("Poll failed for Safe %s: %s", safe.address, exc)
+                return 0
+            safe.last_error = None
+            safe.polls += 1
+            safe.logged += logged
+            safe.schedule.record(logged > 0)
+            logger.info(
+                "Safe %s: %s new transactions in %.2fs (%s total)",
+                safe.address,
+                logged,
+                time.monotonic() - started,
+                len(safe.store),
+            )
+            return logged
+
+    async def run_once(self) -> dict[str, int]:
+        """Poll every Safe once, concurrently, and return rows logged per Safe."""
+        safes = list(self.safes.values())
+        results = await asyncio.gather(*(self.poll_safe(safe) for safe in safes))
+        return {safe.address: logged for safe, logged in zip(safes, results)}
+
+    async def _run_safe(self, safe: TrackedSafe, offset: float) -> None:
+        # Stagger first polls so Safes sharing an interval do not fire together.
+        safe.next_due = time.monotonic() + offset
+        while not self._stopping.is_set():
+            delay = safe.next_due - time.monotonic()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=delay)
+                    return
+                except asyncio.TimeoutError:
+                    pass
+            await self.poll_safe(safe)
+            safe.next_due = time.monotonic() + safe.schedule.next_delay(self._rng)
+
+    async def _write_metrics(self, interval: float = METRICS_WRITE_INTERVAL) -> None:
+        # One writer for all Safes; the file I/O runs off the event loop.
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            await asyncio.to_thread(metrics.write_file)
+
+    async def run(self) -> None:
+        """Poll every Safe on its own schedule until :meth:`stop` is called."""
+        self._stopping.clear()
+        safes = list(self.safes.values())
+        await asyncio.gather(
+            self._write_metrics(),
+            *(
+                self._run_safe(safe, index * safe.poll_interval / len(safes))
+                for index, safe in enumerate(safes)
+            ),
+        )
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Track many Safes against one Etherscan budget.")
+    parser.add_argument("addresses", nargs="*", help="Safe addresses (defaults to every persisted Safe)")
+    parser.add_argument("--interval", type=float, default=etherscan_tracker.POLL_INTERVAL)
+    parser.add_argument(
+        "--max-interval",
+        type=float,
+        default=etherscan_tracker.MAX_POLL_INTERVAL,
+        help="Ceiling for the idle backoff in seconds",
+    )
+    parser.add_argument("--no-probe", action="store_true", help="Always run the full poll")
+    parser.add_argument(
+        "--actions",
+        default=",".join(etherscan_tracker.ACTIONS),
+        help="Comma-separated Etherscan endpoints to ingest (default: all)",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="[TrackerService] %(message)s")
+    persisted = safe_state_store(etherscan_tracker.SAFE_STATE_PATH).all()
+    addresses = args.addresses or [state["address"] for state in persisted.values()]
+    if not addresses:
+        raise SystemExit("No Safe addresses given and no persisted Safe state found.")
+
+    async def _main() -> None:
+        service = TrackerService(
+            addresses,
+            poll_interval=args.interval,
+            max_interval=args.max_interval,
+            probe=not args.no_probe,
+            actions=tuple(action.strip() for action in args.actions.split(",") if action.strip()),
+        )
+        await service.run()
+
+    asyncio.run(_main())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+SQLite index over the transaction records logged for tracked Safes.
+
+The segmented logs stay the source of truth; this index holds one row per
+record keyed by ``(safe, kind, key)`` with the full record as JSON, and
+B-tree indexes on hash, sender, recipient, block number and method selector
+so lookups never scan the logs. Inserts are idempotent, so re-ingesting a
+batch after a crash or rebuilding from the logs is always safe.
+
+Query it from the command line::
+
+    python -m gnomon.api.tx_index find --counterparty 0xabc... --limit 20
+    python -m gnomon.api.tx_index find --from-block 19000000 --to-block 19001000
+    python -m gnomon.api.tx_index reindex
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterable
+
+INDEX_FILENAME = "index.sqlite3"
+DEFAULT_LIMIT = 100
+
+_SELECTOR = re.compile(r"0x[0-9a-fA-F]{8}")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    safe TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    block INTEGER NOT NULL,
+    timestamp INTEGER,
+    sender TEXT,
+    recipient TEXT,
+    selector TEXT,
+    contract TEXT,
+    record TEXT NOT NULL,
+    UNIQUE (safe, kind, key)
+);
+CREATE INDEX IF NOT EXISTS records_hash ON records (hash);
+CREATE INDEX IF NOT EXISTS records_sender ON records (sender, block);
+CREATE INDEX IF NOT EXISTS records_recipient ON records (recipient, block);
+CREATE INDEX IF NOT EXISTS records_block ON records (block);
+CREATE INDEX IF NOT EXISTS records_selector ON records (selector, block);
+"""
+
+_INDEXES: dict[Path, "TxIndex"] = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def _lower(value: object) -> str | None:
+    return str(value).lower() if value else None
+
+
+def _selector(record: dict) -> str | None:
+    for candidate in (record.get("methodId"), (record.get("input") or "")[:10]):
+        if candidate and _SELECTOR.fullmatch(candidate):
+            return candidate.lower()
+    return None
+
+
+def _row(safe: str, record: dict) -> tuple:
+    timestamp = record.get("timeStamp")
+    return (
+        safe.lower(),
+        record.get("kind", "normal"),
+        record.get("key", record["hash"]),
+        record["hash"].lower(),
+        int(record["blockNumber"]),
+        int(timestamp) if str(timestamp or "").isdigit() else None,
+        _lower(record.get("from")),
+        _lower(record.get("to")),
+        _selector(record),
+        _lower(record.get("contractAddress")),
+        json.dumps(record, separators=(",", ":")),
+    )
+
+
+class TxIndex:
+    """Indexed lookups over logged Safe transaction records.
+
+    One connection is shared by all threads and serialized with a lock;
+    every query below is answered from an index in well under a millisecond
+    per returned row, whatever the table size.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def add(self, safe: str, records: Iterable[dict]) -> int:
+        """Index ``records`` logged for ``safe``; returns how many were new."""
+        rows = [_row(safe, record) for record in records]
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO records "
+                "(safe, kind, key, hash, block, timestamp, sender, recipient, selector, contract, record) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            return self._conn.total_changes - before
+
+    def rebuild(self, safe: str, records: Iterable[dict], batch_size: int = 10_000) -> int:
+        """Drop the rows of ``safe`` and re-index ``records`` (e.g. its whole log)."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM records WHERE safe = ?", (safe.lower(),))
+        total = 0
+        batch: list[dict] = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                total += self.add(safe, batch)
+                batch = []
+        return total + (self.add(safe, batch) if batch else 0)
+
+    def query(
+        self,
+        *,
+        safe: str | None = None,
+        hash: str | None = None,
+        counterparty: str | None = None,
+        selector: str | None = None,
+        kind: str | None = None,
+        start_block: int | None = None,
+        end_block: int | None = None,
+        limit: int | None = DEFAULT_LIMIT,
+    ) -> list[dict]:
+        """Return matching records, newest block first and in log order within a block.
+
+        ``counterparty`` matches either side of a transfer. Every record
+        carries the tracked ``safe`` it was logged for and its ``kind``/``key``
+        (filled in for rows logged before records were normalized).
+        """
+        clauses: list[str] = []
+        params: list[object] = []
+        for column, value in (("safe", safe), ("hash", hash), ("selector", selector)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value.lower())
+        if kind is not None:
+            clauses.append("kind = ?")
+            params.append(kind)
+        if counterparty is not None:
+            # Two index probes joined by UNION rather than an OR scan.
+            clauses.append(
+                "rowid IN (SELECT rowid FROM records WHERE sender = ? "
+                "UNION SELECT rowid FROM records WHERE recipient = ?)"
+            )
+            params.extend([counterparty.lower()] * 2)
+        if start_block is not None:
+            clauses.append("block >= ?")
+            params.append(int(start_block))
+        if end_block is not None:
+            clauses.append("block <= ?")
+            params.append(int(end_block))
+        sql = "SELECT safe, kind, key, record FROM records"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY block DESC, rowid"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [
+            {"kind": kind, "key": key, **json.loads(record), "safe": safe_address}
+            for safe_address, kind, key, record in rows
+        ]
+
+    def get(self, tx_hash: str) -> list[dict]:
+        """Every record (transaction, internal call, transfer) with ``tx_hash``."""
+        return self.query(hash=tx_hash, limit=None)
+
+    def count(self, safe: str | None = None) -> int:
+        with self._lock:
+            if safe is None:
+                return self._conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+            return self._conn.execute("SELECT COUNT(*) FROM records WHERE safe = ?", (safe.lower(),)).fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def open_index(path: Path) -> TxIndex:
+    """Return the process-wide index stored at ``path``."""
+    resolved = Path(path).resolve()
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(resolved)
+        if index is None:
+            index = _INDEXES[resolved] = TxIndex(resolved)
+        return index
+
+
+def main(argv: list[str] | None = None) -> None:
+    from gnomon.api import etherscan_tracker
+
+    parser = argparse.ArgumentParser(description="Query the index of tracked Safe transactions.")
+    parser.add_argument("--db", type=Path, default=None, help="Index file (default: next to the Safe logs)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    find = commands.add_parser("find", help="Print matching records as JSON lines, newest first")
+    find.add_argument("--safe")
+    find.add_argument("--hash")
+    find.add_argument("--counterparty")
+    find.add_argument("--selector")
+    find.add_argument("--kind", choices=sorted(etherscan_tracker.RECORD_KINDS.values()))
+    find.add_argument("--from-block", type=int, dest="start_block")
+    find.add_argument("--to-block", type=int, dest="end_block")
+    find.add_argument("--limit", type=int, default=DEFAULT_LIMIT)
+    reindex = commands.add_parser("reindex", help="Rebuild the index from the Safe logs")
+    reindex.add_argument("safes", nargs="*", help="Safe addresses (defaults to every logged Safe)")
+    args = parser.parse_args(argv)
+
+    index = open_index(args.db) if args.db else etherscan_tracker.open_tx_index()
+    if args.command == "reindex":
+        safes = args.safes or sorted(
+            path.name for path in etherscan_tracker.LOG_ROOT.glob("0x*") if path.is_dir()
+        )
+        for safe in safes:
+            indexed = index.rebuild(safe, etherscan_tracker.open_tx_log(safe).iter_records())
+            print(f"[TxIndex] {safe}: {indexed} records indexed")
+        return
+    filters = {
+        name: getattr(args, name)
+        for name in ("safe", "hash", "counterparty", "selector", "kind", "start_block", "end_block")
+    }
+    for record in index.query(**filters, limit=args.limit):
+        print(json.dumps(record))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""Offline benchmarks for GNOMAN's resolver, tracker and Safe state paths.
+
+Run ``python -m gnomon.benchmarks`` to execute the suite against a local
+:class:`~gnomon.benchmarks.fake_etherscan.FakeEtherscan`; results are saved
+under ``benchmarks/results/`` and compared with the previous run.
+"""
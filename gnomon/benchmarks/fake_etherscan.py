@@ -0,0 +1,156 @@
+"""Local stand-in for the Etherscan API used by tests and benchmarks.
+
+:class:`FakeEtherscan` serves ``txlist`` over synthetic histories (with
+``startblock``/``endblock``, ``page``/``offset`` and ``sort``), the same for
+``txlistinternal``/``tokentx``/``tokennfttx`` through :attr:`histories`, plus
+``getsourcecode``/``getabi`` for registered contracts. ``latency`` adds a
+fixed delay to every reply, and ``rate_limit`` answers with Etherscan's
+"Max rate limit reached" error once more than that many calls arrive within
+one second. Histories must be ordered by ``blockNumber``.
+"""
+
+from __future__ import annotations
+
+import bisect
+import gzip
+import json
+import socket
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+from urllib.parse import parse_qs, urlparse
+
+RATE_LIMIT_REPLY = {"status": "0", "message": "NOTOK", "result": "Max rate limit reached"}
+
+
+class FakeEtherscan(ThreadingHTTPServer):
+    """Local stand-in for the Etherscan API serving synthetic histories."""
+
+    daemon_threads = True
+
+    def __init__(self, *, latency: float = 0.0, rate_limit: float | None = None):
+        super().__init__(("127.0.0.1", 0), _FakeEtherscanHandler)
+        self.transactions: dict[str, list[dict]] = {}
+        self.histories: dict[str, dict[str, list[dict]]] = {
+            "txlist": self.transactions,
+            "txlistinternal": {},
+            "tokentx": {},
+            "tokennfttx": {},
+        }
+        self.contracts: dict[str, dict] = {}
+        self.requests: list[tuple[float, dict[str, str]]] = []
+        self.connections: set[tuple[str, int]] = set()
+        self.gzip = False
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.rate_limited = 0
+        self._recent: deque[float] = deque()
+        self._blocks: dict[tuple[str, str], tuple[int, list[int]]] = {}
+        self._lock = threading.Lock()
+
+    def handle_error(self, request, client_address):
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return  # the client hung up mid-reply (e.g. a closed streamed response)
+        super().handle_error(request, client_address)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/api"
+
+    def _throttled(self, now: float) -> bool:
+        if self.rate_limit is None:
+            return False
+        with self._lock:
+            while self._recent and self._recent[0] <= now - 1.0:
+                self._recent.popleft()
+            if len(self._recent) >= self.rate_limit:
+                self.rate_limited += 1
+                return True
+            self._recent.append(now)
+            return False
+
+    def _rows_in_range(self, action: str, address: str, start: int, end: int) -> list[dict]:
+        rows = self.histories[action].get(address, [])
+        with self._lock:
+            cached = self._blocks.get((action, address))
+            if cached is None or cached[0] != len(rows):
+                cached = self._blocks[(action, address)] = (len(rows), [int(row["blockNumber"]) for row in rows])
+        blocks = cached[1]
+        return rows[bisect.bisect_left(blocks, start) : bisect.bisect_right(blocks, end)]
+
+    def respond(self, params: dict[str, str]) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            self.requests.append((now, params))
+        if self._throttled(now):
+            return RATE_LIMIT_REPLY
+        action = params.get("action")
+        if action in self.histories:
+            rows = self._rows_in_range(
+                action,
+                params.get("address", "").lower(),
+                int(params.get("startblock", 0)),
+                int(params.get("endblock", 99999999)),
+            )
+            if params.get("sort") == "desc":
+                rows = rows[::-1]
+            offset = int(params.get("offset", 10000))
+            start = (int(params.get("page", 1)) - 1) * offset
+            rows = rows[start : start + offset]
+            if not rows:
+                return {"status": "0", "message": "No transactions found", "result": []}
+            return {"status": "1", "message": "OK", "result": rows}
+        if action in ("getsourcecode", "getabi"):
+            contract = self.contracts.get(params.get("address", "").lower())
+            if contract is None:
+                return {"status": "0", "message": "NOTOK", "result": "Contract source code not verified"}
+            if action == "getabi":
+                return {"status": "1", "message": "OK", "result": json.dumps(contract["abi"])}
+            row = {"ABI": json.dumps(contract["abi"]), "Implementation": contract.get("implementation", "")}
+            return {"status": "1", "message": "OK", "result": [row]}
+        return {"status": "0", "message": "NOTOK", "result": "Unsupported action"}
+
+
+class _FakeEtherscanHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        # Headers and body go out in separate writes; without TCP_NODELAY,
+        # Nagle plus delayed ACKs add ~40ms to every keep-alive reply.
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def do_GET(self):
+        params = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+        self.server.connections.add(self.client_address)
+        body = json.dumps(self.server.respond(params)).encode("utf-8")
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if self.server.gzip and "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        return None
+
+
+@contextmanager
+def serve(**options) -> Iterator[FakeEtherscan]:
+    """Run a :class:`FakeEtherscan` on a background thread for the ``with`` block."""
+    server = FakeEtherscan(**options)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
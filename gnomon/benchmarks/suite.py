@@ -0,0 +1,282 @@
+"""Benchmark scenarios and the result store.
+
+Every scenario runs in a throw-away working directory against a local
+:class:`FakeEtherscan`, so the on-disk caches start empty and no real API is
+touched. Results are written as JSON to ``<output>/<timestamp>.json``; each
+run is compared with the newest earlier file and slowdowns beyond the
+threshold are reported as regressions.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from gnomon.api import etherscan_tracker
+from gnomon.core.safe_manager import SafeStateStore
+from gnomon.utils import abi_resolver
+from gnomon.utils.rate_limiter import RateLimiter
+
+from .fake_etherscan import FakeEtherscan, serve
+
+DEFAULT_OUTPUT = Path("benchmarks/results")
+DEFAULT_REGRESSION_THRESHOLD = 0.20
+
+SCALES: dict[str, dict[str, int]] = {
+    "smoke": {"abis": 5, "fragments": 20, "lookups": 50, "history": 300, "page_size": 100, "safes": 5},
+    "default": {"abis": 100, "fragments": 200, "lookups": 2_000, "history": 20_000, "page_size": 1_000, "safes": 50},
+    "large": {"abis": 500, "fragments": 400, "lookups": 10_000, "history": 100_000, "page_size": 1_000, "safes": 200},
+}
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    operations: int
+    seconds: float
+    extra: dict[str, Any]
+
+    @property
+    def per_op_ms(self) -> float:
+        return 1000 * self.seconds / max(1, self.operations)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "per_op_ms": self.per_op_ms}
+
+
+def _measure(name: str, operations: int, fn: Callable[[], Any], **extra: Any) -> BenchmarkResult:
+    start = time.perf_counter()
+    outcome = fn()
+    elapsed = time.perf_counter() - start
+    if isinstance(outcome, dict):
+        extra.update(outcome)
+    return BenchmarkResult(name, operations, elapsed, extra)
+
+
+@contextmanager
+def _sandbox(server: FakeEtherscan, rate: float) -> Iterator[Path]:
+    """Run in a temp working directory wired to ``server`` with a private rate budget."""
+    previous_cwd = Path.cwd()
+    previous_env = {name: os.environ.get(name) for name in ("ETHERSCAN_BASE_URL", "ETHERSCAN_API_KEY")}
+    previous_limiter = abi_resolver._RATE_LIMITER
+    with tempfile.TemporaryDirectory(prefix="gnoman-bench-") as workdir:
+        os.chdir(workdir)
+        os.environ["ETHERSCAN_BASE_URL"] = server.url
+        os.environ["ETHERSCAN_API_KEY"] = "benchmark"
+        abi_resolver._RATE_LIMITER = RateLimiter(rate=rate, capacity=rate)
+        abi_resolver.cache_clear()
+        try:
+            yield Path(workdir)
+        finally:
+            abi_resolver.cache_clear()
+            abi_resolver._RATE_LIMITER = previous_limiter
+            os.chdir(previous_cwd)
+            for name, value in previous_env.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+
+def _synthetic_abi(index: int, fragments: int) -> list[dict[str, Any]]:
+    return [
+        {
+            "type": "function",
+            "name": f"call{index}_{n}",
+            "stateMutability": "nonpayable",
+            "inputs": [{"name": "to", "type": "address"}, {"name": "amount", "type": "uint256"}],
+            "outputs": [{"name": "", "type": "bool"}],
+        }
+        for n in range(fragments)
+    ]
+
+
+def _resolver_benchmarks(server: FakeEtherscan, scale: dict[str, int], rate: float) -> list[BenchmarkResult]:
+    addresses = [f"0x{0xAB0000 + n:040x}" for n in range(scale["abis"])]
+    for index, address in enumerate(addresses):
+        server.contracts[address] = {"abi": _synthetic_abi(index, scale["fragments"])}
+    results = []
+    with _sandbox(server, rate):
+        half = len(addresses) // 2 or 1
+        results.append(
+            _measure(
+                "resolver.miss",
+                half,
+                lambda: [abi_resolver.resolve_abi_by_address(1, address) for address in addresses[:half]],
+            )
+        )
+        results.append(
+            _measure(
+                "resolver.batch_miss",
+                len(addresses) - half,
+                lambda: {"errors": len(abi_resolver.resolve_abis_many(1, addresses[half:], max_workers=8)[1])},
+            )
+        )
+
+        def _cold_disk():
+            abi_resolver.cache_clear()
+            for address in addresses:
+                abi_resolver.resolve_abi_by_address(1, address)["abi"][0]
+
+        results.append(_measure("resolver.cold_disk", len(addresses), _cold_disk))
+
+        lookups = scale["lookups"]
+        results.append(
+            _measure(
+                "resolver.warm_hit",
+                lookups,
+                lambda: [
+                    abi_resolver.resolve_abi_by_address(1, addresses[n % len(addresses)]) for n in range(lookups)
+                ],
+            )
+        )
+        results.append(
+            _measure(
+                "resolver.selector_lookup",
+                lookups,
+                lambda: [
+                    abi_resolver.lookup_function(1, "0xa9059cbb", addresses[n % len(addresses)])
+                    for n in range(lookups)
+                ],
+            )
+        )
+    return results
+
+
+def _tracker_benchmarks(server: FakeEtherscan, scale: dict[str, int], rate: float) -> list[BenchmarkResult]:
+    safe = "0x" + "5a" * 20
+    history = scale["history"]
+    server.transactions[safe] = [
+        {"hash": f"0x{n:064x}", "blockNumber": str(1_000_000 + n // 3), "from": safe, "to": safe, "value": "0"}
+        for n in range(history)
+    ]
+    limiter = RateLimiter(rate=rate, capacity=rate)
+    results = []
+    with _sandbox(server, rate):
+        store = etherscan_tracker.open_tx_log(safe)
+        before = len(server.requests)
+        results.append(
+            _measure(
+                "tracker.initial_ingest",
+                history,
+                lambda: {
+                    "logged": etherscan_tracker.ingest_new_transactions(
+                        safe, store, "benchmark", batch_size=scale["page_size"], rate_limiter=limiter
+                    )
+                },
+            )
+        )
+        results[-1].extra["requests"] = len(server.requests) - before
+
+        cycles = 10
+        results.append(
+            _measure(
+                "tracker.idle_poll",
+                cycles,
+                lambda: {
+                    "logged": sum(
+                        etherscan_tracker.ingest_new_transactions(safe, store, "benchmark", rate_limiter=limiter)
+                        for _ in range(cycles)
+                    )
+                },
+            )
+        )
+        results.append(_measure("tracker.tail", 100, lambda: [store.tail(50) for _ in range(100)]))
+    return results
+
+
+def _safe_state_benchmarks(scale: dict[str, int]) -> list[BenchmarkResult]:
+    safes = [
+        {"address": f"0x{0x5AFE00 + n:040x}", "owners": [f"0x{n + k:040x}" for k in range(1, 4)], "threshold": 2}
+        for n in range(scale["safes"])
+    ]
+    with tempfile.TemporaryDirectory(prefix="gnoman-bench-") as workdir:
+        store = SafeStateStore(Path(workdir) / "gnosis_safe_state.json")
+        results = [
+            _measure("safe_state.put_changed", len(safes), lambda: {"written": sum(store.put(s) for s in safes)}),
+            _measure("safe_state.put_unchanged", len(safes), lambda: {"written": sum(store.put(s) for s in safes)}),
+            _measure("safe_state.get", 10 * len(safes), lambda: [store.get(s["address"]) for s in safes * 10]),
+        ]
+    return results
+
+
+def run_benchmarks(
+    scale: str = "default",
+    *,
+    latency: float = 0.0,
+    rate_limit: float | None = None,
+) -> list[BenchmarkResult]:
+    """Run every scenario and return the results (nothing is saved)."""
+    sizes = SCALES[scale]
+    client_rate = rate_limit or 1_000.0
+    results = []
+    with serve(latency=latency, rate_limit=rate_limit) as server:
+        results.extend(_resolver_benchmarks(server, sizes, client_rate))
+        results.extend(_tracker_benchmarks(server, sizes, client_rate))
+        throttled = server.rate_limited
+    results.extend(_safe_state_benchmarks(sizes))
+    for result in results:
+        result.extra.setdefault("server_rate_limited", throttled)
+    return results
+
+
+def save_results(results: list[BenchmarkResult], output: Path, config: dict[str, Any]) -> Path:
+    output.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    path = output / f"{stamp}.json"
+    payload = {"createdAt": stamp, "config": config, "results": [result.to_dict() for result in results]}
+    path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    return path
+
+
+def previous_results(output: Path, current: Path, config: dict[str, Any]) -> dict[str, float] | None:
+    """``name -> per_op_ms`` of the newest earlier run with the same configuration."""
+    for path in sorted(output.glob("*.json"), reverse=True):
+        if path == current or path.name >= current.name:
+            continue
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        if payload.get("config") == config:
+            return {entry["name"]: entry["per_op_ms"] for entry in payload["results"]}
+    return None
+
+
+def compare(
+    results: list[BenchmarkResult], baseline: dict[str, float] | None, threshold: float
+) -> list[tuple[str, float, float | None, bool]]:
+    """Return ``(name, per_op_ms, change, regressed)`` rows against ``baseline``."""
+    rows = []
+    for result in results:
+        before = (baseline or {}).get(result.name)
+        change = (result.per_op_ms - before) / before if before else None
+        rows.append((result.name, result.per_op_ms, change, change is not None and change > threshold))
+    return rows
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run GNOMAN's offline benchmarks.")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="default")
+    parser.add_argument("--latency", type=float, default=0.0, help="Fake Etherscan reply delay in seconds")
+    parser.add_argument("--rate-limit", type=float, default=None, help="Fake Etherscan calls per second")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    config = {"scale": args.scale, "latency": args.latency, "rateLimit": args.rate_limit}
+    results = run_benchmarks(args.scale, latency=args.latency, rate_limit=args.rate_limit)
+    path = save_results(results, args.output, config)
+    rows = compare(results, previous_results(args.output, path, config), args.threshold)
+
+    print(f"[Benchmarks] {len(results)} results saved to {path}")
+    for name, per_op_ms, change, regressed in rows:
+        delta = "" if change is None else f"{change:+.1%}"
+        flag = "  REGRESSION" if regressed else ""
+        print(f"  {name:<28} {per_op_ms:>10.4f} ms/op {delta:>8}{flag}")
+    return 1 if any(row[3] for row in rows) else 0
@@ -2,11 +2,130 @@
 
 from __future__ import annotations
 
+import copy
+import hashlib
 import json
+import os
+import threading
 from pathlib import Path
 from typing import Any, Callable, Dict, Iterable, Optional
 
+from gnomon.utils.fs import atomic_write_json, locked_file
+
 SAFE_STATE_PATH = Path("state/gnosis_safe_state.json")
+SAFE_STATE_VERSION = 1
+
+_STORES: Dict[Path, "SafeStateStore"] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def _content_hash(document: Dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(document, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+class SafeStateStore:
+    """Persisted state for many Safes, keyed by lower-case address.
+
+    The file holds ``{"version", "primary", "safes": {address: state}}``;
+    ``primary`` is what callers without an address get back: the first Safe
+    stored, or the last one stored with ``make_primary``. A file in the older single-Safe layout
+    (``{"address", "owners", "threshold"}``) is read as a store with one entry.
+
+    Reads are served from an in-memory copy that is reloaded only when the
+    file's ``stat`` signature changes. Writes go through an atomic replace
+    under a lock file and are skipped when the content hash is unchanged.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._document: Dict[str, Any] = {"version": SAFE_STATE_VERSION, "primary": None, "safes": {}}
+        self._signature: Optional[tuple[int, int, int]] = None
+        self._hash = _content_hash(self._document)
+
+    @staticmethod
+    def _key(address: str) -> str:
+        return str(address).strip().lower()
+
+    def _refresh(self) -> None:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._document = {"version": SAFE_STATE_VERSION, "primary": None, "safes": {}}
+            self._signature = None
+            self._hash = _content_hash(self._document)
+            return
+        signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        if signature == self._signature:
+            return
+        with open(self.path, "r", encoding="utf-8") as handle:
+            data = json.load(handle)
+        if "safes" not in data and data.get("address"):  # single-Safe layout
+            key = self._key(data["address"])
+            data = {"version": SAFE_STATE_VERSION, "primary": key, "safes": {key: data}}
+        self._document = data
+        self._signature = signature
+        self._hash = _content_hash(data)
+
+    def get(self, address: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Return the state for ``address`` (default: the primary Safe), or ``None``."""
+        with self._lock:
+            self._refresh()
+            key = self._key(address) if address else self._document.get("primary")
+            state = self._document["safes"].get(key) if key else None
+            return copy.deepcopy(state)
+
+    def all(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            self._refresh()
+            return copy.deepcopy(self._document["safes"])
+
+    def put(self, state: Dict[str, Any], *, make_primary: bool = False) -> bool:
+        """Store ``state`` under its ``address``.
+
+        Returns ``False`` without touching the file when nothing changed, so
+        refreshing many Safes in turn writes only the ones that did change.
+        """
+        key = self._key(state["address"])
+        with self._lock, locked_file(self.path.with_name(f"{self.path.name}.lock")):
+            self._refresh()
+            document = {
+                "version": SAFE_STATE_VERSION,
+                "primary": key if make_primary else (self._document.get("primary") or key),
+                "safes": {**self._document["safes"], key: copy.deepcopy(state)},
+            }
+            return self._write(document)
+
+    def remove(self, address: str) -> bool:
+        key = self._key(address)
+        with self._lock, locked_file(self.path.with_name(f"{self.path.name}.lock")):
+            self._refresh()
+            safes = {k: v for k, v in self._document["safes"].items() if k != key}
+            primary = self._document.get("primary")
+            if primary == key:
+                primary = next(iter(safes), None)
+            return self._write({"version": SAFE_STATE_VERSION, "primary": primary, "safes": safes})
+
+    def _write(self, document: Dict[str, Any]) -> bool:
+        digest = _content_hash(document)
+        if digest == self._hash:
+            return False
+        atomic_write_json(self.path, document)
+        stat = os.stat(self.path)
+        self._document = document
+        self._signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        self._hash = digest
+        return True
+
+
+def safe_state_store(path: Optional[Path] = None) -> SafeStateStore:
+    """Return the process-wide store for ``path`` (default ``SAFE_STATE_PATH``)."""
+    resolved = Path(path or SAFE_STATE_PATH).resolve()
+    with _STORES_LOCK:
+        store = _STORES.get(resolved)
+        if store is None:
+            store = _STORES[resolved] = SafeStateStore(resolved)
+        return store
 
 
 def _normalize_owners(raw_owners: Any) -> list[str]:
@@ -35,7 +154,7 @@ def _extract_threshold(safe_instance: Any) -> int:
     return int(threshold)
 
 
-def persist_safe_state(safe_instance: Any) -> Dict[str, Any]:
+def persist_safe_state(safe_instance: Any, *, primary: bool = False) -> Dict[str, Any]:
     """Persist the current Safe metadata to disk.
 
     Parameters
@@ -43,6 +162,9 @@ def persist_safe_state(safe_instance: Any) -> Dict[str, Any]:
     safe_instance: Any
         Object exposing ``address``, ``owners`` (method or iterable) and
         ``getThreshold`` or ``threshold``.
+    primary: bool
+        Make this the Safe returned by :func:`load_persisted_safe` without an
+        address.
     """
 
     if safe_instance is None:
@@ -60,19 +182,25 @@ def persist_safe_state(safe_instance: Any) -> Dict[str, Any]:
 
     threshold = _extract_threshold(safe_instance)
 
-    SAFE_STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
     data = {"address": str(address), "owners": owners, "threshold": threshold}
-    with open(SAFE_STATE_PATH, "w", encoding="utf-8") as handle:
-        json.dump(data, handle, indent=2)
-    print("[SafeManager] Safe state persisted successfully.")
+    if safe_state_store().put(data, make_primary=primary):
+        print("[SafeManager] Safe state persisted successfully.")
+    else:
+        print("[SafeManager] Safe state unchanged; nothing written.")
     return data
 
 
-def load_persisted_safe() -> Dict[str, Any]:
-    if not SAFE_STATE_PATH.exists():
-        raise RuntimeError("Safe state file missing.")
-    with open(SAFE_STATE_PATH, "r", encoding="utf-8") as handle:
-        data = json.load(handle)
+def load_persisted_safe(address: Optional[str] = None) -> Dict[str, Any]:
+    """Return the persisted state of the Safe at ``address``.
+
+    Without an address the primary Safe is returned: the first one stored, or
+    the last one persisted with ``primary=True`` (as :meth:`SafeManager.load_safe` does).
+    """
+    data = safe_state_store().get(address)
+    if data is None:
+        if address is None:
+            raise RuntimeError("Safe state file missing.")
+        raise RuntimeError(f"No persisted state for Safe {address}.")
     owners = data.get("owners") or []
     if len(owners) < 3:
         raise ValueError("Invalid Safe state — missing or incomplete owners.")
@@ -97,7 +225,7 @@ class SafeManager:
         """Instantiate a Safe instance and persist its state immediately."""
         safe_instance = self._safe_factory(*factory_args, **factory_kwargs)
         self._safe_instance = safe_instance
-        persist_safe_state(safe_instance)
+        persist_safe_state(safe_instance, primary=True)
         return safe_instance
 
     def refresh_state(self) -> Dict[str, Any]:
@@ -108,4 +236,7 @@ class SafeManager:
 
     def get_cached_state(self) -> Dict[str, Any]:
         """Load Safe metadata from the persisted cache on disk."""
-        return load_persisted_safe()
+        address = getattr(self._safe_instance, "address", None)
+        if callable(address):
+            address = address()
+        return load_persisted_safe(address or None)
@@ -0,0 +1,212 @@
+"""Read Safe configuration straight from a JSON-RPC node.
+
+:class:`SafeReader` fetches owners, threshold, nonce, enabled modules and
+``VERSION`` for many Safes in one HTTP round trip by sending every
+``eth_call`` in a single JSON-RPC batch array. The resulting
+:class:`SafeInfo` objects expose ``address``, ``owners`` and ``threshold``,
+so they can be passed to :func:`persist_safe_state` (or used as the
+factory of a :class:`SafeManager`) as-is.
+"""
+
+from __future__ import annotations
+
+import itertools
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import requests
+
+from .safe_manager import persist_safe_state
+
+SENTINEL_MODULES = "0x0000000000000000000000000000000000000001"
+DEFAULT_MODULE_PAGE_SIZE = 50
+DEFAULT_MAX_BATCH_CALLS = 100  # common per-request cap of hosted RPC providers
+
+# Function selectors of the Safe singleton (keccak256 of the signature, 4 bytes).
+GET_OWNERS = "0xa0e67e2b"  # getOwners()
+GET_THRESHOLD = "0xe75235b8"  # getThreshold()
+NONCE = "0xaffed0e0"  # nonce()
+VERSION = "0xffa1ad74"  # VERSION()
+GET_MODULES_PAGINATED = "0xcc2f8452"  # getModulesPaginated(address,uint256)
+
+_FIELDS = ("owners", "threshold", "nonce", "version", "modules")
+
+
+class SafeReadError(RuntimeError):
+    """A Safe could not be read; ``address`` names the Safe."""
+
+    def __init__(self, message: str, address: Optional[str] = None):
+        super().__init__(message)
+        self.address = address
+
+
+@dataclass
+class SafeInfo:
+    address: str
+    owners: List[str]
+    threshold: int
+    nonce: int
+    modules: List[str] = field(default_factory=list)
+    version: Optional[str] = None
+    block: str = "latest"
+
+
+def _word(data: bytes, offset: int) -> int:
+    return int.from_bytes(data[offset : offset + 32], "big")
+
+
+def _decode_address(data: bytes, offset: int) -> str:
+    return "0x" + data[offset + 12 : offset + 32].hex()
+
+
+def _decode_address_array(data: bytes, head: int = 0) -> List[str]:
+    start = _word(data, head)
+    length = _word(data, start)
+    return [_decode_address(data, start + 32 * (index + 1)) for index in range(length)]
+
+
+def _decode_string(data: bytes) -> str:
+    start = _word(data, 0)
+    length = _word(data, start)
+    return data[start + 32 : start + 32 + length].decode("utf-8")
+
+
+def _hex_bytes(result: Any) -> bytes:
+    if not isinstance(result, str) or not result.startswith("0x"):
+        raise ValueError(f"Unexpected eth_call result: {result!r}")
+    return bytes.fromhex(result[2:])
+
+
+def _modules_calldata(page_size: int) -> str:
+    start = SENTINEL_MODULES[2:].rjust(64, "0")
+    return GET_MODULES_PAGINATED + start + f"{page_size:064x}"
+
+
+def _decode_field(name: str, data: bytes) -> Any:
+    if name == "owners":
+        return _decode_address_array(data)
+    if name in ("threshold", "nonce"):
+        return _word(data, 0)
+    if name == "version":
+        return _decode_string(data)
+    return _decode_address_array(data)  # modules: (address[] array, address next)
+
+
+class SafeReader:
+    """Batched JSON-RPC reader for Safe owners, threshold, nonce, modules and version."""
+
+    def __init__(
+        self,
+        rpc_url: str,
+        *,
+        session: Optional[requests.Session] = None,
+        timeout: float = 10,
+        max_batch_calls: int = DEFAULT_MAX_BATCH_CALLS,
+        module_page_size: int = DEFAULT_MODULE_PAGE_SIZE,
+    ):
+        self.rpc_url = rpc_url
+        self.timeout = timeout
+        self.max_batch_calls = max(len(_FIELDS), max_batch_calls)
+        self.module_page_size = module_page_size
+        self._session = session
+        self._ids = itertools.count(1)
+
+    def _calls(self, address: str, block: str) -> List[Tuple[str, Dict[str, Any]]]:
+        calldata = {
+            "owners": GET_OWNERS,
+            "threshold": GET_THRESHOLD,
+            "nonce": NONCE,
+            "version": VERSION,
+            "modules": _modules_calldata(self.module_page_size),
+        }
+        return [
+            (
+                name,
+                {
+                    "jsonrpc": "2.0",
+                    "id": next(self._ids),
+                    "method": "eth_call",
+                    "params": [{"to": address, "data": calldata[name]}, block],
+                },
+            )
+            for name in _FIELDS
+        ]
+
+    def _post_batch(self, payload: List[Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+        session = self._session or requests.default_session()
+        # eth_call batches are read-only, so a dropped keep-alive may be retried.
+        response = session.post(self.rpc_url, json=payload, timeout=self.timeout, idempotent=True)
+        response.raise_for_status()
+        replies = response.json()
+        if not isinstance(replies, list):
+            message = replies.get("error", {}).get("message") if isinstance(replies, dict) else replies
+            raise SafeReadError(f"RPC endpoint rejected the batch request: {message}")
+        return {reply.get("id"): reply for reply in replies}
+
+    def read_many(
+        self, addresses: Iterable[str], block: str = "latest"
+    ) -> Tuple[Dict[str, SafeInfo], Dict[str, Exception]]:
+        """Read many Safes and return ``(safes, errors)`` keyed by the given address.
+
+        All calls for up to ``max_batch_calls // 5`` Safes share one HTTP
+        request. A Safe whose calls fail (for example because the address is
+        not a Safe) is reported in ``errors`` instead of aborting the batch.
+        """
+        addresses = list(dict.fromkeys(addresses))
+        per_request = self.max_batch_calls // len(_FIELDS)
+        safes: Dict[str, SafeInfo] = {}
+        errors: Dict[str, Exception] = {}
+        for chunk_start in range(0, len(addresses), per_request):
+            chunk = addresses[chunk_start : chunk_start + per_request]
+            planned = {address: self._calls(address, block) for address in chunk}
+            replies = self._post_batch([call for calls in planned.values() for _, call in calls])
+            for address, calls in planned.items():
+                try:
+                    safes[address] = self._decode(address, calls, replies, block)
+                except (SafeReadError, ValueError) as exc:
+                    errors[address] = exc
+        return safes, errors
+
+    def _decode(
+        self,
+        address: str,
+        calls: List[Tuple[str, Dict[str, Any]]],
+        replies: Dict[int, Dict[str, Any]],
+        block: str,
+    ) -> SafeInfo:
+        values: Dict[str, Any] = {}
+        for name, call in calls:
+            reply = replies.get(call["id"])
+            if reply is None:
+                raise SafeReadError(f"No RPC reply for {name} of Safe {address}", address)
+            if "error" in reply:
+                if name == "version":  # very old singletons predate VERSION()
+                    values[name] = None
+                    continue
+                message = reply["error"].get("message")
+                raise SafeReadError(f"{name} call failed for Safe {address}: {message}", address)
+            data = _hex_bytes(reply.get("result"))
+            if not data:
+                raise SafeReadError(f"{address} returned no data for {name}; is it a Safe?", address)
+            values[name] = _decode_field(name, data)
+        return SafeInfo(address=address, block=block, **values)
+
+    def read(self, address: str, block: str = "latest") -> SafeInfo:
+        safes, errors = self.read_many([address], block)
+        if address in errors:
+            raise errors[address]
+        return safes[address]
+
+
+def persist_safe_states(
+    reader: SafeReader, addresses: Iterable[str]
+) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Exception]]:
+    """Read ``addresses`` in one batch and persist every Safe that was read."""
+    safes, errors = reader.read_many(addresses)
+    persisted: Dict[str, Dict[str, Any]] = {}
+    for address, info in safes.items():
+        try:
+            persisted[address] = persist_safe_state(info)
+        except ValueError as exc:
+            errors[address] = exc
+    return persisted, errors
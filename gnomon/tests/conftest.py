@@ -0,0 +1,128 @@
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from gnomon.benchmarks.fake_etherscan import serve
+
+
+class StubResponse:
+    """Canned ``requests`` reply: ``json()`` returns ``payload`` and the body streams in small chunks."""
+
+    def __init__(self, payload):
+        self._payload = payload
+
+    def raise_for_status(self):
+        return None
+
+    def json(self):
+        return self._payload
+
+    def iter_content(self, chunk_size=7):
+        body = json.dumps(self._payload).encode("utf-8")
+        return (body[start:start + chunk_size] for start in range(0, len(body), chunk_size))
+
+    def close(self):
+        return None
+
+
+@pytest.fixture
+def stub_get(monkeypatch):
+    """Patch ``module.requests.get`` with ``handler``, which returns the JSON payload to reply with."""
+
+    def install(module, handler):
+        monkeypatch.setattr(module.requests, "get", lambda *args, **kwargs: StubResponse(handler(*args, **kwargs)))
+
+    return install
+
+
+@pytest.fixture
+def fake_etherscan(monkeypatch):
+    with serve() as server:
+        monkeypatch.setenv("ETHERSCAN_BASE_URL", server.url)
+        yield server
+
+
+def _abi_words(*words: int) -> str:
+    return "0x" + "".join(f"{word:064x}" for word in words)
+
+
+def _abi_address_array(addresses: list[str], trailing: list[int] = ()) -> str:
+    head = 32 * (1 + len(trailing))
+    return _abi_words(head, *trailing, len(addresses), *(int(address, 16) for address in addresses))
+
+
+class StubSafeRpc(ThreadingHTTPServer):
+    """Local JSON-RPC node answering Safe ``eth_call`` reads from ``safes``."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _StubSafeRpcHandler)
+        self.safes: dict[str, dict] = {}
+        self.batches: list[list[dict]] = []
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/"
+
+    def call(self, to: str, data: str) -> str:
+        safe = self.safes.get(to.lower())
+        if safe is None:
+            return "0x"
+        selector = data[:10]
+        if selector == "0xa0e67e2b":
+            return _abi_address_array(safe["owners"])
+        if selector == "0xe75235b8":
+            return _abi_words(safe["threshold"])
+        if selector == "0xaffed0e0":
+            return _abi_words(safe["nonce"])
+        if selector == "0xcc2f8452":
+            return _abi_address_array(safe["modules"], trailing=[1])
+        if selector == "0xffa1ad74":
+            version = safe["version"].encode("utf-8")
+            return _abi_words(32, len(version)) + version.ljust(32, b"\0").hex()
+        raise ValueError(f"unknown selector {selector}")
+
+    def respond(self, request: dict) -> dict:
+        try:
+            call = request["params"][0]
+            return {"jsonrpc": "2.0", "id": request["id"], "result": self.call(call["to"], call["data"])}
+        except ValueError as exc:
+            return {"jsonrpc": "2.0", "id": request["id"], "error": {"code": -32000, "message": str(exc)}}
+
+
+class _StubSafeRpcHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        batch = payload if isinstance(payload, list) else [payload]
+        self.server.batches.append(batch)
+        replies = [self.server.respond(request) for request in batch]
+        body = json.dumps(replies if isinstance(payload, list) else replies[0]).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        return None
+
+
+@pytest.fixture
+def stub_safe_rpc():
+    server = StubSafeRpc()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
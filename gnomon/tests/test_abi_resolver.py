@@ -1,6 +1,8 @@
+import hashlib
 import json
 import os
 import sys
+import threading
 import time
 from pathlib import Path
 
@@ -11,6 +13,7 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
 from gnomon.utils import abi_resolver
+from gnomon.utils.rate_limiter import RateLimiter
 
 
 @pytest.fixture(autouse=True)
@@ -19,9 +22,7 @@ def _isolated_abi_root(tmp_path, monkeypatch):
     monkeypatch.delenv("ETHERSCAN_API_KEY", raising=False)
     monkeypatch.delenv("ETHERSCAN_BASE_URL", raising=False)
     monkeypatch.delenv("ETHERSCAN_CHAIN_ID", raising=False)
-    abi_resolver._ABI_CACHE.clear()
-    abi_resolver._FILE_CACHE.clear()
-    abi_resolver._FETCH_ONCE_CACHE.clear()
+    abi_resolver.cache_clear()
     yield
 
 
@@ -179,3 +180,470 @@ def test_missing_api_key_raises_clear_error():
     address = "0x5555555555555555555555555555555555555555"
     with pytest.raises(RuntimeError, match="Missing ABI and no ETHERSCAN_API_KEY configured"):
         abi_resolver.resolveAbiByAddress(1, address, None)
+
+
+def test_batch_resolve_fetches_misses_concurrently_and_collects_errors(monkeypatch, stub_get):
+    os.environ["ETHERSCAN_API_KEY"] = "test-key"
+    monkeypatch.setattr(abi_resolver, "_RATE_LIMITER", RateLimiter(rate=100, capacity=100))
+    cached = "0x6666666666666666666666666666666666666666"
+    unverified = "0x7777777777777777777777777777777777777777"
+    misses = [f"0x{i:040x}" for i in range(20, 26)]
+    cache_file = Path("abi/address/1") / f"{cached}.json"
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    cache_file.write_text(json.dumps({"abi": [{"name": "cached", "type": "function"}]}), encoding="utf-8")
+
+    requested = []
+    in_flight = peak = 0
+    counter_lock = threading.Lock()
+    overlapped = threading.Event()
+
+    def _mock_get(url, params, timeout):
+        nonlocal in_flight, peak
+        with counter_lock:
+            requested.append(params["address"])
+            in_flight += 1
+            peak = max(peak, in_flight)
+            if in_flight > 1:
+                overlapped.set()
+        # Hold the first call until a second one is in flight; a serial resolver would time out here.
+        overlapped.wait(timeout=2)
+        with counter_lock:
+            in_flight -= 1
+        if params["action"] == "getsourcecode":
+            return {"status": "1", "message": "OK", "result": [{"Implementation": ""}]}
+        if params["address"] == unverified:
+            return {"status": "0", "message": "NOTOK", "result": "Contract source code not verified"}
+        return {"status": "1", "message": "OK", "result": json.dumps([{"name": "f", "type": "function"}])}
+
+    stub_get(abi_resolver, _mock_get)
+
+    abis, errors = abi_resolver.resolve_abis_many(1, [cached, *misses, unverified, misses[0]], max_workers=8)
+
+    assert abis[cached]["abi"][0]["name"] == "cached"
+    assert set(abis) == {cached, *misses}
+    assert list(errors) == [unverified]
+    assert "not verified" in str(errors[unverified])
+    assert cached not in requested
+    assert peak > 1
+
+
+def test_sqlite_store_deduplicates_proxy_abis_and_materializes_paths(monkeypatch, stub_get):
+    os.environ["ETHERSCAN_API_KEY"] = "test-key"
+    monkeypatch.setenv("GNOMAN_ABI_STORE", "sqlite")
+    monkeypatch.setattr(abi_resolver, "_RATE_LIMITER", RateLimiter(rate=100, capacity=100))
+    implementation = "0x8888888888888888888888888888888888888888"
+    proxies = ["0x9999999999999999999999999999999999999991", "0x9999999999999999999999999999999999999992"]
+    upstream = {"implementation": implementation, "name": "upgradeTo"}
+
+    def _mock_get(url, params, timeout, cache=True):
+        if params["action"] == "getsourcecode":
+            return {"status": "1", "message": "OK", "result": [{"Implementation": upstream["implementation"]}]}
+        abi = [{"name": upstream["name"], "type": "function"}]
+        return {"status": "1", "message": "OK", "result": json.dumps(abi)}
+
+    stub_get(abi_resolver, _mock_get)
+
+    for proxy in proxies:
+        assert abi_resolver.resolveAbiByAddress(1, proxy)["abi"][0]["name"] == "upgradeTo"
+
+    store = abi_resolver._abi_store()
+    assert store.stats() == {"addresses": 2, "abis": 1}
+    assert store.get_metadata(1, proxies[0])["implementation"] == implementation
+    assert not Path("abi/address/1").exists()
+
+    path = abi_resolver.resolveAbiFileForAddress(1, proxies[1])
+    assert json.loads(path.read_text(encoding="utf-8"))["abi"][0]["name"] == "upgradeTo"
+    assert path.with_name(f"{proxies[1]}.meta.json").exists()
+
+    # A revalidation that moves the proxy rewrites the path already handed out.
+    upstream.update(implementation="0x8888888888888888888888888888888888888889", name="v2")
+    assert abi_resolver.revalidate_abi(1, proxies[1]) is True
+    assert abi_resolver.resolveAbiFileForAddress(1, proxies[1]) == path
+    assert json.loads(path.read_text(encoding="utf-8"))["abi"][0]["name"] == "v2"
+
+    # So does a store update made by another process once this one looks again.
+    body = json.dumps({"abi": [{"name": "v3", "type": "function"}]}, sort_keys=True, separators=(",", ":"))
+    metadata = {**store.get_metadata(1, proxies[1]), "abiSha256": hashlib.sha256(body.encode("utf-8")).hexdigest()}
+    store.put(1, proxies[1], body, metadata)
+    abi_resolver.cache_clear()
+    path = abi_resolver.resolveAbiFileForAddress(1, proxies[1])
+    assert json.loads(path.read_text(encoding="utf-8"))["abi"][0]["name"] == "v3"
+    meta = json.loads(path.with_name(f"{proxies[1]}.meta.json").read_text(encoding="utf-8"))
+    assert meta["abiSha256"] == metadata["abiSha256"]
+
+
+def test_migrate_directory_imports_existing_cache():
+    from gnomon.utils.abi_store import AbiStore, migrate_directory
+
+    abi = {"abi": [{"name": "transfer", "type": "function"}]}
+    for address in ("0x1000000000000000000000000000000000000001", "0x1000000000000000000000000000000000000002"):
+        cache_file = Path("abi/address/1") / f"{address}.json"
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        cache_file.write_text(json.dumps(abi, indent=2), encoding="utf-8")
+
+    store = AbiStore(Path("abi/abi_store.sqlite3"))
+    assert migrate_directory(store, Path("abi"), delete=True) == 2
+    assert store.stats() == {"addresses": 2, "abis": 1}
+    assert store.get_payload(1, "0x1000000000000000000000000000000000000002") == abi
+    assert store.get_metadata(1, "0x1000000000000000000000000000000000000001")["source"] == "migrated"
+    assert list(Path("abi/address/1").iterdir()) == []
+
+
+def test_selector_and_topic_lookups_use_persisted_index():
+    from gnomon.utils.abi_index import SelectorIndex
+
+    token = "0x1200000000000000000000000000000000000012"
+    Path("abi").mkdir()
+    Path("abi/ERC20.json").write_text(
+        json.dumps(
+            [
+                {
+                    "type": "function",
+                    "name": "transfer",
+                    "inputs": [{"name": "to", "type": "address"}, {"name": "amount", "type": "uint256"}],
+                },
+                {
+                    "type": "event",
+                    "name": "Transfer",
+                    "inputs": [
+                        {"name": "from", "type": "address", "indexed": True},
+                        {"name": "to", "type": "address", "indexed": True},
+                        {"name": "value", "type": "uint256"},
+                    ],
+                },
+            ]
+        ),
+        encoding="utf-8",
+    )
+    abi_resolver.resolveAbiByAddress(1, token, "ERC20")
+
+    calldata = "0xa9059cbb000000000000000000000000"
+    transfer_topic = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+    assert abi_resolver.lookup_function(1, calldata, token)["name"] == "transfer"
+    assert abi_resolver.lookup_function(1, "0xa9059cbb")["name"] == "transfer"
+    assert abi_resolver.lookup_event(1, transfer_topic, token)["name"] == "Transfer"
+    assert abi_resolver.lookup_function(1, "0xdeadbeef") is None
+
+    reloaded = SelectorIndex(Path("abi/index/1.jsonl"))
+    assert reloaded.lookup_function("0xa9059cbb", token)["name"] == "transfer"
+
+
+def test_tuple_parameters_use_canonical_signature():
+    from gnomon.utils.abi_index import fragment_signature
+
+    fragment = {
+        "type": "function",
+        "name": "execute",
+        "inputs": [
+            {"type": "tuple[]", "components": [{"type": "address"}, {"type": "bytes"}]},
+            {"type": "uint8"},
+        ],
+    }
+    assert fragment_signature(fragment) == "execute((address,bytes)[],uint8)"
+
+
+def test_cache_info_reports_hits_and_bounded_eviction(monkeypatch):
+    monkeypatch.setattr(abi_resolver, "_ABI_CACHE", abi_resolver.BoundedCache(max_entries=2))
+    addresses = [f"0x{i:040x}" for i in range(40, 43)]
+    for address in addresses:
+        cache_file = Path("abi/address/1") / f"{address}.json"
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        cache_file.write_text(json.dumps({"abi": []}), encoding="utf-8")
+
+    for address in addresses:
+        abi_resolver.resolveAbiByAddress(1, address)
+    abi_resolver.resolveAbiByAddress(1, addresses[-1])
+
+    info = abi_resolver.cache_info()["abi"]
+    assert info["hits"] == 1
+    assert info["misses"] == 3
+    assert info["evictions"] == 1
+    assert info["entries"] == 2
+
+
+def test_failures_are_negative_cached_per_class_across_processes(monkeypatch, stub_get):
+    os.environ["ETHERSCAN_API_KEY"] = "test-key"
+    monkeypatch.setattr(abi_resolver, "_RATE_LIMITER", RateLimiter(rate=100, capacity=100))
+    monkeypatch.setenv("GNOMAN_ABI_NEGATIVE_TTL_RATE_LIMITED", "0")
+    unverified = "0x1300000000000000000000000000000000000013"
+    throttled = "0x1400000000000000000000000000000000000014"
+    calls = []
+
+    def _mock_get(url, params, timeout):
+        calls.append(params["address"])
+        if params["address"] == throttled:
+            return {"status": "0", "message": "NOTOK", "result": "Max rate limit reached"}
+        if params["action"] == "getsourcecode":
+            return {"status": "1", "message": "OK", "result": [{"Implementation": ""}]}
+        return {"status": "0", "message": "NOTOK", "result": "Contract source code not verified"}
+
+    stub_get(abi_resolver, _mock_get)
+
+    for _ in range(2):
+        with pytest.raises(abi_resolver.AbiFetchError) as excinfo:
+            abi_resolver.resolveAbiByAddress(1, unverified)
+        assert excinfo.value.reason == "not-verified"
+        abi_resolver._NEGATIVE_CACHES.clear()  # a fresh process re-reads the file
+    assert excinfo.value.cached is True
+    assert calls.count(unverified) == 2
+
+    for _ in range(2):
+        with pytest.raises(abi_resolver.AbiFetchError, match="rate limit"):
+            abi_resolver.resolveAbiByAddress(1, throttled)
+    assert calls.count(throttled) == 2  # zero TTL: retried every time
+
+    persisted = json.loads(Path("abi/negative-cache.json").read_text(encoding="utf-8"))
+    assert persisted[f"1:{unverified}"]["reason"] == "not-verified"
+
+
+def test_concurrent_resolves_share_one_fetch(monkeypatch, stub_get):
+
+    os.environ["ETHERSCAN_API_KEY"] = "test-key"
+    monkeypatch.setattr(abi_resolver, "_RATE_LIMITER", RateLimiter(rate=100, capacity=100))
+    address = "0x1500000000000000000000000000000000000015"
+    calls = []
+
+    def _mock_get(url, params, timeout):
+        calls.append(params["action"])
+        time.sleep(0.05)
+        if params["action"] == "getsourcecode":
+            return {"status": "1", "message": "OK", "result": [{"Implementation": ""}]}
+        return {"status": "1", "message": "OK", "result": json.dumps([{"name": "f", "type": "function"}])}
+
+    stub_get(abi_resolver, _mock_get)
+
+    results = []
+    barrier = threading.Barrier(8)
+
+    def _worker():
+        barrier.wait()
+        results.append(abi_resolver.resolveAbiByAddress(1, address))
+
+    threads = [threading.Thread(target=_worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ["getsourcecode", "getabi"]
+    assert len(results) == 8 and all(result["abi"][0]["name"] == "f" for result in results)
+    assert sorted(path.name for path in Path("abi/address/1").iterdir()) == [
+        f"{address}.json",
+        f"{address}.meta.json",
+    ]
+
+
+def test_stale_proxy_abi_is_served_then_refreshed_in_background(monkeypatch, stub_get):
+    os.environ["ETHERSCAN_API_KEY"] = "test-key"
+    monkeypatch.setattr(abi_resolver, "_RATE_LIMITER", RateLimiter(rate=100, capacity=100))
+    proxy = "0x1600000000000000000000000000000000000016"
+    upstream = {"implementation": "0x1700000000000000000000000000000000000017", "name": "v1"}
+    calls = []
+
+    def _mock_get(url, params, timeout, cache=True):
+        calls.append((params["action"], cache))
+        if params["action"] == "getsourcecode":
+            row = {"Implementation": upstream["implementation"], "ABI": "[]"}
+            return {"status": "1", "message": "OK", "result": [row]}
+        abi = [{"name": upstream["name"], "type": "function"}]
+        return {"status": "1", "message": "OK", "result": json.dumps(abi)}
+
+    stub_get(abi_resolver, _mock_get)
+    abi_resolver.configure_revalidation(0.0)
+    try:
+        assert abi_resolver.resolveAbiByAddress(1, proxy)["abi"][0]["name"] == "v1"
+
+        # Unchanged implementation: only validatedAt is recorded.
+        assert abi_resolver.revalidate_abi(1, proxy) is False
+        meta_path = Path("abi/address/1") / f"{proxy}.meta.json"
+        assert "validatedAt" in json.loads(meta_path.read_text(encoding="utf-8"))
+        assert calls == [("getsourcecode", True), ("getabi", True), ("getsourcecode", False)]
+
+        upstream.update(implementation="0x1800000000000000000000000000000000000018", name="v2")
+        served = abi_resolver.resolveAbiByAddress(1, proxy)
+        assert served["abi"][0]["name"] == "v1"  # stale entry served without waiting
+
+        deadline = time.monotonic() + 2
+        while json.loads(meta_path.read_text(encoding="utf-8"))["implementation"] != upstream["implementation"]:
+            assert time.monotonic() < deadline
+            time.sleep(0.02)
+        while abi_resolver.resolveAbiByAddress(1, proxy)["abi"][0]["name"] != "v2":
+            assert time.monotonic() < deadline
+            time.sleep(0.02)
+    finally:
+        abi_resolver.configure_revalidation(None)
+
+
+def test_warmup_imports_ts_cache_and_fetches_only_missing_safe_addresses(monkeypatch, stub_get):
+    from gnomon.utils import abi_warmup
+
+    os.environ["ETHERSCAN_API_KEY"] = "test-key"
+    monkeypatch.setattr(abi_resolver, "_RATE_LIMITER", RateLimiter(rate=100, capacity=100))
+    safe = "0x8888888888888888888888888888888888888888"
+    owner = "0x9999999999999999999999999999999999999999"
+    delegate = "0x9999999999999999999999999999999999999998"
+    module = "0x9999999999999999999999999999999999999997"
+    mastercopy = "0xaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa"
+    target = "0xbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbb"
+    Path(".gnoman").mkdir()
+    Path(".gnoman/safes.json").write_text(
+        json.dumps(
+            {
+                "version": 1,
+                "safes": [
+                    {
+                        "address": safe,
+                        "owners": [owner],
+                        "delegates": [{"address": delegate}],
+                        "modules": [module],
+                        "network": "mainnet",
+                        "mastercopyAddress": mastercopy,
+                        "transactions": [{"hash": "0x1", "to": target}, {"hash": "0x2", "to": ""}],
+                    },
+                    {"address": "0xcccccccccccccccccccccccccccccccccccccccc", "network": "sepolia"},
+                ],
+            }
+        ),
+        encoding="utf-8",
+    )
+    ts_dir = Path("abi-cache/1")
+    ts_dir.mkdir(parents=True)
+    (ts_dir / "index.json").write_text(
+        json.dumps({mastercopy: {"address": mastercopy, "contractName": "GnosisSafe", "source": "etherscan"}}),
+        encoding="utf-8",
+    )
+    (ts_dir / f"{mastercopy}.json").write_text(
+        json.dumps({"abi": [{"name": "getOwners", "type": "function", "inputs": []}], "contractName": "GnosisSafe"}),
+        encoding="utf-8",
+    )
+
+    requested = []
+
+    def _mock_get(url, params, timeout):
+        requested.append(params["address"])
+        if params["action"] == "getsourcecode":
+            return {"status": "1", "message": "OK", "result": [{"Implementation": ""}]}
+        return {"status": "1", "message": "OK", "result": json.dumps([{"name": "f", "type": "function"}])}
+
+    stub_get(abi_resolver, _mock_get)
+
+    summary = abi_warmup.warm_abi_cache(1)
+
+    assert summary["imported"] == 1
+    assert summary["wanted"] == 4
+    assert summary["alreadyCached"] == 1
+    assert summary["fetched"] == 3
+    assert set(requested) == {safe, module, target}
+    meta = json.loads(Path(f"abi/address/1/{mastercopy}.meta.json").read_text(encoding="utf-8"))
+    assert meta["source"] == "abi-cache:etherscan"
+    assert meta["abiNameHint"] == "GnosisSafe"
+    assert abi_resolver.lookup_function(1, "0xa0e67e2b", mastercopy)["name"] == "getOwners"
+
+    requested.clear()
+    assert abi_warmup.warm_abi_cache(1)["missing"] == 0
+    assert requested == []
+
+
+def test_cached_abi_is_written_minified_and_decoded_lazily(monkeypatch):
+    from gnomon.utils.lazy_abi import LazyAbiPayload
+
+    address = "0xdddddddddddddddddddddddddddddddddddddddd"
+    abi = [
+        {"name": f"fn{i}", "type": "function", "inputs": [{"name": "note", "type": "string"}], "doc": "a,[b]{c}\"d"}
+        for i in range(50)
+    ]
+    assert abi_resolver.import_abi(1, address, {"abi": abi}, source="test")
+
+    body = Path(f"abi/address/1/{address}.json").read_text(encoding="utf-8")
+    assert body == abi_resolver._canonical_abi_json({"abi": abi})
+    meta = json.loads(Path(f"abi/address/1/{address}.meta.json").read_text(encoding="utf-8"))
+    assert meta["abiSha256"] == abi_resolver.hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+    plain = abi_resolver.resolveAbiByAddress(1, address)
+    assert type(plain) is dict and type(plain["abi"]) is list
+    assert json.loads(json.dumps(plain)) == {"abi": abi}
+    assert len(plain["abi"] + [{"type": "fallback"}]) == 51
+    again = abi_resolver.resolveAbiByAddress(1, address)
+    assert again == plain and again is not plain
+
+    abi_resolver.cache_clear()
+    payload = abi_resolver.resolve_abi_by_address(1, address, lazy=True)
+    assert isinstance(payload, LazyAbiPayload)
+    assert list(payload) == ["abi"]
+    assert payload["abi"].decoded == 0
+    assert payload["abi"][42]["name"] == "fn42"
+    assert payload["abi"][-1]["name"] == "fn49"
+    assert payload["abi"].decoded == 2
+    assert len(payload["abi"]) == 50
+    assert payload["abi"] == abi
+    assert payload.to_dict() == {"abi": abi}
+    assert abi_resolver.cache_info()["abi"]["entries"] == 1
+
+
+def test_plain_hits_do_not_grow_the_byte_bounded_cache(monkeypatch):
+    from gnomon.utils.bounded_cache import BoundedCache
+
+    addresses = ["0xeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeee01", "0xeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeee02"]
+    bodies = []
+    for address in addresses:
+        abi = [{"name": f"{address[-2:]}fn{i}", "type": "function"} for i in range(20)]
+        assert abi_resolver.import_abi(1, address, {"abi": abi}, source="test")
+        bodies.append(abi_resolver._canonical_abi_json({"abi": abi}))
+    cache = BoundedCache(max_bytes=sum(map(len, bodies)), sizeof=abi_resolver._payload_size)
+    monkeypatch.setattr(abi_resolver, "_ABI_CACHE", cache)
+
+    hits = [abi_resolver.resolveAbiByAddress(1, address) for _ in range(3) for address in addresses]
+
+    # Each hit decodes afresh; nothing beyond the charged text stays cached.
+    assert len({id(hit) for hit in hits}) == len(hits)
+    info = cache.info()
+    assert info["entries"] == 2 and info["evictions"] == 0
+    assert info["bytes"] == sum(map(len, bodies))
+
+
+def test_lazy_payload_reads_pretty_printed_and_bare_array_files():
+    from gnomon.utils.lazy_abi import LazyAbiPayload
+
+    abi = [{"name": "a", "type": "function"}, {"name": "b", "type": "event", "inputs": []}]
+    pretty = LazyAbiPayload(json.dumps({"contractName": "X", "abi": abi, "extra": {"k": [1, 2]}}, indent=2))
+    assert pretty["contractName"] == "X"
+    assert pretty["extra"] == {"k": [1, 2]}
+    assert pretty["abi"][1]["name"] == "b"
+    assert pretty.canonical_json() == json.dumps(
+        {"abi": abi, "contractName": "X", "extra": {"k": [1, 2]}}, sort_keys=True, separators=(",", ":")
+    )
+
+    bare = LazyAbiPayload(json.dumps(abi, indent=4))
+    assert bare["abi"] == abi
+    assert len(LazyAbiPayload('{"abi": []}')["abi"]) == 0
+    with pytest.raises(ValueError):
+        LazyAbiPayload('{"name": "missing"}')
+
+
+def test_selector_index_relinks_upgraded_addresses_and_survives_torn_lines():
+    from gnomon.utils.abi_index import SelectorIndex
+
+    proxy = "0x1300000000000000000000000000000000000013"
+    old_abi = [{"type": "function", "name": "mint", "inputs": []}]
+    new_abi = [{"type": "function", "name": "burn", "inputs": []}]
+    path = Path("abi/index/1.jsonl")
+    index = SelectorIndex(path)
+    index.add_abi(proxy, old_abi, "sha-old")
+    mint = index.lookup_function("0x1249c58b", proxy)
+    index.add_abi(proxy, new_abi, "sha-new")
+
+    assert mint["name"] == "mint"
+    assert index.lookup_function("0x44df8e70", proxy)["name"] == "burn"
+    assert index._functions_by_address.get((proxy, "0x1249c58b")) is None
+
+    reloaded = SelectorIndex(path)
+    assert reloaded._functions_by_address.get((proxy, "0x1249c58b")) is None
+    assert reloaded.lookup_function("0x44df8e70", proxy)["name"] == "burn"
+
+    other = "0x1400000000000000000000000000000000000014"
+    with open(path, "a", encoding="utf-8") as handle:
+        handle.write('{"address": "0x15", "abiSha256": "sha-missing"}\n{"address":')  # dangling ref + torn tail
+    recovered = SelectorIndex(path)
+    assert "0x15" not in recovered
+    recovered.add_abi(other, old_abi, "sha-old")
+    assert SelectorIndex(path).lookup_function("0x1249c58b", other)["name"] == "mint"
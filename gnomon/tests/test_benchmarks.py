@@ -0,0 +1,33 @@
+import json
+
+from gnomon.benchmarks import suite
+
+
+def test_smoke_suite_saves_results_and_compares_with_previous_run(tmp_path, capsys):
+    output = tmp_path / "results"
+
+    suite.main(["--scale", "smoke", "--output", str(output)])
+    suite.main(["--scale", "smoke", "--output", str(output), "--threshold", "1000"])
+
+    runs = sorted(output.glob("*.json"))
+    assert len(runs) == 2
+    payload = json.loads(runs[-1].read_text(encoding="utf-8"))
+    names = {entry["name"] for entry in payload["results"]}
+    assert {"resolver.warm_hit", "resolver.cold_disk", "resolver.miss", "resolver.batch_miss"} <= names
+    assert {"tracker.initial_ingest", "tracker.idle_poll", "safe_state.put_unchanged"} <= names
+    ingest = next(entry for entry in payload["results"] if entry["name"] == "tracker.initial_ingest")
+    assert ingest["extra"]["logged"] == suite.SCALES["smoke"]["history"]
+    unchanged = next(entry for entry in payload["results"] if entry["name"] == "safe_state.put_unchanged")
+    assert unchanged["extra"]["written"] == 0
+    assert "%" in capsys.readouterr().out.splitlines()[-1]
+
+
+def test_fake_etherscan_enforces_rate_limit():
+    import requests
+    from gnomon.benchmarks.fake_etherscan import serve
+
+    with serve(rate_limit=2) as server:
+        replies = [requests.get(server.url, params={"action": "txlist", "address": "0x1"}).json() for _ in range(3)]
+
+    assert [reply["message"] for reply in replies] == ["No transactions found"] * 2 + ["NOTOK"]
+    assert server.rate_limited == 1
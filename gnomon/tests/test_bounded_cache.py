@@ -0,0 +1,23 @@
+from gnomon.utils.bounded_cache import BoundedCache
+
+
+def test_lru_eviction_by_entries_and_bytes_with_counters():
+    cache = BoundedCache(max_entries=3, max_bytes=10, sizeof=len)
+    cache["a"] = "xxx"
+    cache["b"] = "xxx"
+    cache["c"] = "xxx"
+    assert cache.get("a") == "xxx"  # "a" becomes most recently used
+    cache["d"] = "xxx"  # entry bound evicts "b"
+    cache["e"] = "xxxxxx"  # byte bound evicts "c" and "a"
+
+    assert "b" not in cache and "c" not in cache and "a" not in cache
+    assert cache.get("missing") is None
+    info = cache.info()
+    assert info["hits"] == 1
+    assert info["misses"] == 1
+    assert info["evictions"] == 3
+    assert info["entries"] == 2
+    assert info["bytes"] == 9
+
+    cache.clear()
+    assert cache.info()["entries"] == 0 and cache.info()["hits"] == 0
@@ -0,0 +1,126 @@
+import hashlib
+import importlib.util
+import sys
+import time
+import types
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+VERIFY_LICENSE = PROJECT_ROOT / "backend" / "licenses" / "verify_license.py"
+
+
+class InvalidSignature(Exception):
+    pass
+
+
+class UnsupportedAlgorithm(Exception):
+    pass
+
+
+class Ed25519PublicKey:
+    """Stand-in key: a signature is the SHA-256 of the key material and the payload."""
+
+    def __init__(self, material: bytes):
+        self.material = material
+
+    def verify(self, signature: bytes, payload: bytes) -> None:
+        if signature != hashlib.sha256(self.material + payload).digest():
+            raise InvalidSignature()
+
+
+def load_pem_public_key(data: bytes):
+    if data.startswith(b"ED25519:"):
+        return Ed25519PublicKey(data)
+    if data.startswith(b"X448:"):
+        raise UnsupportedAlgorithm("X448 keys are not supported by this backend")
+    if data.startswith(b"RSA:"):
+        return object()
+    raise ValueError("Could not deserialize key data")
+
+
+@pytest.fixture
+def verify_license(monkeypatch):
+    """Load verify_license.py against a stubbed ``cryptography`` package."""
+    modules = {
+        "cryptography": types.ModuleType("cryptography"),
+        "cryptography.exceptions": types.ModuleType("cryptography.exceptions"),
+        "cryptography.hazmat": types.ModuleType("cryptography.hazmat"),
+        "cryptography.hazmat.primitives": types.ModuleType("cryptography.hazmat.primitives"),
+        "cryptography.hazmat.primitives.asymmetric": types.ModuleType("cryptography.hazmat.primitives.asymmetric"),
+        "cryptography.hazmat.primitives.asymmetric.ed25519": types.ModuleType(
+            "cryptography.hazmat.primitives.asymmetric.ed25519"
+        ),
+        "cryptography.hazmat.primitives.serialization": types.ModuleType(
+            "cryptography.hazmat.primitives.serialization"
+        ),
+    }
+    modules["cryptography.exceptions"].InvalidSignature = InvalidSignature
+    modules["cryptography.exceptions"].UnsupportedAlgorithm = UnsupportedAlgorithm
+    modules["cryptography.hazmat.primitives.asymmetric.ed25519"].Ed25519PublicKey = Ed25519PublicKey
+    modules["cryptography.hazmat.primitives.serialization"].load_pem_public_key = load_pem_public_key
+    modules["cryptography.hazmat.primitives"].serialization = modules["cryptography.hazmat.primitives.serialization"]
+    for name, module in modules.items():
+        monkeypatch.setitem(sys.modules, name, module)
+
+    spec = importlib.util.spec_from_file_location("_verify_license_under_test", VERIFY_LICENSE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _token(verify_license, material: bytes, fields: str) -> str:
+    payload = fields.encode()
+    signature = hashlib.sha256(material + payload).digest()
+    encode = verify_license.base64.urlsafe_b64encode
+    return f"{encode(payload).decode().rstrip('=')}.{encode(signature).decode().rstrip('=')}"
+
+
+def test_verifier_reports_structured_reasons_and_memoizes_valid_tokens(verify_license, tmp_path, monkeypatch):
+    key = tmp_path / "license_public.pem"
+    key.write_bytes(b"ED25519:one")
+    verifier = verify_license.LicenseVerifier()
+    expiry = int(time.time()) + 3600
+    valid = _token(verify_license, b"ED25519:one", f"id-1|gnoman|2|{expiry}")
+
+    result = verifier.verify(key, valid, "gnoman", "2")
+    assert result and result.reason == verify_license.VALID
+    assert (result.identifier, result.product, result.version, result.expiry) == ("id-1", "gnoman", "2", expiry)
+
+    uncached = verifier._verify_uncached
+    calls = []
+    monkeypatch.setattr(verifier, "_verify_uncached", lambda *args: calls.append(args) or uncached(*args))
+    assert verifier.verify(key, valid, "gnoman", "2") is result
+    assert calls == []
+
+    forged_payload = _token(verify_license, b"ED25519:one", f"id-1|gnoman|2|{expiry + 86400}").split(".")[0]
+    tampered = f"{forged_payload}.{valid.split('.')[1]}"
+    expired = _token(verify_license, b"ED25519:one", f"id-2|gnoman|2|{int(time.time()) - 1}")
+    results = verifier.verify_many(key, [tampered, expired, "not-a-token", valid], "gnoman", "2")
+    assert [r.reason for r in results] == [
+        verify_license.BAD_SIGNATURE,
+        verify_license.EXPIRED,
+        verify_license.MALFORMED,
+        verify_license.VALID,
+    ]
+    assert len(calls) == 3  # only the valid token was answered from the memo
+    assert verifier.verify(key, valid, "other").reason == verify_license.WRONG_PRODUCT
+    assert verifier.verify(key, valid, "gnoman", "3").reason == verify_license.WRONG_VERSION
+
+    # Rotating the key file invalidates both the parsed key and memoized results.
+    key.write_bytes(b"ED25519:two-rotated")
+    assert verifier.verify(key, valid, "gnoman", "2").reason == verify_license.BAD_SIGNATURE
+
+
+@pytest.mark.parametrize("content", [b"X448:unsupported", b"RSA:not-ed25519", b"garbage"])
+def test_unusable_public_keys_report_key_unavailable(verify_license, tmp_path, content):
+    key = tmp_path / "license_public.pem"
+    key.write_bytes(content)
+    verifier = verify_license.LicenseVerifier()
+
+    result = verifier.verify(key, "payload.signature")
+    assert not result
+    assert result.reason == verify_license.KEY_UNAVAILABLE
+    assert verifier.verify(tmp_path / "missing.pem", "payload.signature").reason == verify_license.KEY_UNAVAILABLE
+    assert verify_license.verify_token(key, "payload.signature") is False
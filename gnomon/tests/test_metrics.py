@@ -0,0 +1,96 @@
+import pytest
+import requests
+
+from gnomon.api import etherscan_tracker
+from gnomon.utils import abi_resolver, metrics
+from gnomon.utils.rate_limiter import RateLimiter
+
+
+@pytest.fixture
+def enabled_metrics():
+    metrics.REGISTRY.reset()
+    metrics.enable()
+    yield metrics.REGISTRY
+    metrics.disable()
+    metrics.REGISTRY.reset()
+
+
+def test_disabled_registry_records_nothing():
+    metrics.REGISTRY.reset()
+    lookups = metrics.REGISTRY.get("gnoman_abi_cache_lookups_total")
+    lookups.inc(cache="memory", result="hit")
+    with metrics.REGISTRY.get("gnoman_abi_disk_read_seconds").time():
+        pass
+
+    assert lookups.value(cache="memory", result="hit") == 0
+    assert metrics.write_file() is None
+    assert metrics._observe_http not in requests._OBSERVERS
+
+
+def test_resolver_tracker_and_http_metrics_export(fake_etherscan, enabled_metrics, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("ETHERSCAN_API_KEY", "key")
+    monkeypatch.setattr(abi_resolver, "_RATE_LIMITER", RateLimiter(rate=100, capacity=100))
+    abi_resolver.cache_clear()
+    token = "0x" + "12" * 20
+    fake_etherscan.contracts[token] = {"abi": [{"type": "function", "name": "transfer", "inputs": []}]}
+    safe = "0x" + "34" * 20
+    fake_etherscan.transactions[safe] = [{"hash": f"0x{n}", "blockNumber": str(n)} for n in range(1, 6)]
+
+    abi_resolver.resolve_abi_by_address(1, token)
+    abi_resolver.resolve_abi_by_address(1, token)
+    abi_resolver.cache_clear()
+    abi_resolver.resolve_abi_by_address(1, token)
+    store = etherscan_tracker.open_tx_log(safe)
+    monkeypatch.setattr(etherscan_tracker, "CURSOR_PATH", tmp_path / "cursors.json")
+    assert etherscan_tracker.ingest_new_transactions(safe, store, "key", rate_limiter=RateLimiter(100, 100)) == 5
+
+    lookups = enabled_metrics.get("gnoman_abi_cache_lookups_total")
+    assert lookups.value(cache="memory", result="miss") == 2
+    assert lookups.value(cache="memory", result="hit") == 1
+    assert lookups.value(cache="disk", result="hit") == 1
+    assert enabled_metrics.get("gnoman_abi_fetch_seconds").count(result="ok") == 1
+    assert enabled_metrics.get("gnoman_abi_disk_read_seconds").count() == 2
+    assert enabled_metrics.get("gnoman_rate_limiter_wait_seconds").count() == 3
+    assert enabled_metrics.get("gnoman_tracker_rows_logged_total").value() == 5
+    http = enabled_metrics.get("gnoman_http_request_seconds")
+    assert http.count(endpoint="contract.getabi", status="2xx") == 1
+    assert http.count(endpoint="account.txlist", status="2xx") == 1
+
+    text = metrics.render_prometheus()
+    assert "# TYPE gnoman_tracker_poll_seconds histogram" in text
+    assert 'gnoman_tracker_poll_seconds_bucket{outcome="ok",le="+Inf"} 1' in text
+    assert 'gnoman_abi_cache_lookups_total{cache="memory",result="hit"} 1' in text
+
+    path = metrics.write_file(tmp_path / "gnoman.prom")
+    assert path.read_text(encoding="utf-8") == metrics.render_prometheus()
+
+
+def test_tracker_service_writes_metrics_from_one_task_off_the_loop(
+    fake_etherscan, enabled_metrics, monkeypatch, tmp_path
+):
+    import asyncio
+    import threading
+
+    from gnomon.api.tracker_service import TrackerService
+
+    monkeypatch.setattr(etherscan_tracker, "CURSOR_PATH", tmp_path / "cursors.json")
+    monkeypatch.setattr(etherscan_tracker, "LOG_ROOT", tmp_path / "logs")
+    monkeypatch.setattr(etherscan_tracker, "LOG_PATH", tmp_path / "legacy.json")
+    safes = [f"0x{n:040x}" for n in range(1, 4)]
+    writers = []
+    real_write = metrics.write_file
+    monkeypatch.setattr(metrics, "write_file", lambda: writers.append(threading.current_thread()) or real_write())
+    monkeypatch.setenv("GNOMAN_METRICS_FILE", str(tmp_path / "gnoman.prom"))
+    service = TrackerService(safes, api_key="key", rate_limiter=RateLimiter(100, 100), poll_interval=0.05)
+
+    async def _run():
+        asyncio.get_running_loop().call_later(0.3, service.stop)
+        await service.run()
+
+    asyncio.run(_run())
+
+    assert sum(safe.polls + safe.skipped for safe in service.safes.values()) > len(safes)
+    assert len(writers) == 1  # the final snapshot; the periodic one is 15s away
+    assert writers[0] is not threading.main_thread()
+    assert "gnoman_tracker_poll_seconds" in (tmp_path / "gnoman.prom").read_text()
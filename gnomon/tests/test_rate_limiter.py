@@ -0,0 +1,62 @@
+import asyncio
+import json
+import time
+
+from gnomon.utils.rate_limiter import RateLimiter
+
+
+def test_token_bucket_allows_burst_then_paces_and_reports_waits():
+    limiter = RateLimiter(rate=20, capacity=3)
+
+    start = time.perf_counter()
+    waits = [limiter.acquire() for _ in range(5)]
+    elapsed = time.perf_counter() - start
+
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert elapsed >= 0.09
+    stats = limiter.stats()
+    assert stats["acquired"] == 5
+    assert stats["waits"] == 2
+    assert stats["wait_seconds"] >= 0.09
+
+
+def test_state_file_shares_budget_between_limiters(tmp_path):
+    state = tmp_path / "etherscan.bucket"
+    first = RateLimiter(rate=5, capacity=2, state_path=state)
+    second = RateLimiter(rate=5, capacity=2, state_path=state)
+
+    assert first.reserve() == 0.0
+    assert first.reserve() == 0.0
+    assert second.reserve() > 0.15
+
+
+def test_async_acquire_waits_without_blocking_the_loop():
+    limiter = RateLimiter(rate=10, capacity=1)
+
+    async def _run():
+        ticks = 0
+
+        async def _ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.create_task(_ticker())
+        for _ in range(3):
+            await limiter.acquire_async()
+        ticker.cancel()
+        return ticks
+
+    assert asyncio.run(_run()) >= 10
+
+
+def test_shared_bucket_clock_never_moves_backwards(tmp_path):
+    state = tmp_path / "etherscan.bucket"
+    ahead = time.time() + 5  # stamped by a process that took the lock after us
+    state.write_text(json.dumps({"tokens": 1.0, "updated": ahead}), encoding="utf-8")
+    limiter = RateLimiter(rate=5, capacity=2, state_path=state)
+
+    assert limiter.reserve() == 0.0
+    assert limiter.reserve() == 0.2
+    assert json.loads(state.read_text(encoding="utf-8")) == {"tokens": -1.0, "updated": ahead}
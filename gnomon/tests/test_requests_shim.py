@@ -0,0 +1,219 @@
+import requests
+
+
+def test_session_reuses_connection_and_encodes_params(fake_etherscan):
+    fake_etherscan.transactions["0xabc"] = [{"hash": "0x1", "blockNumber": "7"}]
+    with requests.Session() as session:
+        for _ in range(3):
+            response = session.get(
+                fake_etherscan.url,
+                params={"module": "account", "action": "txlist", "address": "0xABC", "page": None},
+                timeout=5,
+            )
+            response.raise_for_status()
+
+    assert response.json()["result"] == [{"hash": "0x1", "blockNumber": "7"}]
+    assert len(fake_etherscan.connections) == 1
+    assert fake_etherscan.requests[-1][1] == {"module": "account", "action": "txlist", "address": "0xABC"}
+
+
+def test_gzip_responses_are_decoded_transparently(fake_etherscan):
+    fake_etherscan.gzip = True
+    response = requests.get(f"{fake_etherscan.url}?module=account", params={"action": "unknown"}, timeout=5)
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json()["result"] == "Unsupported action"
+    assert requests.default_session() is requests.default_session()
+
+
+def test_response_cache_serves_closed_ranges_and_ignores_api_key(fake_etherscan, tmp_path):
+    from requests.cache import ResponseCache
+
+    fake_etherscan.transactions["0xabc"] = [{"hash": f"0x{i}", "blockNumber": str(i)} for i in range(1, 6)]
+    cache = ResponseCache(tmp_path / "http")
+    closed = {"module": "account", "action": "txlist", "address": "0xabc", "startblock": 1, "endblock": 3}
+    opened = {**closed, "endblock": 99_999_999}
+
+    with requests.Session(cache=cache) as session:
+        first = session.get(fake_etherscan.url, params={**closed, "apikey": "key-a"}, timeout=5)
+        second = session.get(fake_etherscan.url, params={"apikey": "key-b", **closed}, timeout=5)
+        bypassed = session.get(fake_etherscan.url, params=closed, timeout=5, cache=False)
+        session.get(fake_etherscan.url, params=opened, timeout=5)
+        session.get(fake_etherscan.url, params=opened, timeout=5)
+        session.get(fake_etherscan.url, params={"module": "account", "action": "bogus"}, timeout=5)
+
+    assert second.headers["x-gnoman-cache"] == "hit"
+    assert second.json() == first.json()
+    assert len(second.json()["result"]) == 3
+    assert "x-gnoman-cache" not in bypassed.headers
+    assert [params["action"] for _, params in fake_etherscan.requests] == ["txlist"] * 4 + ["bogus"]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["stores"]) == (1, 1, 2)
+    assert cache.ttl_for({"module": "contract", "action": "getsourcecode"}) is None
+    assert not any(b"key-a" in path.read_bytes() for path in (tmp_path / "http").glob("*/*.bin"))
+
+
+def test_response_cache_ttls_errors_and_size_cap(tmp_path, monkeypatch):
+    import requests.cache as cache_module
+    from requests.cache import ResponseCache
+
+    real_time = cache_module.time.time
+    url = "https://API.example/api?module=contract&action=getabi&address=0x1&apikey=k"
+    ok = b'{"status":"1","message":"OK","result":"[]"}'
+    cache = ResponseCache(tmp_path, max_bytes=1000, ttls={("contract", "getabi"): 60})
+
+    assert not cache.put(url, 200, {}, b'{"status":"0","message":"NOTOK","result":"Max rate limit reached"}')
+    assert cache.put(url, 200, {"content-encoding": "gzip"}, ok)
+    assert cache.get("https://api.example/api?address=0x1&action=getabi&module=contract") == (200, {}, ok)
+
+    monkeypatch.setattr(cache_module.time, "time", lambda: real_time() + 61)
+    assert cache.get(url) is None
+    monkeypatch.undo()
+
+    for index in range(20):
+        cache.put(url.replace("0x1", f"0x{index + 2}"), 200, {}, ok)
+    stats = cache.stats()
+    assert stats["evictions"] > 0
+    assert stats["bytes"] <= 1000
+
+
+def test_response_cache_keeps_ranges_forever_only_below_finality(tmp_path, monkeypatch):
+    import requests.cache as cache_module
+    from requests.cache import IMMUTABLE, RECENT_RANGE_TTL, ResponseCache, normalize_url
+
+    real_time = cache_module.time.time
+    cache = ResponseCache(tmp_path, confirmations=100)
+    history = "https://api.example/api?module=account&action=txlist&address=0x1&startblock=0&endblock=1000"
+    params = normalize_url(history)[1]
+    assert cache.ttl_for(params) == RECENT_RANGE_TTL  # head unknown: the range may still reorg
+
+    assert cache.put(history, 200, {}, b'{"status":"1","message":"OK","result":[{"blockNumber":"1050"}]}')
+    assert cache.head == 1050
+    assert cache.ttl_for(params) == RECENT_RANGE_TTL  # only 50 blocks deep
+    monkeypatch.setattr(cache_module.time, "time", lambda: real_time() + RECENT_RANGE_TTL + 1)
+    assert cache.get(history) is None
+    monkeypatch.undo()
+
+    head_url = "https://api.example/api?module=proxy&action=eth_blockNumber"
+    assert not cache.put(head_url, 200, {}, b'{"jsonrpc":"2.0","id":83,"result":"0x44c"}')  # 1100
+    assert cache.head == 1100
+    assert cache.ttl_for(params) == IMMUTABLE
+    cache.observe_head(900)
+    assert cache.head == 1100
+
+
+def test_json_array_stream_yields_items_across_chunk_boundaries():
+    import json
+
+    from requests.stream import JsonArrayStream
+
+    rows = [{"hash": f"0x{n}", "value": 10 ** n, "note": "é \"q\" ,]}"} for n in range(6)]
+    body = json.dumps({"status": "1", "message": "OK", "result": rows, "tail": [1, 2]}).encode("utf-8")
+    for size in (1, 2, 7, len(body)):
+        stream = JsonArrayStream((body[i:i + size] for i in range(0, len(body), size)), "result")
+        assert list(stream) == rows
+        assert stream.fields == {"status": "1", "message": "OK", "tail": [1, 2]}
+
+    error = JsonArrayStream([b'{"status":"0","message":"NOTOK","result":"Max rate limit reached"}'])
+    assert list(error) == [] and error.fields["result"] == "Max rate limit reached"
+    assert list(JsonArrayStream([b" [1", b"23, 4", b"5] "])) == [123, 45]
+    assert list(JsonArrayStream([b'{"result": []}'])) == []
+
+
+def test_json_array_stream_waits_for_numbers_split_across_chunks(monkeypatch):
+    import json
+
+    from requests import stream as stream_module
+    from requests.stream import JsonArrayStream
+
+    def byte_by_byte(body):
+        return (body[i:i + 1] for i in range(len(body)))
+
+    assert list(JsonArrayStream(byte_by_byte(b"[1.5e3]"))) == [1500.0]
+    body = b'[-0.25, 1E-2 ,true,null, "a\\"b", {"n": [2e+1]}, 7]'
+    assert list(JsonArrayStream(byte_by_byte(body))) == json.loads(body)
+
+    # Each element is decoded once, however many chunks it arrived in.
+    decodes = []
+
+    class _CountingDecoder(json.JSONDecoder):
+        def raw_decode(self, s, idx=0):
+            decodes.append(idx)
+            return super().raw_decode(s, idx)
+
+    monkeypatch.setattr(stream_module, "_DECODER", _CountingDecoder())
+    rows = [{"hash": f"0x{n}", "input": "ab" * 500} for n in range(3)]
+    assert list(JsonArrayStream(byte_by_byte(json.dumps(rows).encode("utf-8")))) == rows
+    assert len(decodes) == len(rows)
+
+
+def test_streamed_responses_decode_incrementally_and_release_connections(fake_etherscan, tmp_path):
+    import json
+
+    from requests.cache import ResponseCache
+
+    rows = [{"hash": f"0x{n:064x}", "blockNumber": str(n)} for n in range(1, 2001)]
+    fake_etherscan.transactions["0xabc"] = rows
+    fake_etherscan.gzip = True
+    params = {"module": "account", "action": "txlist", "address": "0xabc"}
+
+    with requests.Session(cache=ResponseCache(tmp_path / "http")) as session:
+        response = session.get(fake_etherscan.url, params=params, timeout=5, stream=True)
+        chunks = list(response.iter_content(4096))
+        assert len(chunks) > 10
+        assert json.loads(b"".join(chunks))["result"] == rows
+        items = session.get(fake_etherscan.url, params=params, timeout=5, stream=True).iter_json_items()
+        assert list(items) == rows and items.fields == {"status": "1", "message": "OK"}
+
+        abandoned = session.get(fake_etherscan.url, params=params, timeout=5, stream=True)
+        next(abandoned.iter_content(16))
+        abandoned.close()  # partially read: the connection is dropped, not pooled
+
+        closed = {**params, "startblock": 1, "endblock": 3}
+        streamed = session.get(fake_etherscan.url, params=closed, timeout=5, stream=True)
+        assert [row["hash"] for row in streamed.iter_json_items()] == [row["hash"] for row in rows[:3]]
+        hit = session.get(fake_etherscan.url, params=closed, timeout=5, stream=True)
+        assert hit.headers["x-gnoman-cache"] == "hit"
+        assert hit.json()["result"] == rows[:3]
+
+    assert len(fake_etherscan.connections) == 2
+
+
+def test_stale_pooled_connections_are_retried_only_when_safe(fake_etherscan):
+    import http.client
+    import socket
+    from urllib.parse import urlsplit
+
+    import pytest
+
+    class _DeadConnection:
+        sock = None
+        timeout = None
+
+        def __init__(self, exc):
+            self.exc = exc
+
+        def request(self, *args, **kwargs):
+            raise self.exc
+
+        def close(self):
+            pass
+
+    parts = urlsplit(fake_etherscan.url)
+    key = ("http", parts.hostname, parts.port)
+    with requests.Session() as session:
+        def _send(exc, method="GET", **kwargs):
+            session._pools[key] = [_DeadConnection(exc)]
+            if method == "GET":
+                return session.get(fake_etherscan.url, params={"module": "account"}, timeout=5)
+            return session.post(fake_etherscan.url, data=b"{}", timeout=5, **kwargs)
+
+        assert _send(http.client.RemoteDisconnected("closed")).ok
+        assert _send(ConnectionResetError()).ok
+        assert _send(BrokenPipeError(), "POST", idempotent=True).status_code
+        with pytest.raises(ConnectionError):
+            _send(http.client.RemoteDisconnected("closed"), "POST")
+        with pytest.raises(ConnectionError):
+            _send(socket.timeout("timed out"))
+
+    assert [params for _, params in fake_etherscan.requests] == [{"module": "account"}] * 2
@@ -0,0 +1,85 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from gnomon.core import safe_manager
+from gnomon.core.safe_manager import SafeManager, SafeStateStore
+
+
+class _Safe:
+    def __init__(self, address, owners, threshold):
+        self.address = address
+        self._owners = owners
+        self._threshold = threshold
+
+    def owners(self):
+        return list(self._owners)
+
+    def getThreshold(self):
+        return self._threshold
+
+
+@pytest.fixture(autouse=True)
+def _isolated_state(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(safe_manager, "SAFE_STATE_PATH", tmp_path / "state" / "gnosis_safe_state.json")
+    yield
+
+
+def test_store_keeps_many_safes_and_skips_unchanged_writes():
+    manager_a = SafeManager(_Safe)
+    manager_b = SafeManager(_Safe)
+    manager_a.load_safe("0xAAA", ["0x1", "0x2", "0x3"], 2)
+    manager_b.load_safe("0xBBB", ["0x4", "0x5", "0x6"], 3)
+    path = safe_manager.SAFE_STATE_PATH
+    written = path.stat().st_mtime_ns, path.stat().st_ino
+
+    manager_b.refresh_state()
+    manager_a.refresh_state()
+    assert (path.stat().st_mtime_ns, path.stat().st_ino) == written
+
+    document = json.loads(path.read_text(encoding="utf-8"))
+    assert document["primary"] == "0xbbb"
+    assert set(document["safes"]) == {"0xaaa", "0xbbb"}
+    assert manager_a.get_cached_state()["threshold"] == 2
+    assert safe_manager.load_persisted_safe()["address"] == "0xBBB"
+
+    manager_a.safe._threshold = 3
+    manager_a.refresh_state()
+    assert (path.stat().st_mtime_ns, path.stat().st_ino) != written
+    assert safe_manager.load_persisted_safe("0xaaa")["threshold"] == 3
+    assert not list(path.parent.glob("*.tmp"))
+
+
+def test_reads_are_served_from_memory_until_the_file_changes(monkeypatch):
+    path = safe_manager.SAFE_STATE_PATH
+    path.parent.mkdir(parents=True)
+    path.write_text(json.dumps({"address": "0xSAFE", "owners": ["0x1", "0x2", "0x3"], "threshold": 2}))
+    store = SafeStateStore(path)
+
+    loads = []
+    original_load = safe_manager.json.load
+    monkeypatch.setattr(safe_manager.json, "load", lambda handle: loads.append(1) or original_load(handle))
+
+    assert store.get()["address"] == "0xSAFE"
+    assert store.get("0xsafe")["threshold"] == 2
+    store.get()["owners"].append("0xmutated")
+    assert store.get()["owners"] == ["0x1", "0x2", "0x3"]
+    assert len(loads) == 1
+
+    other = SafeStateStore(path)
+    assert other.put({"address": "0xSAFE", "owners": ["0x1", "0x2", "0x3"], "threshold": 2}) is False
+    assert other.put({"address": "0xSAFE", "owners": ["0x1", "0x2", "0x3"], "threshold": 3}) is True
+    assert store.get()["threshold"] == 3
+    assert len(loads) == 3
+
+    assert store.remove("0xsafe") is True
+    assert store.get() is None
+    with pytest.raises(RuntimeError):
+        safe_manager.load_persisted_safe()
@@ -95,3 +95,237 @@ def test_safe_persistence_and_tx_lookup(monkeypatch):
     assert isinstance(txs, list)
     assert all("hash" in tx for tx in txs)
     print("[TEST] ✅ Safe persistence and Etherscan lookup verified.")
+
+
+def test_incremental_poll_uses_cursor_and_skips_seen_rows(monkeypatch, tmp_path, stub_get):
+    monkeypatch.setattr(etherscan_tracker, "CURSOR_PATH", tmp_path / "cursors.json")
+    pages = [
+        [
+            {"hash": "0x01", "blockNumber": "10"},
+            {"hash": "0x02", "blockNumber": "11"},
+        ],
+        [
+            {"hash": "0x02", "blockNumber": "11"},
+            {"hash": "0x03", "blockNumber": "11"},
+            {"hash": "0x04", "blockNumber": "12"},
+        ],
+        [{"hash": "0x04", "blockNumber": "12"}],
+    ]
+    requested = []
+
+    def _mock_get(url, timeout, stream=False):
+        requested.append(url)
+        return {"status": "1", "message": "OK", "result": pages[len(requested) - 1]}
+
+    stub_get(etherscan_tracker, _mock_get)
+
+    first = etherscan_tracker.poll_new_transactions("0xSAFE", "key")
+    second = etherscan_tracker.poll_new_transactions("0xSAFE", "key")
+    third = etherscan_tracker.poll_new_transactions("0xSAFE", "key")
+
+    assert [tx["hash"] for tx in first] == ["0x01", "0x02"]
+    assert [tx["hash"] for tx in second] == ["0x03", "0x04"]
+    assert third == []
+    assert "startblock=0" in requested[0]
+    assert "startblock=11" in requested[1]
+    assert "startblock=12" in requested[2]
+    assert etherscan_tracker.load_cursor("0xsafe") == {"lastBlock": 12, "hashes": ["0x04"]}
+
+
+def test_iter_transactions_splits_range_when_result_window_fills(monkeypatch, stub_get):
+    from urllib.parse import parse_qs, urlparse
+
+    monkeypatch.setattr(etherscan_tracker, "MAX_RESULT_WINDOW", 4)
+    history = [{"hash": f"0x{n:02x}", "blockNumber": str(100 + n // 2)} for n in range(10)]
+    windows = []
+
+    def _mock_get(url, timeout, stream=False):
+        params = parse_qs(urlparse(url).query)
+        query = {key: int(params[key][0]) for key in ("startblock", "page", "offset")}
+        windows.append((query["startblock"], query["page"]))
+        rows = [row for row in history if int(row["blockNumber"]) >= query["startblock"]]
+        start = (query["page"] - 1) * query["offset"]
+        return {"status": "1", "message": "OK", "result": rows[start:start + query["offset"]]}
+
+    stub_get(etherscan_tracker, _mock_get)
+
+    rows = list(etherscan_tracker.iter_transactions("0xSAFE", page_size=2, api_key="key"))
+
+    assert [row["hash"] for row in rows] == [row["hash"] for row in history]
+    assert windows[:3] == [(0, 1), (0, 2), (101, 1)]
+
+
+def test_ingest_merges_all_endpoints_by_block(fake_etherscan, monkeypatch, tmp_path):
+    monkeypatch.setattr(etherscan_tracker, "CURSOR_PATH", tmp_path / "cursors.json")
+    monkeypatch.setattr(etherscan_tracker, "LOG_ROOT", tmp_path / "logs")
+    safe = "0x" + "5e" * 20
+    fake_etherscan.histories["txlist"][safe] = [
+        {"hash": "0xa", "blockNumber": "10"},
+        {"hash": "0xc", "blockNumber": "30"},
+    ]
+    fake_etherscan.histories["txlistinternal"][safe] = [
+        {"hash": "0xa", "blockNumber": "10", "traceId": "0_1", "value": "5"},
+        {"hash": "0xb", "blockNumber": "20", "traceId": "0"},
+    ]
+    fake_etherscan.histories["tokentx"][safe] = [
+        {"hash": "0xa", "blockNumber": "10", "logIndex": "3"},
+        {"hash": "0xa", "blockNumber": "10", "logIndex": "4"},
+    ]
+    fake_etherscan.histories["tokennfttx"][safe] = [{"hash": "0xd", "blockNumber": "40", "logIndex": "0"}]
+    store = etherscan_tracker.open_tx_log(safe)
+
+    def ingest():
+        return etherscan_tracker.ingest_new_transactions(
+            safe, store, "key", batch_size=2, actions=etherscan_tracker.ACTIONS
+        )
+
+    assert ingest() == 7
+    records = store.tail(7)
+    assert [(row["kind"], row["key"]) for row in records] == [
+        ("normal", "0xa"),
+        ("internal", "0xa:0_1"),
+        ("erc20", "0xa:3"),
+        ("erc20", "0xa:4"),
+        ("internal", "0xb:0"),
+        ("normal", "0xc"),
+        ("erc721", "0xd:0"),
+    ]
+    assert all({"from", "to", "value", "timeStamp"} <= set(row) for row in records)
+    assert {params["action"] for _, params in fake_etherscan.requests} == set(etherscan_tracker.ACTIONS)
+    assert etherscan_tracker.load_cursor(safe, "tokentx") == {
+        "lastBlock": 10,
+        "hashes": ["0xa:3", "0xa:4"],
+        "polledThrough": 40,
+    }
+    assert etherscan_tracker.load_cursor(safe) == {"lastBlock": 30, "hashes": ["0xc"], "polledThrough": 40}
+
+    assert ingest() == 0
+    fake_etherscan.histories["tokentx"][safe].append({"hash": "0xa", "blockNumber": "10", "logIndex": "5"})
+    # Secondary endpoints are probed in turn, so the change shows within one round.
+    probes = [etherscan_tracker.has_new_transactions(safe, "key", actions=etherscan_tracker.ACTIONS) for _ in range(3)]
+    assert any(probes)
+    assert ingest() == 1
+    assert store.tail(1)[0]["key"] == "0xa:5"
+
+
+def test_probe_treats_polled_empty_endpoints_as_unchanged(fake_etherscan, monkeypatch, tmp_path):
+    monkeypatch.setattr(etherscan_tracker, "CURSOR_PATH", tmp_path / "cursors.json")
+    monkeypatch.setattr(etherscan_tracker, "LOG_ROOT", tmp_path / "logs")
+    safe = "0x" + "5f" * 20
+    fake_etherscan.histories["txlist"][safe] = [{"hash": "0xa", "blockNumber": "10"}]
+    store = etherscan_tracker.open_tx_log(safe)
+    actions = etherscan_tracker.ACTIONS
+
+    assert etherscan_tracker.has_new_transactions(safe, "key", actions=actions)  # never polled
+    assert etherscan_tracker.ingest_new_transactions(safe, store, "key", actions=actions) == 1
+    assert etherscan_tracker.load_cursor(safe, "tokennfttx") == {"lastBlock": None, "hashes": [], "polledThrough": 10}
+
+    fake_etherscan.requests.clear()
+    assert not etherscan_tracker.has_new_transactions(safe, "key", actions=actions)
+    assert [params["action"] for _, params in fake_etherscan.requests] == ["txlist", "txlistinternal"]
+
+    fake_etherscan.histories["tokentx"][safe] = [{"hash": "0xe", "blockNumber": "7", "logIndex": "0"}]
+    assert etherscan_tracker.has_new_transactions(safe, "key", actions=actions)  # tokentx's turn
+    assert etherscan_tracker.ingest_new_transactions(safe, store, "key", actions=actions) == 1
+    assert not etherscan_tracker.has_new_transactions(safe, "key", actions=actions)
+
+
+def test_transfers_without_log_index_keep_distinct_keys(fake_etherscan, monkeypatch, tmp_path):
+    monkeypatch.setattr(etherscan_tracker, "CURSOR_PATH", tmp_path / "cursors.json")
+    monkeypatch.setattr(etherscan_tracker, "LOG_ROOT", tmp_path / "logs")
+    safe = "0x" + "6a" * 20
+    token, other = "0x" + "70" * 20, "0x" + "71" * 20
+    transfers = [
+        {"hash": "0xf", "blockNumber": "50", "contractAddress": token, "from": safe, "to": other, "value": "1"},
+        {"hash": "0xf", "blockNumber": "50", "contractAddress": token, "from": safe, "to": other, "value": "2"},
+        {"hash": "0xf", "blockNumber": "50", "contractAddress": other, "from": other, "to": safe, "value": "1"},
+    ]
+    fake_etherscan.histories["tokentx"][safe] = transfers
+    store = etherscan_tracker.open_tx_log(safe)
+
+    assert len({etherscan_tracker.record_key(row, "tokentx") for row in transfers}) == 3
+    assert etherscan_tracker.ingest_new_transactions(safe, store, "key", actions=("tokentx",)) == 3
+    assert etherscan_tracker.open_tx_index().count(safe) == 3
+    assert etherscan_tracker.ingest_new_transactions(safe, store, "key", actions=("tokentx",)) == 0
+    assert not etherscan_tracker.has_new_transactions(safe, "key", actions=("tokentx",))
+
+
+def test_legacy_tracker_loop_probes_before_polling_once_idle(monkeypatch, tmp_path):
+    monkeypatch.setattr(etherscan_tracker, "CURSOR_PATH", tmp_path / "cursors.json")
+    monkeypatch.setattr(etherscan_tracker, "LOG_ROOT", tmp_path / "logs")
+    monkeypatch.setattr(etherscan_tracker, "load_safe_state", lambda: {"address": "0x" + "5a" * 20})
+    monkeypatch.setattr(etherscan_tracker, "get_etherscan_api_key", lambda: "key")
+    monkeypatch.setattr(etherscan_tracker.metrics, "write_file", lambda: None)
+    calls = []
+    logged = iter([2, 0])
+
+    def _ingest(address, store, api_key, rate_limiter=None, actions=()):
+        calls.append(("poll", actions))
+        return next(logged)
+
+    def _probe(address, api_key=None, rate_limiter=None, actions=()):
+        calls.append(("probe", actions))
+        return False
+
+    def _sleep(seconds):
+        if len(calls) >= 4:
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(etherscan_tracker, "ingest_new_transactions", _ingest)
+    monkeypatch.setattr(etherscan_tracker, "has_new_transactions", _probe)
+    monkeypatch.setattr(etherscan_tracker.time, "sleep", _sleep)
+
+    with pytest.raises(KeyboardInterrupt):
+        etherscan_tracker.track_safe_transactions()
+
+    assert [kind for kind, _ in calls] == ["poll", "poll", "probe", "probe"]
+    assert all(actions == etherscan_tracker.ACTIONS for _, actions in calls)
+
+
+def test_legacy_log_import_is_normalized_and_deduplicated(fake_etherscan, monkeypatch, tmp_path):
+    from gnomon.core.safe_manager import safe_state_store
+
+    monkeypatch.setattr(etherscan_tracker, "CURSOR_PATH", tmp_path / "cursors.json")
+    monkeypatch.setattr(etherscan_tracker, "LOG_ROOT", tmp_path / "logs")
+    monkeypatch.setattr(etherscan_tracker, "LOG_PATH", tmp_path / "legacy.json")
+    monkeypatch.setattr(etherscan_tracker, "SAFE_STATE_PATH", tmp_path / "safe_state.json")
+    safe = "0x" + "6b" * 20
+    safe_state_store(tmp_path / "safe_state.json").put({"address": safe, "owners": ["0x1", "0x2", "0x3"]})
+    history = [{"hash": "0x01", "blockNumber": "5"}, {"hash": "0x02", "blockNumber": "6"}]
+    (tmp_path / "legacy.json").write_text(json.dumps(history), encoding="utf-8")
+    fake_etherscan.transactions[safe] = [*history, {"hash": "0x03", "blockNumber": "7"}]
+
+    store = etherscan_tracker._prepare_tx_log(safe)
+    assert [(row["kind"], row["key"]) for row in store.tail(2)] == [("normal", "0x01"), ("normal", "0x02")]
+    assert [row["key"] for row in etherscan_tracker.open_tx_index().query(safe=safe)] == ["0x02", "0x01"]
+
+    assert etherscan_tracker.ingest_new_transactions(safe, store, "key") == 1
+    assert [row["key"] for row in store.tail(3)] == ["0x01", "0x02", "0x03"]
+
+
+def test_legacy_log_is_imported_once_into_the_safe_that_owns_it(fake_etherscan, monkeypatch, tmp_path):
+    from gnomon.core.safe_manager import safe_state_store
+
+    monkeypatch.setattr(etherscan_tracker, "CURSOR_PATH", tmp_path / "cursors.json")
+    monkeypatch.setattr(etherscan_tracker, "LOG_ROOT", tmp_path / "logs")
+    monkeypatch.setattr(etherscan_tracker, "LOG_PATH", tmp_path / "legacy.json")
+    monkeypatch.setattr(etherscan_tracker, "SAFE_STATE_PATH", tmp_path / "safe_state.json")
+    owner, other = "0x" + "6c" * 20, "0x" + "6d" * 20
+    safe_state_store(tmp_path / "safe_state.json").put({"address": owner, "owners": ["0x1", "0x2", "0x3"]})
+    (tmp_path / "legacy.json").write_text(json.dumps([{"hash": "0x09", "blockNumber": "500"}]), encoding="utf-8")
+
+    other_store = etherscan_tracker._prepare_tx_log(other)
+    assert (tmp_path / "legacy.json").exists()  # not this Safe's log
+    owner_store = etherscan_tracker._prepare_tx_log(owner.upper().replace("0X", "0x"))
+
+    assert len(other_store) == 0
+    assert etherscan_tracker.load_cursor(other) == {"lastBlock": None, "hashes": []}
+    assert [row["key"] for row in owner_store.tail(1)] == ["0x09"]
+    assert etherscan_tracker.load_cursor(owner) == {"lastBlock": 500, "hashes": ["0x09"]}
+    assert etherscan_tracker.load_cursor(owner, "tokentx") == {"lastBlock": None, "hashes": []}
+    assert not (tmp_path / "legacy.json").exists()
+    assert (tmp_path / "legacy.json.migrated").exists()
+
+    fresh = "0x" + "6e" * 20
+    assert len(etherscan_tracker._prepare_tx_log(fresh)) == 0
+    assert etherscan_tracker.open_tx_index().count(other) == etherscan_tracker.open_tx_index().count(fresh) == 0
@@ -0,0 +1,55 @@
+import json
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from gnomon.core import safe_manager
+from gnomon.core.safe_reader import SafeReader, SafeReadError, persist_safe_states
+
+OWNERS = [f"0x{i:040x}" for i in range(1, 4)]
+
+
+def test_many_safes_are_read_in_one_batch_and_persisted(stub_safe_rpc, tmp_path, monkeypatch):
+    monkeypatch.setattr(safe_manager, "SAFE_STATE_PATH", tmp_path / "gnosis_safe_state.json")
+    safes = [f"0x{i:040x}" for i in range(0xA0, 0xA4)]
+    for index, address in enumerate(safes):
+        stub_safe_rpc.safes[address] = {
+            "owners": OWNERS,
+            "threshold": 2,
+            "nonce": 40 + index,
+            "modules": [f"0x{0xF0 + index:040x}"],
+            "version": "1.3.0",
+        }
+    not_a_safe = f"0x{0xEE:040x}"
+
+    reader = SafeReader(stub_safe_rpc.url)
+    infos, errors = reader.read_many([*safes, not_a_safe])
+
+    assert len(stub_safe_rpc.batches) == 1
+    assert len(stub_safe_rpc.batches[0]) == 5 * 5
+    assert list(errors) == [not_a_safe]
+    assert isinstance(errors[not_a_safe], SafeReadError)
+    info = infos[safes[2]]
+    assert info.owners == OWNERS
+    assert (info.threshold, info.nonce, info.version) == (2, 42, "1.3.0")
+    assert info.modules == [f"0x{0xF2:040x}"]
+
+    persisted, failures = persist_safe_states(reader, safes)
+    assert set(persisted) == set(safes) and not failures
+    document = json.loads(safe_manager.SAFE_STATE_PATH.read_text(encoding="utf-8"))
+    assert document["safes"][safes[0]] == {"address": safes[0], "owners": OWNERS, "threshold": 2}
+
+
+def test_batches_are_split_at_the_call_cap(stub_safe_rpc):
+    safes = [f"0x{i:040x}" for i in range(0xB0, 0xB5)]
+    for address in safes:
+        stub_safe_rpc.safes[address] = {"owners": OWNERS, "threshold": 1, "nonce": 0, "modules": [], "version": "1.4.1"}
+
+    infos, errors = SafeReader(stub_safe_rpc.url, max_batch_calls=10).read_many(safes)
+
+    assert set(infos) == set(safes) and not errors
+    assert [len(batch) for batch in stub_safe_rpc.batches] == [10, 10, 5]
+    assert SafeReader(stub_safe_rpc.url).read(safes[0]).modules == []
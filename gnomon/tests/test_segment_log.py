@@ -0,0 +1,35 @@
+import json
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from gnomon.utils.segment_log import SegmentedLogStore
+
+
+def test_segments_rotate_and_stream_in_order(tmp_path):
+    store = SegmentedLogStore(tmp_path / "log", segment_max_records=3)
+    store.append({"n": n} for n in range(5))
+    store.append([{"n": 5}, {"n": 6}])
+
+    manifest = json.loads((tmp_path / "log" / "manifest.json").read_text(encoding="utf-8"))
+    assert [segment["records"] for segment in manifest["segments"]] == [3, 3]
+    assert manifest["active"] == "00000003.jsonl"
+    assert len(store) == 7
+    assert [row["n"] for row in store.iter_records()] == list(range(7))
+    assert [row["n"] for row in store.tail(4)] == [3, 4, 5, 6]
+
+
+def test_reopen_truncates_torn_trailing_write(tmp_path):
+    store = SegmentedLogStore(tmp_path / "log", segment_max_records=10)
+    store.append([{"n": 1}, {"n": 2}])
+    with open(tmp_path / "log" / "00000001.jsonl", "ab") as handle:
+        handle.write(b'{"n": 3')  # simulated crash mid-append
+
+    reopened = SegmentedLogStore(tmp_path / "log", segment_max_records=10)
+    reopened.append([{"n": 3}])
+
+    assert len(reopened) == 3
+    assert [row["n"] for row in reopened.iter_records()] == [1, 2, 3]
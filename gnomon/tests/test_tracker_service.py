@@ -0,0 +1,98 @@
+import asyncio
+import random
+
+from gnomon.api import etherscan_tracker
+from gnomon.api.tracker_service import TrackerService
+from gnomon.utils.poll_schedule import AdaptiveInterval
+from gnomon.utils.rate_limiter import RateLimiter
+
+
+def _history(prefix: str, count: int) -> list[dict]:
+    return [{"hash": f"0x{prefix}{n:04d}", "blockNumber": str(1000 + n)} for n in range(count)]
+
+
+def test_service_polls_many_safes_under_one_budget(fake_etherscan, monkeypatch, tmp_path):
+    monkeypatch.setattr(etherscan_tracker, "CURSOR_PATH", tmp_path / "cursors.json")
+    monkeypatch.setattr(etherscan_tracker, "LOG_ROOT", tmp_path / "logs")
+    monkeypatch.setattr(etherscan_tracker, "LOG_PATH", tmp_path / "legacy.json")
+    safes = [f"0x{n:040x}" for n in range(1, 5)]
+    for index, address in enumerate(safes):
+        fake_etherscan.transactions[address] = _history(f"{index}", 5 + index)
+
+    budget = RateLimiter(rate=10, capacity=2)
+    service = TrackerService(safes, api_key="key", rate_limiter=budget)
+
+    first = asyncio.run(service.run_once())
+    fake_etherscan.transactions[safes[0]].append({"hash": "0xnew", "blockNumber": "5000"})
+    second = asyncio.run(service.run_once())
+
+    assert first == {address: 5 + index for index, address in enumerate(safes)}
+    assert second == {safes[0]: 1, safes[1]: 0, safes[2]: 0, safes[3]: 0}
+    assert [row["hash"] for row in service.safes[safes[0]].store.tail(1)] == ["0xnew"]
+
+    stamps = [stamp for stamp, _ in fake_etherscan.requests]
+    assert len(stamps) == 8
+    # Two burst tokens, then one call per 100ms across all pollers.
+    assert stamps[-1] - stamps[0] >= 0.55
+    assert budget.stats()["waits"] >= 6
+
+
+def test_idle_safes_are_probed_and_back_off(fake_etherscan, monkeypatch, tmp_path):
+    monkeypatch.setattr(etherscan_tracker, "CURSOR_PATH", tmp_path / "cursors.json")
+    monkeypatch.setattr(etherscan_tracker, "LOG_ROOT", tmp_path / "logs")
+    monkeypatch.setattr(etherscan_tracker, "LOG_PATH", tmp_path / "legacy.json")
+    safe = "0x" + "ab" * 20
+    fake_etherscan.transactions[safe] = _history("a", 3)
+    budget = RateLimiter(rate=1000, capacity=1000)
+    service = TrackerService([safe], api_key="key", rate_limiter=budget, poll_interval=10, max_interval=35)
+    tracked = service.safes[safe]
+
+    def poll():
+        before = len(fake_etherscan.requests)
+        logged = asyncio.run(service.run_once())[safe]
+        return logged, [params for _, params in fake_etherscan.requests[before:]]
+
+    logged, calls = poll()  # active: full poll, no probe
+    assert (logged, [call["offset"] for call in calls]) == (3, ["1000"])
+    logged, calls = poll()  # still looked active: full poll finds nothing
+    assert (logged, len(calls), tracked.schedule.current) == (0, 1, 20)
+    logged, calls = poll()  # idle: one-row probe only
+    assert (logged, [(call["offset"], call["sort"]) for call in calls]) == (0, [("1", "desc")])
+    assert (tracked.skipped, tracked.schedule.current) == (1, 35)
+
+    fake_etherscan.transactions[safe].append({"hash": "0xlate", "blockNumber": "2000"})
+    logged, calls = poll()  # probe sees the change, full poll follows
+    assert (logged, [call["offset"] for call in calls]) == (1, ["1", "1000"])
+    assert tracked.schedule.current == 10
+
+
+def test_idle_probe_costs_less_than_a_poll_of_every_endpoint(fake_etherscan, monkeypatch, tmp_path):
+    monkeypatch.setattr(etherscan_tracker, "CURSOR_PATH", tmp_path / "cursors.json")
+    monkeypatch.setattr(etherscan_tracker, "LOG_ROOT", tmp_path / "logs")
+    monkeypatch.setattr(etherscan_tracker, "LOG_PATH", tmp_path / "legacy.json")
+    safe = "0x" + "cd" * 20
+    fake_etherscan.transactions[safe] = _history("c", 2)
+    budget = RateLimiter(rate=1000, capacity=1000)
+    service = TrackerService([safe], api_key="key", rate_limiter=budget, actions=etherscan_tracker.ACTIONS)
+
+    def cycle():
+        before = len(fake_etherscan.requests)
+        asyncio.run(service.run_once())
+        return [params["action"] for _, params in fake_etherscan.requests[before:]]
+
+    assert sorted(cycle()) == sorted(etherscan_tracker.ACTIONS)  # active: every endpoint
+    assert len(cycle()) == len(etherscan_tracker.ACTIONS)  # still looked active
+    probes = [cycle() for _ in range(3)]  # idle: txlist plus one other endpoint each
+    assert all(len(calls) == 2 and calls[0] == "txlist" for calls in probes)
+    assert {calls[1] for calls in probes} == set(etherscan_tracker.ACTIONS[1:])
+    assert service.safes[safe].skipped == 3
+
+
+def test_adaptive_interval_jitter_and_ceiling():
+    schedule = AdaptiveInterval(30, 100, jitter=0.2)
+    assert [schedule.record(False) for _ in range(3)] == [60, 100, 100]
+    rng = random.Random(7)
+    delays = [schedule.next_delay(rng) for _ in range(200)]
+    assert all(80 <= delay <= 120 for delay in delays)
+    assert len({round(delay, 3) for delay in delays}) > 100
+    assert schedule.record(True) == 30 and schedule.idle_streak == 0
@@ -0,0 +1,70 @@
+import json
+
+from gnomon.api import etherscan_tracker, tx_index
+from gnomon.api.tx_index import TxIndex
+
+SAFE = "0x" + "5a" * 20
+ALICE = "0x" + "a1" * 20
+TOKEN = "0x" + "70" * 20
+
+
+def _records() -> list[dict]:
+    return [
+        {"kind": "normal", "key": "0x01", "hash": "0x01", "blockNumber": "10", "timeStamp": "100",
+         "from": SAFE, "to": "0x" + "A1" * 20, "value": "1", "input": "0xa9059cbb" + "00" * 64},
+        {"kind": "erc20", "key": "0x01:4", "hash": "0x01", "blockNumber": "10", "timeStamp": "100",
+         "from": SAFE, "to": ALICE, "value": "5", "contractAddress": TOKEN, "input": "deprecated"},
+        {"kind": "internal", "key": "0x02:0", "hash": "0x02", "blockNumber": "20", "timeStamp": "200",
+         "from": ALICE, "to": SAFE, "value": "7", "input": ""},
+        {"hash": "0x03", "blockNumber": "30", "from": SAFE, "to": TOKEN, "value": "0", "methodId": "0x095ea7b3"},
+    ]
+
+
+def test_index_answers_lookups_from_indexes(tmp_path):
+    index = TxIndex(tmp_path / "index.sqlite3")
+    assert index.add(SAFE, _records()) == 4
+    assert index.add(SAFE, _records()) == 0  # re-ingesting a batch is harmless
+
+    assert [row["key"] for row in index.get("0x01")] == ["0x01", "0x01:4"]
+    assert [row["key"] for row in index.query(counterparty=ALICE)] == ["0x02:0", "0x01", "0x01:4"]
+    assert [row["key"] for row in index.query(counterparty=TOKEN)] == ["0x03"]
+    assert [row["hash"] for row in index.query(start_block=15, end_block=30)] == ["0x03", "0x02"]
+    assert [row["key"] for row in index.query(selector="0xA9059CBB")] == ["0x01"]
+    assert [row["hash"] for row in index.query(selector="0x095ea7b3")] == ["0x03"]
+    assert [row["key"] for row in index.query(kind="erc20", safe="0x" + "5A" * 20)] == ["0x01:4"]
+    assert index.query(limit=1)[0] == {"kind": "normal", "key": "0x03", **_records()[3], "safe": SAFE}
+    assert index.count() == index.count(SAFE) == 4
+
+    plans = {
+        name: " ".join(row[-1] for row in index._conn.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+        for name, sql, params in (
+            ("records_hash", "SELECT * FROM records WHERE hash = ?", ("0x01",)),
+            ("records_sender", "SELECT * FROM records WHERE sender = ?", (ALICE,)),
+            ("records_block", "SELECT * FROM records WHERE block BETWEEN ? AND ?", (1, 2)),
+            ("records_selector", "SELECT * FROM records WHERE selector = ?", ("0xa9059cbb",)),
+        )
+    }
+    assert all(name in plan for name, plan in plans.items()), plans
+
+    assert index.rebuild(SAFE, _records()[:2]) == 2
+    assert index.count(SAFE) == 2
+
+
+def test_ingest_fills_index_and_cli_queries_it(fake_etherscan, monkeypatch, tmp_path, capsys):
+    monkeypatch.setattr(etherscan_tracker, "CURSOR_PATH", tmp_path / "cursors.json")
+    monkeypatch.setattr(etherscan_tracker, "LOG_ROOT", tmp_path / "logs")
+    fake_etherscan.transactions[SAFE] = [
+        {"hash": f"0x{n:02x}", "blockNumber": str(100 + n), "from": ALICE if n % 2 else SAFE, "to": SAFE}
+        for n in range(6)
+    ]
+    store = etherscan_tracker.open_tx_log(SAFE)
+
+    assert etherscan_tracker.ingest_new_transactions(SAFE, store, "key", batch_size=4) == 6
+    assert etherscan_tracker.open_tx_index().count(SAFE) == 6
+
+    tx_index.main(["find", "--counterparty", ALICE, "--to-block", "104"])
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [row["hash"] for row in lines] == ["0x03", "0x01"]
+
+    tx_index.main(["reindex"])
+    assert f"{SAFE}: 6 records indexed" in capsys.readouterr().out
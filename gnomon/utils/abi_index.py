@@ -0,0 +1,152 @@
+"""Function-selector and event-topic index over cached ABIs.
+
+Each chain has an append-only ``abi/index/<chainId>.jsonl``. Indexing an ABI
+appends one line: the first time an ``abiSha256`` is seen the line carries
+its selector/topic → fragment tables, later addresses sharing that ABI (for
+example proxies of one implementation) only reference the hash. Replaying
+the file rebuilds dictionaries giving O(1) lookups by ``(address, selector)``
+and, for unknown addresses, by selector alone.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from pathlib import Path
+from typing import Any, Iterable
+
+from .keccak import keccak256
+
+
+def canonical_type(param: dict[str, Any]) -> str:
+    """Return the canonical Solidity type used in signatures (tuples expanded)."""
+    param_type = param.get("type", "")
+    if param_type.startswith("tuple"):
+        inner = ",".join(canonical_type(component) for component in param.get("components") or [])
+        return f"({inner}){param_type[len('tuple'):]}"
+    return param_type
+
+
+def fragment_signature(fragment: dict[str, Any]) -> str:
+    inputs = ",".join(canonical_type(param) for param in fragment.get("inputs") or [])
+    return f"{fragment.get('name', '')}({inputs})"
+
+
+def function_selector(fragment: dict[str, Any]) -> str:
+    return "0x" + keccak256(fragment_signature(fragment).encode("utf-8"))[:4].hex()
+
+
+def event_topic(fragment: dict[str, Any]) -> str:
+    return "0x" + keccak256(fragment_signature(fragment).encode("utf-8")).hex()
+
+
+def build_tables(abi: Iterable[dict[str, Any]]) -> tuple[dict[str, dict], dict[str, dict]]:
+    """Return ``(functions, events)`` keyed by selector and topic0."""
+    functions: dict[str, dict] = {}
+    events: dict[str, dict] = {}
+    for fragment in abi:
+        fragment_type = fragment.get("type", "function")
+        if fragment_type == "function":
+            functions[function_selector(fragment)] = fragment
+        elif fragment_type == "event" and not fragment.get("anonymous"):
+            events[event_topic(fragment)] = fragment
+    return functions, events
+
+
+def _normalize_selector(selector: str, length: int) -> str:
+    selector = selector.strip().lower()
+    if not selector.startswith("0x"):
+        selector = f"0x{selector}"
+    return selector[: 2 + length]
+
+
+class SelectorIndex:
+    """Per-chain selector/topic index persisted as JSONL."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._tables: dict[str, tuple[dict[str, dict], dict[str, dict]]] = {}
+        self._address_abi: dict[str, str] = {}
+        self._functions_by_address: dict[tuple[str, str], dict] = {}
+        self._events_by_address: dict[tuple[str, str], dict] = {}
+        self._functions: dict[str, dict] = {}
+        self._events: dict[str, dict] = {}
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        with open(self.path, "rb+") as handle:
+            data = handle.read()
+            end = data.rfind(b"\n") + 1
+            if end < len(data):
+                # Drop a torn trailing write so the next append starts a clean line.
+                handle.truncate(end)
+        for line in data[:end].splitlines():
+            try:
+                entry = json.loads(line)
+                address, abi_sha256 = entry["address"], entry["abiSha256"]
+                if "functions" in entry:
+                    self._tables[abi_sha256] = (dict(entry["functions"]), dict(entry["events"]))
+            except (ValueError, KeyError, TypeError):  # malformed line
+                continue
+            # An address whose tables were lost stays unindexed and is re-added on next resolve.
+            if abi_sha256 in self._tables:
+                self._link(address, abi_sha256)
+
+    def _link(self, address: str, abi_sha256: str) -> None:
+        previous = self._address_abi.get(address)
+        if previous is not None and previous != abi_sha256:
+            # The address moved to another ABI (e.g. a proxy upgrade); forget the old fragments.
+            old_functions, old_events = self._tables.get(previous, ({}, {}))
+            for selector in old_functions:
+                self._functions_by_address.pop((address, selector), None)
+            for topic in old_events:
+                self._events_by_address.pop((address, topic), None)
+        functions, events = self._tables[abi_sha256]
+        self._address_abi[address] = abi_sha256
+        for selector, fragment in functions.items():
+            self._functions_by_address[(address, selector)] = fragment
+            self._functions.setdefault(selector, fragment)
+        for topic, fragment in events.items():
+            self._events_by_address[(address, topic)] = fragment
+            self._events.setdefault(topic, fragment)
+
+    def __contains__(self, address: str) -> bool:
+        return address.lower() in self._address_abi
+
+    def add_abi(self, address: str, abi: Iterable[dict[str, Any]], abi_sha256: str) -> None:
+        """Index ``abi`` for ``address`` and persist it, skipping unchanged entries."""
+        address = address.lower()
+        with self._lock:
+            if self._address_abi.get(address) == abi_sha256:
+                return
+            entry: dict[str, Any] = {"address": address, "abiSha256": abi_sha256}
+            if abi_sha256 not in self._tables:
+                functions, events = build_tables(abi)
+                self._tables[abi_sha256] = (functions, events)
+                entry["functions"] = functions
+                entry["events"] = events
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as handle:
+                handle.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            self._link(address, abi_sha256)
+
+    def lookup_function(self, selector: str, address: str | None = None) -> dict[str, Any] | None:
+        """Return the function fragment for a 4-byte selector (or full calldata)."""
+        selector = _normalize_selector(selector, 8)
+        if address is not None:
+            fragment = self._functions_by_address.get((address.lower(), selector))
+            if fragment is not None:
+                return fragment
+        return self._functions.get(selector)
+
+    def lookup_event(self, topic: str, address: str | None = None) -> dict[str, Any] | None:
+        """Return the event fragment for ``topic0``."""
+        topic = _normalize_selector(topic, 64)
+        if address is not None:
+            fragment = self._events_by_address.get((address.lower(), topic))
+            if fragment is not None:
+                return fragment
+        return self._events.get(topic)
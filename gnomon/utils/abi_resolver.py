@@ -8,50 +8,98 @@ import logging
 import os
 import threading
 import time
-from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from http.client import HTTPException
 from pathlib import Path
 from typing import Any
+from urllib.error import HTTPError
 
 import requests
 
+from .abi_index import SelectorIndex
+from .abi_store import DEFAULT_STORE_NAME, AbiStore
+from .bounded_cache import BoundedCache
+from .fs import atomic_write_bytes, atomic_write_json, locked_file
+from . import metrics
+from .lazy_abi import LazyAbiPayload
+from .negative_cache import NETWORK, NOT_VERIFIED, RATE_LIMITED, NegativeCache
+from .rate_limiter import etherscan_rate_limiter
+from .single_flight import SingleFlight
+
 logger = logging.getLogger(__name__)
 
 DEFAULT_CHAIN_ID = 1
 DEFAULT_ETHERSCAN_BASE_URL = "https://api.etherscan.io/api"
 ABI_ROOT = Path("abi")
 ADDRESS_ABI_ROOT = ABI_ROOT / "address"
+INDEX_ROOT = ABI_ROOT / "index"
+NEGATIVE_CACHE_PATH = ABI_ROOT / "negative-cache.json"
+LOCK_ROOT = ABI_ROOT / "locks"
 ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
-
-
-class _RateLimiter:
-    """Simple sleep-based limiter constrained to 3 calls per second."""
-
-    def __init__(self, max_calls: int = 3, period_seconds: float = 1.0):
-        self.max_calls = max_calls
-        self.period_seconds = period_seconds
-        self._calls: deque[float] = deque()
-        self._lock = threading.Lock()
-
-    def acquire(self) -> None:
-        while True:
-            sleep_for = 0.0
-            with self._lock:
-                now = time.monotonic()
-                while self._calls and now - self._calls[0] >= self.period_seconds:
-                    self._calls.popleft()
-                if len(self._calls) < self.max_calls:
-                    self._calls.append(now)
-                    return
-                sleep_for = self.period_seconds - (now - self._calls[0])
-            if sleep_for > 0:
-                time.sleep(sleep_for)
-
-
-_RATE_LIMITER = _RateLimiter()
-_ABI_CACHE: dict[tuple[int, str], dict[str, Any]] = {}
-_FILE_CACHE: dict[tuple[int, str], Path] = {}
-_FETCH_ONCE_CACHE: dict[tuple[int, str], bool] = {}
+DEFAULT_BATCH_WORKERS = 4
+# Per-address locks hash onto a fixed set of lock files so ``abi/locks`` stays bounded.
+LOCK_STRIPES = 256
+
+_RATE_LIMITER = etherscan_rate_limiter()
+
+
+def _env_limit(name: str, default: int | None) -> int | None:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _payload_size(payload: dict[str, Any]) -> int:
+    # Entries are charged for their JSON text, which is all the cache keeps.
+    if isinstance(payload, LazyAbiPayload):
+        return payload.nbytes
+    return len(json.dumps(payload, separators=(",", ":")))
+
+
+# Process-local caches are LRU-bounded for long-running workers; tune with
+# GNOMAN_ABI_CACHE_MAX_ENTRIES / _MAX_BYTES and GNOMAN_FILE_CACHE_MAX_ENTRIES.
+_ABI_CACHE: BoundedCache[dict[str, Any]] = BoundedCache(
+    max_entries=_env_limit("GNOMAN_ABI_CACHE_MAX_ENTRIES", 2048),
+    max_bytes=_env_limit("GNOMAN_ABI_CACHE_MAX_BYTES", None),
+    sizeof=_payload_size,
+)
+_FILE_CACHE: BoundedCache[Path] = BoundedCache(max_entries=_env_limit("GNOMAN_FILE_CACHE_MAX_ENTRIES", 8192))
+_ABI_STORES: dict[Path, AbiStore] = {}
+_ABI_STORES_LOCK = threading.Lock()
+_SELECTOR_INDEXES: dict[Path, SelectorIndex] = {}
+_NEGATIVE_CACHES: dict[Path, NegativeCache] = {}
+_POPULATE_FLIGHTS: SingleFlight[tuple[Path, dict[str, Any]]] = SingleFlight()
+
+# Stale-while-revalidate: with a max-age set (GNOMAN_ABI_MAX_AGE seconds or
+# configure_revalidation), cached Etherscan ABIs are served immediately and
+# re-checked in the background once older than the max-age.
+_REVALIDATE_MAX_AGE: float | None = (
+    float(os.environ["GNOMAN_ABI_MAX_AGE"]) if os.getenv("GNOMAN_ABI_MAX_AGE") else None
+)
+_REVALIDATE_DUE: BoundedCache[float] = BoundedCache(max_entries=8192)
+_REVALIDATING: set[tuple[int, str]] = set()
+_REVALIDATING_LOCK = threading.Lock()
+_REVALIDATION_EXECUTOR: ThreadPoolExecutor | None = None
+
+_CACHE_LOOKUPS = metrics.counter(
+    "gnoman_abi_cache_lookups_total", "ABI cache lookups by cache layer and result", ("cache", "result")
+)
+_DISK_READ_SECONDS = metrics.histogram("gnoman_abi_disk_read_seconds", "Time to read a cached ABI from disk")
+_FETCH_SECONDS = metrics.histogram(
+    "gnoman_abi_fetch_seconds", "Time to fetch and cache an ABI from Etherscan", ("result",)
+)
+_NEGATIVE_HITS = metrics.counter(
+    "gnoman_abi_negative_cache_hits_total", "Lookups answered by a cached failure", ("reason",)
+)
+
+
+class AbiFetchError(RuntimeError):
+    """ABI could not be fetched; ``reason`` is the negative-cache class or ``None``."""
+
+    def __init__(self, message: str, reason: str | None = None, cached: bool = False):
+        super().__init__(message)
+        self.reason = reason
+        self.cached = cached
 
 
 def _normalize_address(address: str) -> str:
@@ -69,6 +117,12 @@ def _address_meta_path(chain_id: int, address: str) -> Path:
     return ADDRESS_ABI_ROOT / str(chain_id) / f"{_normalize_address(address)}.meta.json"
 
 
+def _address_lock_path(chain_id: int, address: str) -> Path:
+    digest = hashlib.sha256(_normalize_address(address).encode("ascii")).digest()
+    stripe = int.from_bytes(digest[:4], "big") % LOCK_STRIPES
+    return LOCK_ROOT / str(chain_id) / f"{stripe:03d}.lock"
+
+
 def _read_abi_file(path: Path) -> dict[str, Any]:
     with open(path, encoding="utf-8") as handle:
         parsed = json.load(handle)
@@ -79,26 +133,61 @@ def _read_abi_file(path: Path) -> dict[str, Any]:
     raise ValueError(f"Unexpected ABI payload in {path}")
 
 
-def _write_address_cache(
+def _abi_store() -> AbiStore | None:
+    """Return the SQLite ABI store when ``GNOMAN_ABI_STORE=sqlite`` is set."""
+    if os.getenv("GNOMAN_ABI_STORE", "").strip().lower() != "sqlite":
+        return None
+    path = (ABI_ROOT / DEFAULT_STORE_NAME).resolve()
+    with _ABI_STORES_LOCK:
+        store = _ABI_STORES.get(path)
+        if store is None:
+            store = _ABI_STORES[path] = AbiStore(path)
+        return store
+
+
+def _selector_index(chain_id: int) -> SelectorIndex:
+    path = (INDEX_ROOT / f"{chain_id}.jsonl").resolve()
+    with _ABI_STORES_LOCK:
+        index = _SELECTOR_INDEXES.get(path)
+        if index is None:
+            index = _SELECTOR_INDEXES[path] = SelectorIndex(path)
+        return index
+
+
+def _negative_cache() -> NegativeCache:
+    path = NEGATIVE_CACHE_PATH.resolve()
+    with _ABI_STORES_LOCK:
+        cache = _NEGATIVE_CACHES.get(path)
+        if cache is None:
+            cache = _NEGATIVE_CACHES[path] = NegativeCache(path)
+        return cache
+
+
+def _canonical_abi_json(abi_payload: dict[str, Any]) -> str:
+    if isinstance(abi_payload, LazyAbiPayload):
+        return abi_payload.canonical_json()
+    return json.dumps(abi_payload, sort_keys=True, separators=(",", ":"))
+
+
+def _compact_payload(abi_payload: dict[str, Any]) -> LazyAbiPayload:
+    """Return the lazily decoded form kept in ``_ABI_CACHE`` and handed to callers."""
+    if isinstance(abi_payload, LazyAbiPayload):
+        return abi_payload
+    return LazyAbiPayload(_canonical_abi_json(abi_payload), canonical=True)
+
+
+def _abi_metadata(
     chain_id: int,
     original_address: str,
-    abi_payload: dict[str, Any],
+    abi_json_canonical: str,
     *,
     abi_target_address: str,
     is_proxy: bool,
     implementation: str | None,
     abi_name_hint: str | None,
     source: str,
-) -> Path:
-    abi_path = _address_abi_path(chain_id, original_address)
-    meta_path = _address_meta_path(chain_id, original_address)
-    abi_path.parent.mkdir(parents=True, exist_ok=True)
-
-    abi_json_canonical = json.dumps(abi_payload, sort_keys=True, separators=(",", ":"))
-    with open(abi_path, "w", encoding="utf-8") as handle:
-        json.dump(abi_payload, handle, indent=2)
-
-    metadata = {
+) -> dict[str, Any]:
+    return {
         "chainId": chain_id,
         "address": _normalize_address(original_address),
         "abiTargetAddress": _normalize_address(abi_target_address),
@@ -110,15 +199,76 @@ def _write_address_cache(
         "abiSha256": hashlib.sha256(abi_json_canonical.encode("utf-8")).hexdigest(),
     }
 
-    with open(meta_path, "w", encoding="utf-8") as handle:
-        json.dump(metadata, handle, indent=2)
 
+def _write_address_files(abi_path: Path, meta_path: Path, abi_json_canonical: str, metadata: dict[str, Any]) -> None:
+    # ABI files hold the minified canonical JSON that ``abiSha256`` is computed
+    # over. The ABI file marks the entry as cached, so it is replaced last.
+    atomic_write_json(meta_path, metadata)
+    atomic_write_bytes(abi_path, abi_json_canonical.encode("utf-8"))
+
+
+def _materialize_address_files(chain_id: int, address: str, store: AbiStore) -> Path:
+    """Write the json/meta pair for a store entry for callers that need a path.
+
+    An existing pair is kept only while its ``abiSha256`` matches the store, so
+    a path handed out before a revalidation never keeps serving the old ABI.
+    """
+    abi_path = _address_abi_path(chain_id, address)
+    meta_path = _address_meta_path(chain_id, address)
+    metadata = store.get_metadata(chain_id, address)
+    if abi_path.exists() and meta_path.exists():
+        try:
+            materialized = json.loads(meta_path.read_text(encoding="utf-8")).get("abiSha256")
+        except ValueError:
+            materialized = None
+        if materialized == metadata["abiSha256"]:
+            return abi_path
+    _write_address_files(abi_path, meta_path, store.get_body(chain_id, address), metadata)
+    return abi_path
+
+
+def _write_address_cache(
+    chain_id: int,
+    original_address: str,
+    abi_payload: dict[str, Any],
+    *,
+    abi_target_address: str,
+    is_proxy: bool,
+    implementation: str | None,
+    abi_name_hint: str | None,
+    source: str,
+) -> Path:
+    abi_path = _address_abi_path(chain_id, original_address)
+    abi_json_canonical = _canonical_abi_json(abi_payload)
+    metadata = _abi_metadata(
+        chain_id,
+        original_address,
+        abi_json_canonical,
+        abi_target_address=abi_target_address,
+        is_proxy=is_proxy,
+        implementation=implementation,
+        abi_name_hint=abi_name_hint,
+        source=source,
+    )
+
+    store = _abi_store()
+    if store is not None:
+        store.put(chain_id, metadata["address"], abi_json_canonical, metadata)
+        if abi_path.exists():  # keep a previously materialized path current
+            _write_address_files(abi_path, _address_meta_path(chain_id, original_address), abi_json_canonical, metadata)
+    else:
+        _write_address_files(abi_path, _address_meta_path(chain_id, original_address), abi_json_canonical, metadata)
+    _selector_index(chain_id).add_abi(metadata["address"], abi_payload["abi"], metadata["abiSha256"])
     return abi_path
 
 
-def _etherscan_request(action: str, *, chain_id: int, address: str, api_key: str) -> dict[str, Any]:
+def _etherscan_request(
+    action: str, *, chain_id: int, address: str, api_key: str, fresh: bool = False
+) -> dict[str, Any]:
+    """GET one contract ``action``; ``fresh`` bypasses the HTTP response cache."""
     _RATE_LIMITER.acquire()
     base_url = os.getenv("ETHERSCAN_BASE_URL", DEFAULT_ETHERSCAN_BASE_URL)
+    options = {"cache": False} if fresh else {}
     response = requests.get(
         base_url,
         params={
@@ -129,56 +279,123 @@ def _etherscan_request(action: str, *, chain_id: int, address: str, api_key: str
             "chainid": chain_id,
         },
         timeout=20,
+        **options,
     )
     response.raise_for_status()
     return response.json()
 
 
-def _resolve_via_etherscan(chain_id: int, original_address: str, abi_name_hint: str | None) -> Path:
-    key = (chain_id, _normalize_address(original_address))
-    if key in _FETCH_ONCE_CACHE:
-        raise RuntimeError(
-            f"ABI fetch already attempted for {original_address} on chain {chain_id} during this run"
+def _classify_etherscan_message(message: str) -> str | None:
+    lowered = message.lower()
+    if "rate limit" in lowered:
+        return RATE_LIMITED
+    if "not verified" in lowered:
+        return NOT_VERIFIED
+    return None
+
+
+def _resolve_via_etherscan(
+    chain_id: int, original_address: str, abi_name_hint: str | None
+) -> tuple[Path, dict[str, Any]]:
+    normalized_address = _normalize_address(original_address)
+    negative_cache = _negative_cache()
+    failure = negative_cache.lookup(chain_id, normalized_address)
+    if failure is not None:
+        _NEGATIVE_HITS.inc(reason=failure["reason"])
+        raise AbiFetchError(
+            f"Failed to fetch ABI from Etherscan for {original_address}: {failure['message']} "
+            f"(cached {failure['reason']} failure)",
+            reason=failure["reason"],
+            cached=True,
         )
-    _FETCH_ONCE_CACHE[key] = True
 
     api_key = os.getenv("ETHERSCAN_API_KEY")
     if not api_key:
         raise RuntimeError("Missing ABI and no ETHERSCAN_API_KEY configured")
 
-    logger.info("ABI cache miss → fetching from Etherscan: %s chainId=%s", original_address, chain_id)
-
-    source_data = _etherscan_request("getsourcecode", chain_id=chain_id, address=original_address, api_key=api_key)
-    implementation = None
-    is_proxy = False
+    started = time.perf_counter()
+    try:
+        result = _fetch_from_etherscan(chain_id, original_address, abi_name_hint, api_key)
+        _FETCH_SECONDS.observe(time.perf_counter() - started, result="ok")
+        return result
+    except AbiFetchError as exc:
+        _FETCH_SECONDS.observe(time.perf_counter() - started, result=exc.reason or "error")
+        if exc.reason is not None:
+            negative_cache.record(chain_id, normalized_address, exc.reason, str(exc))
+        raise
+    except (HTTPError, ConnectionError, TimeoutError, HTTPException) as exc:
+        reason = RATE_LIMITED if isinstance(exc, HTTPError) and exc.code == 429 else NETWORK
+        _FETCH_SECONDS.observe(time.perf_counter() - started, result=reason)
+        negative_cache.record(chain_id, normalized_address, reason, str(exc))
+        raise AbiFetchError(
+            f"Failed to fetch ABI from Etherscan for {original_address}: {exc}", reason=reason
+        ) from exc
+
+
+def _fetch_source_info(
+    chain_id: int, original_address: str, api_key: str, fresh: bool = False
+) -> tuple[str | None, dict[str, Any]]:
+    """Return ``(implementation, source_row)``; ``implementation`` is ``None`` for non-proxies."""
+    source_data = _etherscan_request(
+        "getsourcecode", chain_id=chain_id, address=original_address, api_key=api_key, fresh=fresh
+    )
     source_result = source_data.get("result")
+    if isinstance(source_result, str) and str(source_data.get("status", "")) != "1":
+        raise AbiFetchError(
+            f"Failed to fetch ABI from Etherscan for {original_address}: {source_result}",
+            reason=_classify_etherscan_message(source_result),
+        )
+    source_row: dict[str, Any] = {}
+    implementation = None
     if isinstance(source_result, list) and source_result:
-        implementation = (source_result[0].get("Implementation") or "").strip()
-        if implementation and implementation.lower() != ZERO_ADDRESS:
-            is_proxy = True
+        source_row = source_result[0]
+        implementation = (source_row.get("Implementation") or "").strip()
+        if not implementation or implementation.lower() == ZERO_ADDRESS:
+            implementation = None
+    return (_normalize_address(implementation) if implementation else None), source_row
 
-    abi_target = implementation if is_proxy else original_address
-    if is_proxy:
-        logger.info(
-            "Proxy detected → implementation=%s (caching ABI for original address)",
-            _normalize_address(abi_target),
-        )
 
-    abi_data = _etherscan_request("getabi", chain_id=chain_id, address=abi_target, api_key=api_key)
+def _fetch_abi(
+    chain_id: int, original_address: str, abi_target: str, api_key: str, fresh: bool = False
+) -> list[dict[str, Any]]:
+    abi_data = _etherscan_request("getabi", chain_id=chain_id, address=abi_target, api_key=api_key, fresh=fresh)
     status = str(abi_data.get("status", ""))
     result = abi_data.get("result")
     if status != "1" or not isinstance(result, str):
         message = abi_data.get("result") or abi_data.get("message") or "Unknown Etherscan error"
-        raise RuntimeError(f"Failed to fetch ABI from Etherscan for {original_address}: {message}")
+        raise AbiFetchError(
+            f"Failed to fetch ABI from Etherscan for {original_address}: {message}",
+            reason=_classify_etherscan_message(str(message)),
+        )
 
     try:
         abi = json.loads(result)
     except json.JSONDecodeError as exc:
-        raise RuntimeError(f"Invalid ABI payload returned by Etherscan for {original_address}") from exc
+        raise AbiFetchError(f"Invalid ABI payload returned by Etherscan for {original_address}") from exc
 
     if not abi:
-        raise RuntimeError(f"Failed to fetch ABI from Etherscan for {original_address}: empty ABI response")
+        raise AbiFetchError(
+            f"Failed to fetch ABI from Etherscan for {original_address}: empty ABI response",
+            reason=NOT_VERIFIED,
+        )
+    return abi
+
+
+def _fetch_from_etherscan(
+    chain_id: int, original_address: str, abi_name_hint: str | None, api_key: str
+) -> tuple[Path, dict[str, Any]]:
+    logger.info("ABI cache miss → fetching from Etherscan: %s chainId=%s", original_address, chain_id)
+
+    implementation, _ = _fetch_source_info(chain_id, original_address, api_key)
+    is_proxy = implementation is not None
+    abi_target = implementation if is_proxy else original_address
+    if is_proxy:
+        logger.info(
+            "Proxy detected → implementation=%s (caching ABI for original address)",
+            _normalize_address(abi_target),
+        )
 
+    abi = _fetch_abi(chain_id, original_address, abi_target, api_key)
     payload = {"abi": abi}
     abi_path = _write_address_cache(
         chain_id,
@@ -190,22 +407,172 @@ def _resolve_via_etherscan(chain_id: int, original_address: str, abi_name_hint:
         abi_name_hint=abi_name_hint,
         source="etherscan",
     )
-    return abi_path
+    return abi_path, payload
+
+
+def _read_address_meta(chain_id: int, normalized_address: str) -> dict[str, Any] | None:
+    store = _abi_store()
+    if store is not None:
+        metadata = store.get_metadata(chain_id, normalized_address)
+        if metadata is not None:
+            return metadata
+    meta_path = _address_meta_path(chain_id, normalized_address)
+    if not meta_path.exists():
+        return None
+    with open(meta_path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def _mark_validated(chain_id: int, normalized_address: str, metadata: dict[str, Any]) -> None:
+    validated_at = datetime.now(timezone.utc).isoformat()
+    store = _abi_store()
+    if store is not None and store.has(chain_id, normalized_address):
+        store.mark_validated(chain_id, normalized_address, validated_at)
+    else:
+        atomic_write_json(_address_meta_path(chain_id, normalized_address), {**metadata, "validatedAt": validated_at})
+
+
+def configure_revalidation(max_age_seconds: float | None) -> None:
+    """Enable stale-while-revalidate for cached ABIs older than ``max_age_seconds`` (``None`` disables)."""
+    global _REVALIDATE_MAX_AGE
+    _REVALIDATE_MAX_AGE = max_age_seconds
+    _REVALIDATE_DUE.clear()
+
+
+def _revalidation_due_at(chain_id: int, normalized_address: str) -> float:
+    metadata = _read_address_meta(chain_id, normalized_address)
+    if not metadata or metadata.get("source") != "etherscan":
+        return float("inf")
+    stamps = [metadata.get("fetchedAt"), metadata.get("validatedAt")]
+    checked = max(datetime.fromisoformat(stamp).timestamp() for stamp in stamps if stamp)
+    return checked + _REVALIDATE_MAX_AGE
+
+
+def _maybe_revalidate(chain_id: int, normalized_address: str) -> None:
+    if _REVALIDATE_MAX_AGE is None:
+        return
+    key = (chain_id, normalized_address)
+    due = _REVALIDATE_DUE.get(key)
+    if due is None:
+        due = _revalidation_due_at(chain_id, normalized_address)
+        _REVALIDATE_DUE[key] = due
+    now = time.time()
+    if due > now:
+        return
+    _REVALIDATE_DUE[key] = now + _REVALIDATE_MAX_AGE
+    with _REVALIDATING_LOCK:
+        global _REVALIDATION_EXECUTOR
+        if key in _REVALIDATING:
+            return
+        _REVALIDATING.add(key)
+        if _REVALIDATION_EXECUTOR is None:
+            _REVALIDATION_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="abi-revalidate")
+    _REVALIDATION_EXECUTOR.submit(_revalidate_in_background, chain_id, normalized_address)
+
+
+def _revalidate_in_background(chain_id: int, normalized_address: str) -> None:
+    try:
+        revalidate_abi(chain_id, normalized_address)
+    except Exception as exc:  # the stale entry keeps being served
+        logger.warning("ABI revalidation failed for %s chainId=%s: %s", normalized_address, chain_id, exc)
+    finally:
+        with _REVALIDATING_LOCK:
+            _REVALIDATING.discard((chain_id, normalized_address))
 
 
-def resolve_abi_file_for_address(chain_id: int, address: str, abi_name_hint: str | None = None) -> Path:
+def revalidate_abi(chain_id: int, address: str) -> bool:
+    """Re-check ``getsourcecode`` for a cached ABI and return whether it was rewritten.
+
+    The cache is rewritten only when the proxy implementation changed or, for
+    non-proxies, when the verified ABI's ``abiSha256`` differs. Otherwise only
+    ``validatedAt`` is recorded.
+    """
+
     normalized_address = _normalize_address(address)
-    key = (chain_id, normalized_address)
+    api_key = os.getenv("ETHERSCAN_API_KEY")
+    if not api_key:
+        raise RuntimeError("ABI revalidation requires ETHERSCAN_API_KEY")
+
+    with locked_file(_address_lock_path(chain_id, normalized_address)):
+        metadata = _read_address_meta(chain_id, normalized_address)
+        if metadata is None:
+            return False
+        # Revalidation must see upstream, never a reply from the HTTP cache.
+        implementation, source_row = _fetch_source_info(chain_id, normalized_address, api_key, fresh=True)
+        abi = None
+        if implementation != metadata.get("implementation"):
+            abi = _fetch_abi(chain_id, normalized_address, implementation or normalized_address, api_key, fresh=True)
+        elif implementation is None:
+            try:
+                candidate = json.loads(source_row.get("ABI") or "")
+            except ValueError:  # "Contract source code not verified"
+                candidate = None
+            if candidate:
+                digest = hashlib.sha256(_canonical_abi_json({"abi": candidate}).encode("utf-8")).hexdigest()
+                if digest != metadata.get("abiSha256"):
+                    abi = candidate
+
+        if abi is None:
+            _mark_validated(chain_id, normalized_address, metadata)
+            return False
 
-    if key in _FILE_CACHE:
-        return _FILE_CACHE[key]
+        logger.info(
+            "ABI changed upstream → refreshing cache: %s chainId=%s implementation=%s",
+            normalized_address,
+            chain_id,
+            implementation,
+        )
+        _write_address_cache(
+            chain_id,
+            normalized_address,
+            {"abi": abi},
+            abi_target_address=implementation or normalized_address,
+            is_proxy=implementation is not None,
+            implementation=implementation,
+            abi_name_hint=metadata.get("abiNameHint"),
+            source="etherscan",
+        )
+    _ABI_CACHE.pop((chain_id, normalized_address))
+    return True
 
+
+def _read_cached_payload(chain_id: int, normalized_address: str) -> LazyAbiPayload | None:
+    store = _abi_store()
+    body = store.get_body(chain_id, normalized_address) if store is not None else None
+    if body is not None:
+        return LazyAbiPayload(body, canonical=True)
     address_path = _address_abi_path(chain_id, normalized_address)
-    if address_path.exists():
-        logger.info("ABI cache hit: %s", address_path.as_posix())
-        _FILE_CACHE[key] = address_path
-        return address_path
+    if not address_path.exists():
+        return None
+    try:
+        return LazyAbiPayload(address_path.read_text(encoding="utf-8"))
+    except ValueError as exc:
+        raise ValueError(f"Unexpected ABI payload in {address_path}: {exc}") from exc
+
+
+def _populate_address_cache(
+    chain_id: int, normalized_address: str, abi_name_hint: str | None
+) -> tuple[Path, dict[str, Any]]:
+    """Fill the cache for one address with at most one fetch in flight.
+
+    Threads in this process share a single flight per ``(chainId, address)``;
+    other processes using the same ``abi/`` directory are serialised by a lock
+    file and re-check the cache once they hold it.
+    """
 
+    def _locked() -> tuple[Path, dict[str, Any]]:
+        with locked_file(_address_lock_path(chain_id, normalized_address)):
+            payload = _read_cached_payload(chain_id, normalized_address)
+            if payload is not None:
+                return _address_abi_path(chain_id, normalized_address), payload
+            return _fill_address_cache(chain_id, normalized_address, abi_name_hint)
+
+    return _POPULATE_FLIGHTS.do((chain_id, normalized_address), _locked)
+
+
+def _fill_address_cache(
+    chain_id: int, normalized_address: str, abi_name_hint: str | None
+) -> tuple[Path, dict[str, Any]]:
     if abi_name_hint:
         for candidate in (ABI_ROOT / f"{abi_name_hint}.json", ABI_ROOT / f"_{abi_name_hint}.json"):
             if candidate.exists():
@@ -220,25 +587,207 @@ def resolve_abi_file_for_address(chain_id: int, address: str, abi_name_hint: str
                     abi_name_hint=abi_name_hint,
                     source="name-cache",
                 )
-                _FILE_CACHE[key] = cache_path
-                _ABI_CACHE[key] = payload
-                return cache_path
+                return cache_path, payload
 
-    abi_path = _resolve_via_etherscan(chain_id, normalized_address, abi_name_hint)
-    _FILE_CACHE[key] = abi_path
-    return abi_path
+    return _resolve_via_etherscan(chain_id, normalized_address, abi_name_hint)
 
 
-def resolve_abi_by_address(chain_id: int, address: str, abi_name_hint: str | None = None) -> dict[str, Any]:
+def resolve_abi_file_for_address(chain_id: int, address: str, abi_name_hint: str | None = None) -> Path:
     normalized_address = _normalize_address(address)
     key = (chain_id, normalized_address)
-    if key in _ABI_CACHE:
-        return _ABI_CACHE[key]
 
-    abi_file = resolve_abi_file_for_address(chain_id, normalized_address, abi_name_hint)
-    payload = _read_abi_file(abi_file)
+    cached_path = _FILE_CACHE.get(key)
+    if cached_path is not None:
+        _CACHE_LOOKUPS.inc(cache="file", result="hit")
+        _maybe_revalidate(chain_id, normalized_address)
+        return cached_path
+
+    store = _abi_store()
+    if store is not None and store.has(chain_id, normalized_address):
+        _CACHE_LOOKUPS.inc(cache="disk", result="hit")
+        address_path = _materialize_address_files(chain_id, normalized_address, store)
+        _FILE_CACHE[key] = address_path
+        _maybe_revalidate(chain_id, normalized_address)
+        return address_path
+
+    address_path = _address_abi_path(chain_id, normalized_address)
+    if address_path.exists():
+        _CACHE_LOOKUPS.inc(cache="disk", result="hit")
+        logger.info("ABI cache hit: %s", address_path.as_posix())
+        _FILE_CACHE[key] = address_path
+        _maybe_revalidate(chain_id, normalized_address)
+        return address_path
+
+    _CACHE_LOOKUPS.inc(cache="disk", result="miss")
+    address_path, payload = _populate_address_cache(chain_id, normalized_address, abi_name_hint)
+    _ABI_CACHE[key] = _compact_payload(payload)
+    if store is not None and store.has(chain_id, normalized_address):
+        address_path = _materialize_address_files(chain_id, normalized_address, store)
+    _FILE_CACHE[key] = address_path
+    return address_path
+
+
+def resolve_abi_by_address(
+    chain_id: int, address: str, abi_name_hint: str | None = None, *, lazy: bool = False
+) -> dict[str, Any]:
+    """Return the ``{"abi": [...]}`` payload for ``address``.
+
+    The payload is a plain dict decoded for this call from the cached JSON text.
+    With ``lazy=True`` the cached :class:`LazyAbiPayload` view is returned
+    instead, which decodes only the fragments that are accessed.
+    """
+    normalized_address = _normalize_address(address)
+    key = (chain_id, normalized_address)
+    payload = _ABI_CACHE.get(key)
+    if payload is not None:
+        _CACHE_LOOKUPS.inc(cache="memory", result="hit")
+        _maybe_revalidate(chain_id, normalized_address)
+        return payload if lazy else payload.to_dict()
+
+    _CACHE_LOOKUPS.inc(cache="memory", result="miss")
+    with _DISK_READ_SECONDS.time():
+        payload = _read_cached_payload(chain_id, normalized_address)
+    _CACHE_LOOKUPS.inc(cache="disk", result="hit" if payload is not None else "miss")
+    if payload is not None:
+        logger.info("ABI cache hit: %s chainId=%s", normalized_address, chain_id)
+        _maybe_revalidate(chain_id, normalized_address)
+    else:
+        _, payload = _populate_address_cache(chain_id, normalized_address, abi_name_hint)
+        payload = _compact_payload(payload)
     _ABI_CACHE[key] = payload
-    return payload
+    return payload if lazy else payload.to_dict()
+
+
+def _is_cached(chain_id: int, normalized_address: str) -> bool:
+    key = (chain_id, normalized_address)
+    if key in _ABI_CACHE or key in _FILE_CACHE or _address_abi_path(chain_id, normalized_address).exists():
+        return True
+    store = _abi_store()
+    return store is not None and store.has(chain_id, normalized_address)
+
+
+def import_abi(
+    chain_id: int,
+    address: str,
+    abi_payload: dict[str, Any],
+    *,
+    source: str,
+    abi_name_hint: str | None = None,
+) -> bool:
+    """Cache an ABI obtained elsewhere; return ``False`` if the address was already cached."""
+    normalized_address = _normalize_address(address)
+    with locked_file(_address_lock_path(chain_id, normalized_address)):
+        if _read_cached_payload(chain_id, normalized_address) is not None:
+            return False
+        _write_address_cache(
+            chain_id,
+            normalized_address,
+            abi_payload,
+            abi_target_address=normalized_address,
+            is_proxy=False,
+            implementation=None,
+            abi_name_hint=abi_name_hint,
+            source=source,
+        )
+    return True
+
+
+def resolve_abis_many(
+    chain_id: int,
+    addresses: list[str],
+    abi_name_hint: str | None = None,
+    max_workers: int = DEFAULT_BATCH_WORKERS,
+    *,
+    lazy: bool = False,
+) -> tuple[dict[str, dict[str, Any]], dict[str, Exception]]:
+    """Resolve many ABIs at once and return ``(abis, errors)`` keyed by address.
+
+    Cached addresses are served straight from disk; misses are fetched
+    concurrently through the shared rate limiter. A failing address is
+    reported in ``errors`` instead of aborting the batch. ``lazy`` is passed
+    on to :func:`resolve_abi_by_address`.
+    """
+
+    abis: dict[str, dict[str, Any]] = {}
+    errors: dict[str, Exception] = {}
+    misses: list[str] = []
+    for address in dict.fromkeys(addresses):
+        try:
+            normalized_address = _normalize_address(address)
+        except ValueError as exc:
+            errors[address] = exc
+            continue
+        if _is_cached(chain_id, normalized_address):
+            try:
+                abis[normalized_address] = resolve_abi_by_address(
+                    chain_id, normalized_address, abi_name_hint, lazy=lazy
+                )
+            except (OSError, ValueError) as exc:
+                errors[normalized_address] = exc
+        elif normalized_address not in abis and normalized_address not in misses:
+            misses.append(normalized_address)
+
+    if not misses:
+        return abis, errors
+
+    logger.info("Batch ABI resolve: %s cached, %s to fetch (chainId=%s)", len(abis), len(misses), chain_id)
+
+    def _resolve(address: str) -> tuple[str, dict[str, Any] | None, Exception | None]:
+        try:
+            return address, resolve_abi_by_address(chain_id, address, abi_name_hint, lazy=lazy), None
+        except Exception as exc:  # collected per address
+            return address, None, exc
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(misses)))) as executor:
+        for address, payload, error in executor.map(_resolve, misses):
+            if error is not None:
+                errors[address] = error
+            else:
+                abis[address] = payload
+    return abis, errors
+
+
+def _indexed_for(chain_id: int, address: str | None) -> SelectorIndex:
+    index = _selector_index(chain_id)
+    if address is None:
+        return index
+    normalized_address = _normalize_address(address)
+    if normalized_address not in index and _is_cached(chain_id, normalized_address):
+        # Entries cached before indexing existed are indexed on first lookup.
+        payload = resolve_abi_by_address(chain_id, normalized_address, lazy=True)
+        abi_sha256 = hashlib.sha256(_canonical_abi_json(payload).encode("utf-8")).hexdigest()
+        index.add_abi(normalized_address, payload["abi"], abi_sha256)
+    return index
+
+
+def lookup_function(chain_id: int, selector: str, address: str | None = None) -> dict[str, Any] | None:
+    """Return the function fragment for ``selector`` (or raw calldata).
+
+    With ``address`` the fragment from that contract's ABI wins; otherwise, or
+    when that ABI lacks the selector, any indexed ABI on the chain is used.
+    """
+    return _indexed_for(chain_id, address).lookup_function(selector, address)
+
+
+def lookup_event(chain_id: int, topic0: str, address: str | None = None) -> dict[str, Any] | None:
+    """Return the event fragment for a log's ``topic0``."""
+    return _indexed_for(chain_id, address).lookup_event(topic0, address)
+
+
+def cache_info() -> dict[str, dict[str, int | None]]:
+    """Return hit/miss/eviction counters and sizes of the in-process caches."""
+    return {
+        "abi": _ABI_CACHE.info(),
+        "file": _FILE_CACHE.info(),
+        "negative": _negative_cache().info(),
+    }
+
+
+def cache_clear() -> None:
+    """Empty the in-process caches (on-disk caches, including failures, are kept)."""
+    _ABI_CACHE.clear()
+    _FILE_CACHE.clear()
+    _REVALIDATE_DUE.clear()
 
 
 # Public API aliases requested in the spec.
@@ -0,0 +1,209 @@
+"""SQLite-backed ABI store that deduplicates ABI bodies by ``abiSha256``.
+
+The directory layout under ``abi/address/<chain>/`` writes an ABI file plus
+a ``.meta.json`` for every address, so proxies sharing one
+implementation repeat the same ABI many times. This store keeps one row per
+distinct ABI body and one metadata row per ``(chainId, address)``.
+
+Enable it for the resolver with ``GNOMAN_ABI_STORE=sqlite`` and import an
+existing cache with::
+
+    python -m gnomon.utils.abi_store migrate --root abi
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Iterator
+
+DEFAULT_STORE_NAME = "abi_store.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS abis (
+    sha256 TEXT PRIMARY KEY,
+    body TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS addresses (
+    chain_id INTEGER NOT NULL,
+    address TEXT NOT NULL,
+    abi_sha256 TEXT NOT NULL REFERENCES abis(sha256),
+    abi_target_address TEXT,
+    is_proxy INTEGER NOT NULL DEFAULT 0,
+    implementation TEXT,
+    abi_name_hint TEXT,
+    source TEXT,
+    fetched_at TEXT,
+    validated_at TEXT,
+    PRIMARY KEY (chain_id, address)
+);
+CREATE INDEX IF NOT EXISTS addresses_abi_sha256 ON addresses(abi_sha256);
+"""
+
+_META_COLUMNS = (
+    ("abiTargetAddress", "abi_target_address"),
+    ("isProxy", "is_proxy"),
+    ("implementation", "implementation"),
+    ("abiNameHint", "abi_name_hint"),
+    ("source", "source"),
+    ("fetchedAt", "fetched_at"),
+    ("validatedAt", "validated_at"),
+)
+
+
+class AbiStore:
+    """Address → metadata rows pointing at deduplicated ABI bodies."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(addresses)")}
+        if "validated_at" not in columns:  # stores created before revalidation support
+            self._conn.execute("ALTER TABLE addresses ADD COLUMN validated_at TEXT")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def put(self, chain_id: int, address: str, abi_json_canonical: str, metadata: dict[str, Any]) -> None:
+        """Store ``abi_json_canonical`` (once per hash) and the address metadata."""
+        row = [metadata.get(key) for key, _ in _META_COLUMNS]
+        row[1] = int(bool(row[1]))
+        with self._lock:
+            with self._conn:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO abis (sha256, body) VALUES (?, ?)",
+                    (metadata["abiSha256"], abi_json_canonical),
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO addresses (chain_id, address, abi_sha256, "
+                    + ", ".join(column for _, column in _META_COLUMNS)
+                    + ") VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (chain_id, address, metadata["abiSha256"], *row),
+                )
+
+    def mark_validated(self, chain_id: int, address: str, validated_at: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE addresses SET validated_at = ? WHERE chain_id = ? AND address = ?",
+                (validated_at, chain_id, address),
+            )
+
+    def get_metadata(self, chain_id: int, address: str) -> dict[str, Any] | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT abi_sha256, " + ", ".join(column for _, column in _META_COLUMNS)
+                + " FROM addresses WHERE chain_id = ? AND address = ?",
+                (chain_id, address),
+            ).fetchone()
+        if row is None:
+            return None
+        metadata = {"chainId": chain_id, "address": address}
+        for (key, _), value in zip(_META_COLUMNS, row[1:]):
+            metadata[key] = value
+        metadata["isProxy"] = bool(metadata["isProxy"])
+        metadata["abiSha256"] = row[0]
+        return metadata
+
+    def get_body(self, chain_id: int, address: str) -> str | None:
+        """Return the canonical ABI JSON stored for ``address``."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT abis.body FROM addresses JOIN abis ON abis.sha256 = addresses.abi_sha256 "
+                "WHERE addresses.chain_id = ? AND addresses.address = ?",
+                (chain_id, address),
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_payload(self, chain_id: int, address: str) -> dict[str, Any] | None:
+        body = self.get_body(chain_id, address)
+        return json.loads(body) if body is not None else None
+
+    def has(self, chain_id: int, address: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM addresses WHERE chain_id = ? AND address = ?", (chain_id, address)
+            ).fetchone()
+        return row is not None
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            addresses = self._conn.execute("SELECT COUNT(*) FROM addresses").fetchone()[0]
+            bodies = self._conn.execute("SELECT COUNT(*) FROM abis").fetchone()[0]
+        return {"addresses": addresses, "abis": bodies}
+
+
+def _iter_address_cache(address_root: Path) -> Iterator[tuple[int, Path, Path]]:
+    for chain_dir in sorted(Path(address_root).iterdir()):
+        if not chain_dir.is_dir() or not chain_dir.name.isdigit():
+            continue
+        for abi_path in sorted(chain_dir.glob("*.json")):
+            if abi_path.name.endswith(".meta.json"):
+                continue
+            yield int(chain_dir.name), abi_path, abi_path.with_name(f"{abi_path.stem}.meta.json")
+
+
+def migrate_directory(store: AbiStore, abi_root: Path, *, delete: bool = False) -> int:
+    """Import ``<abi_root>/address/<chain>/*.json`` (and metadata) into ``store``."""
+    from .abi_resolver import _abi_metadata, _canonical_abi_json, _read_abi_file
+
+    address_root = Path(abi_root) / "address"
+    if not address_root.exists():
+        return 0
+    migrated = 0
+    for chain_id, abi_path, meta_path in _iter_address_cache(address_root):
+        payload = _read_abi_file(abi_path)
+        canonical = _canonical_abi_json(payload)
+        metadata = None
+        if meta_path.exists():
+            with open(meta_path, encoding="utf-8") as handle:
+                metadata = json.load(handle)
+        if not metadata or metadata.get("abiSha256") is None:
+            metadata = _abi_metadata(
+                chain_id,
+                abi_path.stem,
+                canonical,
+                abi_target_address=abi_path.stem,
+                is_proxy=False,
+                implementation=None,
+                abi_name_hint=None,
+                source="migrated",
+            )
+        store.put(chain_id, abi_path.stem.lower(), canonical, metadata)
+        migrated += 1
+        if delete:
+            abi_path.unlink()
+            if meta_path.exists():
+                meta_path.unlink()
+    return migrated
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Manage the SQLite ABI store.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    migrate = subcommands.add_parser("migrate", help="Import the abi/address/<chain>/ directory layout")
+    migrate.add_argument("--root", type=Path, default=Path("abi"), help="ABI cache root (default: abi)")
+    migrate.add_argument("--db", type=Path, default=None, help=f"Store path (default: <root>/{DEFAULT_STORE_NAME})")
+    migrate.add_argument("--delete", action="store_true", help="Remove migrated json/meta files")
+    args = parser.parse_args(argv)
+
+    store = AbiStore(args.db or args.root / DEFAULT_STORE_NAME)
+    try:
+        migrated = migrate_directory(store, args.root, delete=args.delete)
+        stats = store.stats()
+    finally:
+        store.close()
+    print(f"[AbiStore] Migrated {migrated} addresses ({stats['abis']} distinct ABIs) into {store.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Warm the ABI cache from data GNOMAN already has on disk.
+
+Two sources are used before touching the network:
+
+* ``abi-cache/<chainId>/index.json`` and its ABI files, written by the
+  TypeScript resolver, are imported as-is.
+* ``.gnoman/safes.json`` lists every Safe with its modules, master copy and
+  transaction targets; whatever is still missing after the import is
+  batch-fetched through :func:`resolve_abis_many`. Owners and delegates are
+  skipped: they are usually EOAs, which have no ABI to fetch.
+
+Run it with ``python -m gnomon.utils.abi_warmup``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+from pathlib import Path
+from typing import Any, Iterable
+
+from . import abi_resolver
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SAFES_PATH = Path(".gnoman/safes.json")
+DEFAULT_TS_ABI_CACHE_ROOT = Path("abi-cache")
+
+NETWORK_CHAIN_IDS = {
+    "mainnet": 1,
+    "ethereum": 1,
+    "goerli": 5,
+    "optimism": 10,
+    "bsc": 56,
+    "gnosis": 100,
+    "polygon": 137,
+    "base": 8453,
+    "arbitrum": 42161,
+    "sepolia": 11155111,
+}
+
+
+def _is_address(value: Any) -> bool:
+    return isinstance(value, str) and value.startswith("0x") and len(value) == 42
+
+
+def addresses_from_safes(safes_path: Path, chain_id: int) -> list[str]:
+    """Collect Safe, module, master copy and tx target addresses for ``chain_id``."""
+    if not Path(safes_path).exists():
+        return []
+    with open(safes_path, encoding="utf-8") as handle:
+        data = json.load(handle)
+
+    collected: list[str] = []
+
+    def _add(values: Iterable[Any]) -> None:
+        for value in values:
+            if isinstance(value, dict):
+                value = value.get("address")
+            if _is_address(value):
+                collected.append(value.lower())
+
+    for safe in data.get("safes", []):
+        network = safe.get("network")
+        if network and NETWORK_CHAIN_IDS.get(str(network).lower(), chain_id) != chain_id:
+            continue
+        _add([safe.get("address"), safe.get("mastercopyAddress")])
+        _add(safe.get("modules") or [])
+        _add(tx.get("to") for tx in safe.get("transactions") or [])
+    return list(dict.fromkeys(collected))
+
+
+def import_ts_abi_cache(chain_id: int, root: Path = DEFAULT_TS_ABI_CACHE_ROOT) -> list[str]:
+    """Import ABIs from the TypeScript ``abi-cache`` layout; return the addresses added."""
+    chain_dir = Path(root) / str(chain_id)
+    index_path = chain_dir / "index.json"
+    if not index_path.exists():
+        return []
+    with open(index_path, encoding="utf-8") as handle:
+        index = json.load(handle)
+
+    imported = []
+    for address, entry in index.items():
+        abi_path = chain_dir / f"{address.lower()}.json"
+        if not _is_address(address) or not abi_path.exists():
+            continue
+        try:
+            payload = abi_resolver._read_abi_file(abi_path)
+        except ValueError as exc:
+            logger.warning("Skipping unreadable abi-cache entry %s: %s", abi_path, exc)
+            continue
+        if not payload.get("abi"):
+            continue
+        name = entry.get("contractName")
+        added = abi_resolver.import_abi(
+            chain_id,
+            address,
+            {"abi": payload["abi"]},
+            source=f"abi-cache:{entry.get('source') or 'unknown'}",
+            abi_name_hint=None if _is_address(name) else name,
+        )
+        if added:
+            imported.append(address.lower())
+    return imported
+
+
+def warm_abi_cache(
+    chain_id: int | None = None,
+    *,
+    safes_path: Path = DEFAULT_SAFES_PATH,
+    ts_cache_root: Path = DEFAULT_TS_ABI_CACHE_ROOT,
+    fetch_missing: bool = True,
+    max_workers: int = abi_resolver.DEFAULT_BATCH_WORKERS,
+) -> dict[str, Any]:
+    """Import local ABIs, then batch-fetch only what the Safes still need."""
+    chain_id = chain_id if chain_id is not None else abi_resolver.get_default_chain_id()
+    imported = import_ts_abi_cache(chain_id, ts_cache_root)
+    wanted = addresses_from_safes(safes_path, chain_id)
+    missing = [address for address in wanted if not abi_resolver._is_cached(chain_id, address)]
+
+    fetched: list[str] = []
+    errors: dict[str, str] = {}
+    if fetch_missing and missing:
+        abis, failures = abi_resolver.resolve_abis_many(chain_id, missing, max_workers=max_workers)
+        fetched = sorted(abis)
+        errors = {address: str(error) for address, error in failures.items()}
+
+    return {
+        "chainId": chain_id,
+        "imported": len(imported),
+        "wanted": len(wanted),
+        "alreadyCached": len(wanted) - len(missing),
+        "missing": len(missing),
+        "fetched": len(fetched),
+        "errors": errors,
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Warm the ABI cache before starting a node.")
+    parser.add_argument("--chain-id", type=int, default=None)
+    parser.add_argument("--safes", type=Path, default=DEFAULT_SAFES_PATH)
+    parser.add_argument("--abi-cache", type=Path, default=DEFAULT_TS_ABI_CACHE_ROOT)
+    parser.add_argument("--no-fetch", action="store_true", help="Only import ABIs already on disk")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="[AbiWarmup] %(message)s")
+    summary = warm_abi_cache(
+        args.chain_id,
+        safes_path=args.safes,
+        ts_cache_root=args.abi_cache,
+        fetch_missing=not args.no_fetch,
+    )
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Filesystem helpers shared by GNOMAN's on-disk stores."""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, BinaryIO, Iterator
+
+try:  # POSIX only; cross-process locking degrades to a no-op elsewhere
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+
+def fsync_directory(path: Path) -> None:
+    """Flush directory metadata so a completed rename survives a crash."""
+    if os.name == "nt":  # directories cannot be opened for fsync on Windows
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Write ``data`` to ``path`` via a temp file and ``os.replace``.
+
+    Readers observe either the previous content or the new one, never a
+    partially written file.
+    """
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
+    fsync_directory(path.parent)
+
+
+def atomic_write_json(path: Path, payload: Any, *, indent: int | None = 2) -> None:
+    atomic_write_bytes(path, json.dumps(payload, indent=indent).encode("utf-8"))
+
+
+@contextmanager
+def locked_file(path: Path) -> Iterator[BinaryIO]:
+    """Open ``path`` (creating it) and hold an exclusive advisory lock on it.
+
+    The lock coordinates processes on the same host. Where ``fcntl`` is not
+    available the file is opened without locking.
+    """
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a+b") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        try:
+            handle.seek(0)
+            yield handle
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,170 @@
+"""Lazily decoded ABI payloads.
+
+A cached ABI is kept as its JSON text. :class:`LazyAbiPayload` reads like
+the ``{"abi": [...]}`` mapping the resolver has always returned, but the ABI
+list only records where each fragment starts and ends in the text; a
+fragment is decoded the first time it is accessed and kept afterwards.
+Callers touching a handful of fragments of a large router or vault ABI
+never pay for the rest.
+
+The views are read-only ``Mapping``/``Sequence`` objects, not ``dict`` and
+``list``, so the resolver hands them out only on request (``lazy=True``);
+by default callers get :meth:`LazyAbiPayload.to_dict`, a plain dict decoded
+afresh so the cache only ever holds the text.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from collections.abc import Mapping, Sequence
+from typing import Any, Iterator
+
+# Strings (with escapes) and the structural characters between values.
+_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"|[\[\]{}:,]')
+_WHITESPACE = " \t\r\n"
+
+
+def _skip_whitespace(text: str, position: int) -> int:
+    while position < len(text) and text[position] in _WHITESPACE:
+        position += 1
+    return position
+
+
+def _scan_container(text: str, start: int) -> tuple[list[tuple[int, int]], list[str | None], int]:
+    """Split the array/object opening at ``start`` into top-level value spans.
+
+    Returns ``(spans, keys, end)`` where ``keys`` holds the decoded key of each
+    value for objects (``None`` for arrays) and ``end`` is the index just past
+    the closing bracket.
+    """
+    spans: list[tuple[int, int]] = []
+    keys: list[str | None] = []
+    is_object = text[start] == "{"
+    depth = 0
+    value_start = start + 1
+    key: str | None = None
+    for match in _TOKEN.finditer(text, start):
+        token = match.group()
+        if token in "[{":
+            depth += 1
+        elif token in "]}":
+            depth -= 1
+            if depth == 0:
+                if text[value_start:match.start()].strip(_WHITESPACE):
+                    spans.append((value_start, match.start()))
+                    keys.append(key)
+                return spans, keys, match.end()
+        elif depth == 1:
+            if token == ",":
+                spans.append((value_start, match.start()))
+                keys.append(key)
+                value_start, key = match.end(), None
+            elif token == ":":
+                value_start = match.end()
+            elif is_object and key is None and token.startswith('"'):
+                key = json.loads(token)
+    raise ValueError("Unterminated JSON container in ABI payload")
+
+
+class LazyAbi(Sequence):
+    """Read-only list of ABI fragments decoded on first access."""
+
+    __slots__ = ("_text", "_start", "_spans", "_fragments")
+
+    def __init__(self, text: str, start: int = 0):
+        self._text = text
+        self._start = start
+        self._spans: list[tuple[int, int]] | None = None
+        self._fragments: dict[int, dict[str, Any]] = {}
+
+    def _offsets(self) -> list[tuple[int, int]]:
+        if self._spans is None:
+            self._spans = _scan_container(self._text, self._start)[0]
+        return self._spans
+
+    def __len__(self) -> int:
+        return len(self._offsets())
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        spans = self._offsets()
+        if index < 0:
+            index += len(spans)
+        fragment = self._fragments.get(index)
+        if fragment is None:
+            start, end = spans[index]
+            fragment = self._fragments[index] = json.loads(self._text[start:end])
+        return fragment
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (LazyAbi, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"LazyAbi({len(self)} fragments, {len(self._fragments)} decoded)"
+
+    @property
+    def decoded(self) -> int:
+        """Number of fragments decoded so far."""
+        return len(self._fragments)
+
+
+class LazyAbiPayload(Mapping):
+    """``{"abi": [...]}`` mapping backed by the ABI's JSON text.
+
+    ``text`` may be a bare ABI array or an object with an ``"abi"`` key; any
+    other keys of the object are small and decoded eagerly.
+    """
+
+    __slots__ = ("text", "_canonical", "_items")
+
+    def __init__(self, text: str, *, canonical: bool = False):
+        self.text = text
+        self._canonical = canonical
+        start = _skip_whitespace(text, 0)
+        if text[start:start + 1] == "[":
+            self._items: dict[str, Any] = {"abi": LazyAbi(text, start)}
+            self._canonical = False
+            return
+        if text[start:start + 1] != "{":
+            raise ValueError("ABI payload must be a JSON array or object")
+        spans, keys, _ = _scan_container(text, start)
+        self._items = {}
+        for key, (value_start, value_end) in zip(keys, spans):
+            value_start = _skip_whitespace(text, value_start)
+            if key == "abi" and text[value_start:value_start + 1] == "[":
+                self._items[key] = LazyAbi(text, value_start)
+            else:
+                self._items[key] = json.loads(text[value_start:value_end])
+        if "abi" not in self._items:
+            raise ValueError("ABI payload has no 'abi' entry")
+
+    def __getitem__(self, key: str) -> Any:
+        return self._items[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __repr__(self) -> str:
+        return f"LazyAbiPayload({self._items!r})"
+
+    def to_dict(self) -> dict[str, Any]:
+        """Fully decoded copy as plain ``dict``/``list`` objects."""
+        decoded = json.loads(self.text)
+        return decoded if isinstance(decoded, dict) else {"abi": decoded}
+
+    def canonical_json(self) -> str:
+        """Canonical (sorted, minified) JSON of the payload, as used for ``abiSha256``."""
+        if self._canonical:
+            return self.text
+        return json.dumps(self.to_dict(), sort_keys=True, separators=(",", ":"))
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.text)
@@ -0,0 +1,284 @@
+"""Process-local counters and latency histograms for GNOMAN's hot paths.
+
+Instrumented modules declare their metrics once at import time::
+
+    _LOOKUPS = metrics.counter("gnoman_abi_cache_lookups_total", "ABI cache lookups", ("cache", "result"))
+    _LOOKUPS.inc(cache="memory", result="hit")
+
+    with _DISK_READ.time():
+        ...
+
+Collection is off by default: every ``inc``/``observe``/``time`` call then
+returns after one attribute check. Enable it with ``GNOMAN_METRICS=1`` (or
+:func:`enable`), and read the values with :func:`render_prometheus` or write
+them to the file named by ``GNOMAN_METRICS_FILE`` with :func:`write_file`.
+HTTP latency by endpoint comes from an observer hook in the ``requests`` shim,
+installed while metrics are enabled.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import threading
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, ContextManager, Iterable
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+
+from .fs import atomic_write_bytes
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_NOOP = nullcontext()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(pairs: Iterable[tuple[str, str]]) -> str:
+    rendered = ",".join(f'{name}="{_escape(str(value))}"' for name, value in pairs)
+    return f"{{{rendered}}}" if rendered else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, registry: "MetricsRegistry", name: str, help_text: str, labelnames: tuple[str, ...]):
+        self._registry = registry
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, Any]) -> tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args: Any):
+        super().__init__(*args)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        if not self._registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def _render(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(zip(self.labelnames, key))} {_format_value(v)}" for key, v in items]
+
+
+class _Timer:
+    __slots__ = ("_histogram", "_labels", "_start")
+
+    def __init__(self, histogram: "Histogram", labels: dict[str, Any]):
+        self._histogram = histogram
+        self._labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._histogram.observe(time.perf_counter() - self._start, **self._labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, *args: Any, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(*args)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [bucket counts..., sum, count]
+        self._values: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        if not self._registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def time(self, **labels: Any) -> ContextManager[Any]:
+        """Context manager observing the elapsed seconds of its block."""
+        if not self._registry.enabled:
+            return _NOOP
+        return _Timer(self, labels)
+
+    def count(self, **labels: Any) -> int:
+        with self._lock:
+            series = self._values.get(self._key(labels))
+            return int(series[-1]) if series else 0
+
+    def total(self, **labels: Any) -> float:
+        with self._lock:
+            series = self._values.get(self._key(labels))
+            return series[-2] if series else 0.0
+
+    def _clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def _render(self) -> list[str]:
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._values.items())
+        lines = []
+        for key, series in items:
+            labels = list(zip(self.labelnames, key))
+            for index, bound in enumerate((*self.buckets, math.inf)):
+                count = series[-1] if math.isinf(bound) else series[index]
+                le = _format_labels([*labels, ("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{le} {_format_value(count)}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {_format_value(series[-1])}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics plus the switch that turns collection on and off."""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> Any:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} is already registered differently")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(self, name, help_text, tuple(labelnames)))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(self, name, help_text, tuple(labelnames), buckets=buckets))
+
+    def get(self, name: str) -> _Metric | None:
+        return self._metrics.get(name)
+
+    def reset(self) -> None:
+        """Zero every metric (definitions are kept)."""
+        for metric in list(self._metrics.values()):
+            metric._clear()
+
+    def render_prometheus(self) -> str:
+        lines = []
+        for name in sorted(self._metrics):
+            metric = self._metrics[name]
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric._render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+_HTTP_LATENCY = REGISTRY.histogram(
+    "gnoman_http_request_seconds",
+    "HTTP request latency through the requests shim by endpoint",
+    ("endpoint", "status"),
+)
+
+
+def _endpoint(url: str) -> str:
+    parts = urlsplit(url)
+    params = dict(parse_qsl(parts.query))
+    if "module" in params or "action" in params:
+        return f"{params.get('module', '')}.{params.get('action', '')}"
+    return f"{parts.hostname or ''}{parts.path or '/'}"
+
+
+def _observe_http(method: str, url: str, status: int | None, seconds: float, cached: bool) -> None:
+    status_label = "cached" if cached else ("error" if status is None else f"{status // 100}xx")
+    _HTTP_LATENCY.observe(seconds, endpoint=_endpoint(url), status=status_label)
+
+
+def counter(name: str, help_text: str, labelnames: tuple[str, ...] = ()) -> Counter:
+    return REGISTRY.counter(name, help_text, labelnames)
+
+
+def histogram(
+    name: str, help_text: str, labelnames: tuple[str, ...] = (), buckets: Iterable[float] = DEFAULT_BUCKETS
+) -> Histogram:
+    return REGISTRY.histogram(name, help_text, labelnames, buckets)
+
+
+def enable() -> None:
+    REGISTRY.enabled = True
+    requests.add_observer(_observe_http)
+
+
+def disable() -> None:
+    REGISTRY.enabled = False
+    requests.remove_observer(_observe_http)
+
+
+def is_enabled() -> bool:
+    return REGISTRY.enabled
+
+
+def render_prometheus() -> str:
+    """Return every metric in the Prometheus text exposition format."""
+    return REGISTRY.render_prometheus()
+
+
+def write_file(path: Path | None = None) -> Path | None:
+    """Atomically write the Prometheus text to ``path`` or ``GNOMAN_METRICS_FILE``.
+
+    The file suits node_exporter's textfile collector. Returns the path
+    written, or ``None`` when metrics are disabled or no path is configured.
+    """
+    target = path or os.getenv("GNOMAN_METRICS_FILE")
+    if not REGISTRY.enabled or not target:
+        return None
+    atomic_write_bytes(Path(target), render_prometheus().encode("utf-8"))
+    return Path(target)
+
+
+if os.getenv("GNOMAN_METRICS", "").strip().lower() in ("1", "true", "yes", "on"):
+    enable()
@@ -0,0 +1,97 @@
+"""Persistent cache of failed ABI lookups with a TTL per failure class.
+
+Entries live in one JSON file next to the ABI cache. The file is re-read only
+when its mtime changes, so lookups in the common case cost a single ``stat``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from .fs import atomic_write_json
+
+NOT_VERIFIED = "not-verified"
+RATE_LIMITED = "rate-limited"
+NETWORK = "network"
+
+DEFAULT_TTLS = {
+    NOT_VERIFIED: 6 * 60 * 60,
+    RATE_LIMITED: 30,
+    NETWORK: 60,
+}
+
+
+def ttl_for(reason: str) -> float:
+    """TTL in seconds for ``reason``; override with ``GNOMAN_ABI_NEGATIVE_TTL_<REASON>``."""
+    env_name = "GNOMAN_ABI_NEGATIVE_TTL_" + reason.upper().replace("-", "_")
+    value = os.getenv(env_name)
+    return float(value) if value else float(DEFAULT_TTLS[reason])
+
+
+class NegativeCache:
+    """``(chainId, address)`` → recent failure, expiring per failure class."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._mtime: float | None = None
+        self._hits = 0
+
+    @staticmethod
+    def _key(chain_id: int, address: str) -> str:
+        return f"{chain_id}:{address}"
+
+    def _refresh(self) -> None:
+        try:
+            mtime = self.path.stat().st_mtime
+        except FileNotFoundError:
+            self._entries, self._mtime = {}, None
+            return
+        if mtime != self._mtime:
+            with open(self.path, encoding="utf-8") as handle:
+                self._entries = json.load(handle)
+            self._mtime = mtime
+
+    def lookup(self, chain_id: int, address: str) -> dict[str, Any] | None:
+        """Return the unexpired failure recorded for ``address``, if any."""
+        with self._lock:
+            self._refresh()
+            entry = self._entries.get(self._key(chain_id, address))
+            if entry is None or entry["expiresAt"] <= time.time():
+                return None
+            self._hits += 1
+            return entry
+
+    def record(self, chain_id: int, address: str, reason: str, message: str) -> None:
+        ttl = ttl_for(reason)
+        if ttl <= 0:
+            return
+        now = time.time()
+        with self._lock:
+            self._refresh()
+            self._entries = {key: entry for key, entry in self._entries.items() if entry["expiresAt"] > now}
+            self._entries[self._key(chain_id, address)] = {
+                "reason": reason,
+                "message": message,
+                "recordedAt": now,
+                "expiresAt": now + ttl,
+            }
+            atomic_write_json(self.path, self._entries)
+            self._mtime = self.path.stat().st_mtime
+
+    def discard(self, chain_id: int, address: str) -> None:
+        with self._lock:
+            self._refresh()
+            if self._entries.pop(self._key(chain_id, address), None) is not None:
+                atomic_write_json(self.path, self._entries)
+                self._mtime = self.path.stat().st_mtime
+
+    def info(self) -> dict[str, int]:
+        with self._lock:
+            return {"hits": self._hits, "entries": len(self._entries)}
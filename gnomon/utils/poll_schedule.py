@@ -0,0 +1,51 @@
+"""Adaptive polling intervals for the Etherscan trackers.
+
+:class:`AdaptiveInterval` starts at ``base`` seconds, doubles (``factor``)
+after every poll that found nothing new up to ``ceiling``, and snaps back to
+``base`` as soon as a poll finds activity. :meth:`AdaptiveInterval.next_delay`
+spreads the interval by ``±jitter`` so many Safes started together drift
+apart instead of hitting the shared rate budget in lockstep.
+"""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, field
+
+DEFAULT_BACKOFF_FACTOR = 2.0
+DEFAULT_JITTER = 0.2
+
+
+@dataclass
+class AdaptiveInterval:
+    """Exponential idle backoff between ``base`` and ``ceiling`` seconds."""
+
+    base: float
+    ceiling: float
+    factor: float = DEFAULT_BACKOFF_FACTOR
+    jitter: float = DEFAULT_JITTER
+    current: float = field(init=False)
+    idle_streak: int = field(default=0, init=False)
+
+    def __post_init__(self) -> None:
+        if self.base <= 0:
+            raise ValueError("base interval must be positive")
+        self.ceiling = max(self.ceiling, self.base)
+        self.current = self.base
+
+    def record(self, changed: bool) -> float:
+        """Update the interval after a poll and return it (without jitter)."""
+        if changed:
+            self.idle_streak = 0
+            self.current = self.base
+        else:
+            self.idle_streak += 1
+            self.current = min(self.ceiling, self.current * self.factor)
+        return self.current
+
+    def next_delay(self, rng: random.Random | None = None) -> float:
+        """Seconds until the next poll: the current interval with jitter applied."""
+        if not self.jitter:
+            return self.current
+        spread = (rng or random).uniform(-self.jitter, self.jitter)
+        return max(0.0, self.current * (1.0 + spread))
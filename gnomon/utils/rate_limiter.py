@@ -0,0 +1,146 @@
+"""Rate limiting shared by every GNOMAN component that calls Etherscan.
+
+:class:`RateLimiter` is a token bucket: it refills at ``rate`` tokens per
+second up to ``capacity`` (the burst size). Callers *reserve* tokens and then
+sleep for exactly the deficit, so there is no polling loop and waiters are
+served in arrival order. With ``state_path`` set, the bucket lives in a small
+locked file and every process on the host draws from the same budget.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from . import metrics
+from .fs import locked_file
+
+DEFAULT_RATE = 3.0
+DEFAULT_CAPACITY = 1.0
+
+_WAIT_SECONDS = metrics.histogram(
+    "gnoman_rate_limiter_wait_seconds", "Time callers were told to wait for a rate-limit token"
+)
+
+
+class RateLimiter:
+    """Token-bucket limiter with sync and async acquire paths."""
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE,
+        capacity: float = DEFAULT_CAPACITY,
+        *,
+        state_path: Path | None = None,
+    ):
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("rate and capacity must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.state_path = Path(state_path) if state_path else None
+        self._tokens = self.capacity
+        self._updated = time.time()
+        self._lock = threading.Lock()
+        self._acquired = 0
+        self._waits = 0
+        self._wait_seconds = 0.0
+        self._max_wait = 0.0
+
+    def _refill(self, tokens: float, updated: float, now: float) -> float:
+        return min(self.capacity, tokens + max(0.0, now - updated) * self.rate)
+
+    def _reserve_local(self, tokens: float, now: float) -> float:
+        self._tokens = self._refill(self._tokens, self._updated, now) - tokens
+        self._updated = now
+        return max(0.0, -self._tokens / self.rate)
+
+    def _reserve_shared(self, tokens: float) -> float:
+        with locked_file(self.state_path) as handle:
+            # Read the clock only once the lock is held: a process that queued
+            # for it must not stamp the bucket with an older time.
+            now = time.time()
+            raw = handle.read()
+            try:
+                state = json.loads(raw) if raw else {}
+            except ValueError:
+                state = {}
+            updated = float(state.get("updated", now))
+            available = self._refill(float(state.get("tokens", self.capacity)), updated, now)
+            available -= tokens
+            handle.seek(0)
+            handle.truncate()
+            state = {"tokens": available, "updated": max(updated, now)}
+            handle.write(json.dumps(state).encode("utf-8"))
+            handle.flush()
+        return max(0.0, -available / self.rate)
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Take ``tokens`` from the bucket and return how long to wait before using them."""
+        with self._lock:
+            if self.state_path is not None:
+                wait = self._reserve_shared(tokens)
+            else:
+                wait = self._reserve_local(tokens, time.time())
+            self._acquired += 1
+            if wait > 0:
+                self._waits += 1
+                self._wait_seconds += wait
+                self._max_wait = max(self._max_wait, wait)
+        _WAIT_SECONDS.observe(wait)
+        return wait
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Block until ``tokens`` are available; return the seconds waited."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens: float = 1.0) -> float:
+        """Await until ``tokens`` are available without blocking the event loop."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def stats(self) -> dict[str, Any]:
+        """Return acquire counts and the time callers spent waiting."""
+        with self._lock:
+            return {
+                "rate": self.rate,
+                "capacity": self.capacity,
+                "shared": self.state_path is not None,
+                "acquired": self._acquired,
+                "waits": self._waits,
+                "wait_seconds": self._wait_seconds,
+                "max_wait_seconds": self._max_wait,
+            }
+
+
+_SHARED_LIMITER: RateLimiter | None = None
+_SHARED_LIMITER_LOCK = threading.Lock()
+
+
+def etherscan_rate_limiter() -> RateLimiter:
+    """Return the process-wide Etherscan limiter configured from the environment.
+
+    ``ETHERSCAN_RATE_LIMIT`` sets calls per second, ``ETHERSCAN_RATE_BURST`` the
+    burst capacity and ``ETHERSCAN_RATE_STATE`` a state file shared between
+    processes.
+    """
+
+    global _SHARED_LIMITER
+    with _SHARED_LIMITER_LOCK:
+        if _SHARED_LIMITER is None:
+            state_path = os.getenv("ETHERSCAN_RATE_STATE")
+            _SHARED_LIMITER = RateLimiter(
+                rate=float(os.getenv("ETHERSCAN_RATE_LIMIT", DEFAULT_RATE)),
+                capacity=float(os.getenv("ETHERSCAN_RATE_BURST", DEFAULT_CAPACITY)),
+                state_path=Path(state_path) if state_path else None,
+            )
+        return _SHARED_LIMITER
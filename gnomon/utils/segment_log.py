@@ -0,0 +1,164 @@
+"""Append-only JSONL log split into rotating segments.
+
+Records are appended to an *active* segment. Once it reaches the configured
+record or byte limit it is fsynced and *sealed*: the manifest is atomically
+replaced to mark it immutable and to name the next active segment. A crash
+can therefore only ever lose a torn trailing line of the active segment,
+which is truncated when the store is reopened.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from .fs import atomic_write_json
+
+MANIFEST_NAME = "manifest.json"
+DEFAULT_SEGMENT_MAX_RECORDS = 10_000
+DEFAULT_SEGMENT_MAX_BYTES = 16 * 1024 * 1024
+
+
+def _segment_name(index: int) -> str:
+    return f"{index:08d}.jsonl"
+
+
+class SegmentedLogStore:
+    """Append-only record log stored as ``<root>/NNNNNNNN.jsonl`` segments."""
+
+    def __init__(
+        self,
+        root: Path,
+        *,
+        segment_max_records: int = DEFAULT_SEGMENT_MAX_RECORDS,
+        segment_max_bytes: int = DEFAULT_SEGMENT_MAX_BYTES,
+    ):
+        self.root = Path(root)
+        self.segment_max_records = segment_max_records
+        self.segment_max_bytes = segment_max_bytes
+        self._lock = threading.Lock()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._manifest = self._load_manifest()
+        self._active_records, self._active_bytes = self._recover_active()
+
+    # -- manifest -----------------------------------------------------------------
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.root / MANIFEST_NAME
+
+    def _load_manifest(self) -> dict[str, Any]:
+        if self.manifest_path.exists():
+            with open(self.manifest_path, encoding="utf-8") as handle:
+                return json.load(handle)
+        manifest = {"version": 1, "segments": [], "active": _segment_name(1)}
+        atomic_write_json(self.manifest_path, manifest)
+        return manifest
+
+    def _active_path(self) -> Path:
+        return self.root / self._manifest["active"]
+
+    def _recover_active(self) -> tuple[int, int]:
+        """Count rows in the active segment, truncating a torn trailing write."""
+        path = self._active_path()
+        if not path.exists():
+            return 0, 0
+        with open(path, "rb+") as handle:
+            data = handle.read()
+            end = data.rfind(b"\n") + 1
+            if end != len(data):
+                handle.truncate(end)
+        return data.count(b"\n", 0, end), end
+
+    # -- writing ------------------------------------------------------------------
+
+    def append(self, records: Iterable[dict[str, Any]]) -> int:
+        """Append ``records`` durably and return how many were written."""
+        written = 0
+        with self._lock:
+            handle = None
+            try:
+                for record in records:
+                    if handle is None:
+                        handle = open(self._active_path(), "ab")
+                    line = json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n"
+                    handle.write(line)
+                    self._active_records += 1
+                    self._active_bytes += len(line)
+                    written += 1
+                    if (
+                        self._active_records >= self.segment_max_records
+                        or self._active_bytes >= self.segment_max_bytes
+                    ):
+                        self._seal(handle)
+                        handle = None
+            finally:
+                if handle is not None:
+                    handle.flush()
+                    os.fsync(handle.fileno())
+                    handle.close()
+        return written
+
+    def _seal(self, handle) -> None:
+        handle.flush()
+        os.fsync(handle.fileno())
+        handle.close()
+        sealed_name = self._manifest["active"]
+        next_index = int(sealed_name.split(".", 1)[0]) + 1
+        manifest = {
+            **self._manifest,
+            "segments": [
+                *self._manifest["segments"],
+                {"name": sealed_name, "records": self._active_records, "bytes": self._active_bytes},
+            ],
+            "active": _segment_name(next_index),
+        }
+        atomic_write_json(self.manifest_path, manifest)
+        self._manifest = manifest
+        self._active_records = 0
+        self._active_bytes = 0
+
+    # -- reading ------------------------------------------------------------------
+
+    def segment_paths(self) -> list[Path]:
+        with self._lock:
+            names = [segment["name"] for segment in self._manifest["segments"]]
+            names.append(self._manifest["active"])
+        return [self.root / name for name in names]
+
+    def __len__(self) -> int:
+        with self._lock:
+            sealed = sum(segment["records"] for segment in self._manifest["segments"])
+            return sealed + self._active_records
+
+    @staticmethod
+    def _iter_segment(path: Path) -> Iterator[dict[str, Any]]:
+        if not path.exists():
+            return
+        with open(path, "rb") as handle:
+            for line in handle:
+                if line.endswith(b"\n"):
+                    yield json.loads(line)
+
+    def iter_records(self) -> Iterator[dict[str, Any]]:
+        """Stream every record oldest-first, one segment open at a time."""
+        for path in self.segment_paths():
+            yield from self._iter_segment(path)
+
+    def tail(self, count: int) -> list[dict[str, Any]]:
+        """Return the newest ``count`` records, reading only trailing segments."""
+        if count <= 0:
+            return []
+        collected: deque[list[dict[str, Any]]] = deque()
+        remaining = count
+        for path in reversed(self.segment_paths()):
+            rows = list(deque(self._iter_segment(path), maxlen=remaining))
+            collected.appendleft(rows)
+            remaining -= len(rows)
+            if remaining <= 0:
+                break
+        return [row for rows in collected for row in rows]
@@ -1,35 +1,450 @@
-"""Minimal requests-compatible shim built on urllib for GNOMAN."""
+"""Minimal requests-compatible shim built on http.client for GNOMAN.
+
+Requests go through a :class:`Session` that keeps HTTP/1.1 connections alive
+per host, so repeated Etherscan calls skip the TCP/TLS handshake. The
+module-level :func:`get` and :func:`post` reuse one default session per process.
+Sessions can also serve Etherscan GETs from an on-disk
+:class:`~requests.cache.ResponseCache`; the default session enables it when
+``GNOMAN_HTTP_CACHE_DIR`` is set.
+
+With ``stream=True`` the body is not read up front: :meth:`Response.iter_content`
+yields decoded chunks as they arrive and :class:`~requests.stream.JsonArrayStream`
+turns them into the elements of a reply's ``result`` array, one at a time.
+"""
 
 from __future__ import annotations
 
-import json
-from dataclasses import dataclass
-from urllib.error import HTTPError, URLError
-from urllib.request import Request, urlopen
+import gzip
+import http.client
+import json as _json  # ``post(json=...)`` shadows the module name
+import os
+import threading
+import time
+import zlib
+from typing import Any, Callable, Iterator, Mapping
+from urllib.error import HTTPError
+from urllib.parse import urlencode, urlsplit, urlunsplit
+
+from .cache import ResponseCache, cache_from_env
+from .stream import JsonArrayStream
+
+DEFAULT_HEADERS = {
+    "User-Agent": "gnoman/2.0",
+    "Accept": "application/json, */*",
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive",
+}
+DEFAULT_POOL_SIZE = 4
+DEFAULT_CHUNK_SIZE = 64 * 1024
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+# What a request on a keep-alive connection the server already closed fails with.
+_STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+# Called as ``observer(method, url, status, seconds, cached)`` after every
+# request; ``status`` is ``None`` when the request failed at the network level.
+Observer = Callable[[str, str, "int | None", float, bool], None]
+_OBSERVERS: list[Observer] = []
+
+
+def add_observer(observer: Observer) -> None:
+    """Register ``observer`` for every request made through any session."""
+    if observer not in _OBSERVERS:
+        _OBSERVERS.append(observer)
+
+
+def remove_observer(observer: Observer) -> None:
+    if observer in _OBSERVERS:
+        _OBSERVERS.remove(observer)
+
+
+def _notify(method: str, url: str, status: int | None, started: float, cached: bool) -> None:
+    elapsed = time.perf_counter() - started
+    for observer in list(_OBSERVERS):
+        observer(method, url, status, elapsed, cached)
+
+
+class _Decoder:
+    """Incremental counterpart of :func:`_decode_body`."""
+
+    def __init__(self, encoding: str | None):
+        encoding = (encoding or "").strip().lower()
+        self._raw_fallback = encoding == "deflate"
+        if encoding == "gzip":
+            self._zlib = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif encoding == "deflate":
+            self._zlib = zlib.decompressobj()
+        else:
+            self._zlib = None
+
+    def decode(self, data: bytes, limit: int) -> Iterator[bytes]:
+        """Yield ``data`` decoded in pieces of at most ``limit`` bytes."""
+        if self._zlib is None:
+            if data:
+                yield data
+            return
+        while data:
+            try:
+                decoded = self._zlib.decompress(data, limit)
+            except zlib.error:
+                if not self._raw_fallback:
+                    raise
+                # some servers send raw deflate without a zlib header
+                self._zlib, self._raw_fallback = zlib.decompressobj(-zlib.MAX_WBITS), False
+                continue
+            self._raw_fallback = False
+            data = self._zlib.unconsumed_tail
+            if decoded:
+                yield decoded
+
+    def flush(self) -> bytes:
+        return self._zlib.flush() if self._zlib is not None else b""
+
+
+class _BodyStream:
+    """An unread response body plus the hook that releases its connection."""
+
+    def __init__(
+        self,
+        http_response: http.client.HTTPResponse,
+        encoding: str | None,
+        on_close: Callable[[bool, "bytes | None"], None],
+        keep_body: bool = False,
+    ):
+        self._http_response = http_response
+        self._decoder = _Decoder(encoding)
+        self._on_close = on_close  # on_close(complete, body if keep_body and complete)
+        self._tee: list[bytes] | None = [] if keep_body else None
+        self._closed = False
+
+    def chunks(self, chunk_size: int) -> Iterator[bytes]:
+        complete = False
+        try:
+            while True:
+                data = self._http_response.read(chunk_size)
+                pieces = self._decoder.decode(data, chunk_size) if data else iter((self._decoder.flush(),))
+                for decoded in pieces:
+                    if not decoded:
+                        continue
+                    if self._tee is not None:
+                        self._tee.append(decoded)
+                    yield decoded
+                if not data:
+                    complete = True
+                    return
+        finally:
+            self.close(complete)
+
+    def close(self, complete: bool = False) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        body = b"".join(self._tee) if complete and self._tee is not None else None
+        self._on_close(complete, body)
 
 
-@dataclass
 class Response:
-    body: bytes
-    status_code: int
-    url: str
+    """HTTP response; with a body stream attached, the body is read on demand."""
+
+    def __init__(
+        self,
+        body: bytes | None,
+        status_code: int,
+        url: str,
+        headers: dict[str, str] | None = None,
+        stream: _BodyStream | None = None,
+    ):
+        self._body = body
+        self.status_code = status_code
+        self.url = url
+        self.headers = headers or {}
+        self._stream = stream
+        self._consumed = False
+
+    def __repr__(self) -> str:
+        return f"<Response [{self.status_code}] {self.url}>"
+
+    def __enter__(self) -> "Response":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def body(self) -> bytes:
+        if self._body is None:
+            if self._consumed:
+                raise RuntimeError("The response body was already consumed by iter_content()")
+            self._body = b"".join(self.iter_content())
+        return self._body
+
+    content = body
+
+    @property
+    def text(self) -> str:
+        return self.body.decode("utf-8")
+
+    def iter_content(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+        """Yield the decoded body in chunks, straight off the socket when streaming."""
+        if self._body is not None:
+            for start in range(0, len(self._body), chunk_size):
+                yield self._body[start : start + chunk_size]
+            return
+        if self._consumed:
+            raise RuntimeError("The response body was already consumed by iter_content()")
+        self._consumed = True
+        yield from self._stream.chunks(chunk_size)
+
+    def iter_json_items(self, key: str = "result", chunk_size: int = DEFAULT_CHUNK_SIZE) -> JsonArrayStream:
+        """Stream the elements of the JSON array under ``key`` (see :class:`JsonArrayStream`)."""
+        return JsonArrayStream(self.iter_content(chunk_size), key)
+
+    def close(self) -> None:
+        """Release the connection; an unread streamed body is discarded."""
+        if self._stream is not None:
+            self._stream.close()
 
     def raise_for_status(self) -> None:
         if 400 <= self.status_code:
             raise HTTPError(self.url, self.status_code, "HTTP Error", hdrs=None, fp=None)
 
     def json(self):
-        return json.loads(self.body.decode("utf-8"))
-
-
-def get(url: str, timeout: int = 10) -> Response:
-    request = Request(url)
-    try:
-        with urlopen(request, timeout=timeout) as http_response:
-            body = http_response.read()
-            status = getattr(http_response, "status", 200)
-    except HTTPError as exc:
-        raise HTTPError(url, exc.code, exc.reason, exc.hdrs, exc.fp) from exc
-    except URLError as exc:
-        raise ConnectionError(str(exc)) from exc
-    return Response(body=body, status_code=status, url=url)
+        return _json.loads(self.body.decode("utf-8"))
+
+
+def _encode_url(url: str, params: Mapping[str, Any] | None) -> str:
+    if not params:
+        return url
+    pairs = [(key, value) for key, value in params.items() if value is not None]
+    if not pairs:
+        return url
+    scheme, netloc, path, query, fragment = urlsplit(url)
+    encoded = urlencode(pairs, doseq=True)
+    query = f"{query}&{encoded}" if query else encoded
+    return urlunsplit((scheme, netloc, path, query, fragment))
+
+
+def _decode_body(body: bytes, encoding: str | None) -> bytes:
+    encoding = (encoding or "").strip().lower()
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    if encoding == "deflate":
+        try:
+            return zlib.decompress(body)
+        except zlib.error:  # some servers send raw deflate without a zlib header
+            return zlib.decompress(body, -zlib.MAX_WBITS)
+    return body
+
+
+class Session:
+    """Connection-pooling HTTP session with persistent HTTP/1.1 connections."""
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE, cache: ResponseCache | None = None):
+        self.pool_size = pool_size
+        self.cache = cache
+        self.headers: dict[str, str] = dict(DEFAULT_HEADERS)
+        self._pools: dict[tuple[str, str, int], list[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "Session":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            pools, self._pools = self._pools, {}
+        for connections in pools.values():
+            for connection in connections:
+                connection.close()
+
+    def _checkout(self, key: tuple[str, str, int], timeout: float) -> tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            idle = self._pools.get(key)
+            connection = idle.pop() if idle else None
+        if connection is not None:
+            connection.timeout = timeout
+            if connection.sock is not None:
+                connection.sock.settimeout(timeout)
+            return connection, True
+        scheme, host, port = key
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=timeout), False
+        return http.client.HTTPConnection(host, port, timeout=timeout), False
+
+    def _checkin(self, key: tuple[str, str, int], connection: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._pools.setdefault(key, [])
+            if len(idle) < self.pool_size:
+                idle.append(connection)
+                return
+        connection.close()
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        params: Mapping[str, Any] | None = None,
+        data: bytes | None = None,
+        headers: Mapping[str, str] | None = None,
+        timeout: float = 10,
+        stream: bool = False,
+        idempotent: bool | None = None,
+        cache: bool = True,
+    ) -> Response:
+        """Send one request.
+
+        A request that fails on a reused pooled connection because the server
+        dropped it is resent once on a fresh connection, but only when it is
+        ``idempotent`` (by default: the method is in :data:`IDEMPOTENT_METHODS`).
+        ``cache=False`` always goes to the server; a cacheable reply still
+        replaces the cached one.
+        """
+        url = _encode_url(url, params)
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        started = time.perf_counter() if _OBSERVERS else 0.0
+        if method == "GET" and cache and self.cache is not None:
+            cached = self.cache.get(url)
+            if cached is not None:
+                status, cached_headers, body = cached
+                cached_headers = {**cached_headers, "x-gnoman-cache": "hit"}
+                if _OBSERVERS:
+                    _notify(method, url, status, started, True)
+                return Response(body=body, status_code=status, url=url, headers=cached_headers)
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL scheme: {url}")
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        key = (parts.scheme, parts.hostname or "", port)
+        target = parts.path or "/"
+        if parts.query:
+            target = f"{target}?{parts.query}"
+        merged_headers = {**self.headers, **(headers or {})}
+
+        while True:
+            connection, reused = self._checkout(key, timeout)
+            try:
+                connection.request(method, target, body=data, headers=merged_headers)
+                http_response = connection.getresponse()
+                body = None if stream else http_response.read()
+            except (OSError, http.client.HTTPException) as exc:
+                connection.close()
+                if reused and idempotent and isinstance(exc, _STALE_CONNECTION_ERRORS):
+                    # The server dropped the idle keep-alive connection; retry on a fresh one.
+                    continue
+                if _OBSERVERS:
+                    _notify(method, url, None, started, False)
+                raise ConnectionError(str(exc)) from exc
+            break
+
+        response_headers = {name.lower(): value for name, value in http_response.getheaders()}
+        if stream:
+            return self._streamed_response(method, url, key, connection, http_response, response_headers, started)
+
+        if http_response.will_close:
+            connection.close()
+        else:
+            self._checkin(key, connection)
+
+        body = _decode_body(body, response_headers.get("content-encoding"))
+        if method == "GET" and self.cache is not None:
+            self.cache.put(url, http_response.status, response_headers, body)
+        if _OBSERVERS:
+            _notify(method, url, http_response.status, started, False)
+        return Response(body=body, status_code=http_response.status, url=url, headers=response_headers)
+
+    def _streamed_response(
+        self,
+        method: str,
+        url: str,
+        key: tuple[str, str, int],
+        connection: http.client.HTTPConnection,
+        http_response: http.client.HTTPResponse,
+        response_headers: dict[str, str],
+        started: float,
+    ) -> Response:
+        def _on_close(complete: bool, body: bytes | None) -> None:
+            # Only a fully read body leaves the connection reusable.
+            if complete and not http_response.will_close:
+                self._checkin(key, connection)
+            else:
+                connection.close()
+            if body is not None:
+                self.cache.put(url, http_response.status, response_headers, body)
+            if _OBSERVERS:
+                _notify(method, url, http_response.status, started, False)
+
+        body_stream = _BodyStream(
+            http_response,
+            response_headers.get("content-encoding"),
+            _on_close,
+            # Cacheable replies are kept while streaming so they can be stored at the end.
+            keep_body=method == "GET" and self.cache is not None and self.cache.cacheable(url),
+        )
+        return Response(
+            body=None, status_code=http_response.status, url=url, headers=response_headers, stream=body_stream
+        )
+
+    def get(
+        self,
+        url: str,
+        params: Mapping[str, Any] | None = None,
+        timeout: float = 10,
+        headers: Mapping[str, str] | None = None,
+        stream: bool = False,
+        cache: bool = True,
+    ) -> Response:
+        return self.request("GET", url, params=params, headers=headers, timeout=timeout, stream=stream, cache=cache)
+
+    def post(
+        self,
+        url: str,
+        data: bytes | str | None = None,
+        json: Any = None,
+        timeout: float = 10,
+        headers: Mapping[str, str] | None = None,
+        idempotent: bool = False,
+    ) -> Response:
+        """POST ``data`` or, when ``json`` is given, its JSON encoding.
+
+        Pass ``idempotent=True`` for read-only calls (e.g. JSON-RPC ``eth_call``)
+        so a stale pooled connection is retried like a GET.
+        """
+        merged_headers = dict(headers or {})
+        if json is not None:
+            data = _json.dumps(json, separators=(",", ":"))
+            merged_headers.setdefault("Content-Type", "application/json")
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        return self.request(
+            "POST", url, data=data, headers=merged_headers, timeout=timeout, idempotent=idempotent
+        )
+
+
+_DEFAULT_SESSION: Session | None = None
+_DEFAULT_SESSION_PID: int | None = None
+_DEFAULT_SESSION_LOCK = threading.Lock()
+
+
+def default_session() -> Session:
+    """Return the process-wide session (re-created after ``fork``)."""
+    global _DEFAULT_SESSION, _DEFAULT_SESSION_PID
+    pid = os.getpid()
+    with _DEFAULT_SESSION_LOCK:
+        if _DEFAULT_SESSION is None or _DEFAULT_SESSION_PID != pid:
+            _DEFAULT_SESSION = Session(cache=cache_from_env())
+            _DEFAULT_SESSION_PID = pid
+        return _DEFAULT_SESSION
+
+
+def get(url: str, params: Mapping[str, Any] | None = None, timeout: float = 10, **kwargs: Any) -> Response:
+    return default_session().get(url, params=params, timeout=timeout, **kwargs)
+
+
+def post(url: str, data: bytes | str | None = None, json: Any = None, timeout: float = 10, **kwargs: Any) -> Response:
+    return default_session().post(url, data=data, json=json, timeout=timeout, **kwargs)
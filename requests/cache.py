@@ -0,0 +1,278 @@
+"""On-disk cache for idempotent Etherscan GET responses.
+
+Entries are keyed by the normalized URL: scheme and host are lower-cased,
+query parameters are sorted and the API key is removed. The key is therefore
+shared across restarts, tools and API keys. How long an entry lives depends
+on the ``(module, action)`` of the request:
+
+* verified ABIs (``getabi``) are kept for a day; ``getsourcecode``, which
+  ABI revalidation uses to notice proxy upgrades, is never cached;
+* account history (``txlist`` and friends) over a *closed* block range,
+  meaning a numeric ``endblock`` below the open-ended sentinel, is immutable
+  and kept until evicted once ``endblock`` is at least ``confirmations``
+  blocks below the known chain head; a closed range closer to the head (or
+  any closed range while the head is unknown) may still change through a
+  reorg and is kept for ``RECENT_RANGE_TTL`` seconds only;
+* everything else, including open ranges and Etherscan error replies, is
+  not cached.
+
+The head is learned from the replies passing through the cache (the highest
+block of any account-history reply, or ``proxy``/``eth_blockNumber``) and
+can be reported with :meth:`ResponseCache.observe_head`.
+
+The cache is bounded by total bytes and evicts least-recently-used entries.
+Enable it for the default session with ``GNOMAN_HTTP_CACHE_DIR``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Mapping
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+IMMUTABLE = float("inf")
+OPEN_RANGE_END = 99_999_999
+# Comfortably past Ethereum mainnet finality (two epochs, 64 blocks).
+DEFAULT_CONFIRMATIONS = 128
+RECENT_RANGE_TTL = 30.0
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+EVICT_TO = 0.9
+REDACTED_PARAMS = frozenset({"apikey", "api_key"})
+
+DEFAULT_TTLS: dict[tuple[str, str], float] = {
+    ("contract", "getabi"): 24 * 60 * 60,
+}
+RANGE_ACTIONS = frozenset({"txlist", "txlistinternal", "tokentx", "tokennfttx", "token1155tx", "getLogs"})
+
+
+def normalize_url(url: str) -> tuple[str, dict[str, str]]:
+    """Return ``(normalized_url, params)`` with API keys stripped and params sorted."""
+    scheme, netloc, path, query, _ = urlsplit(url)
+    params = {key: value for key, value in parse_qsl(query, keep_blank_values=True)}
+    kept = sorted((key, value) for key, value in params.items() if key.lower() not in REDACTED_PARAMS)
+    return urlunsplit((scheme.lower(), netloc.lower(), path or "/", urlencode(kept), "")), params
+
+
+def _closed_range_end(params: Mapping[str, str]) -> int | None:
+    """The numeric end block of a closed range, or ``None`` for an open one."""
+    end = params.get("endblock") or params.get("toBlock")
+    if end is None or not str(end).isdigit() or int(end) >= OPEN_RANGE_END:
+        return None
+    return int(end)
+
+
+def _parse_block(value: Any) -> int | None:
+    text = str(value or "")
+    try:
+        return int(text, 16) if text.startswith("0x") else int(text)
+    except ValueError:
+        return None
+
+
+def _is_error_reply(payload: Any) -> bool:
+    """Etherscan signals errors in a 200 reply: ``status`` "0" with a string result."""
+    return (
+        isinstance(payload, dict)
+        and str(payload.get("status")) == "0"
+        and isinstance(payload.get("result"), str)
+    )
+
+
+def _highest_block(params: Mapping[str, str], payload: Any) -> int | None:
+    """The highest block a reply proves to exist, if it says anything about the head."""
+    if not isinstance(payload, dict):
+        return None
+    result = payload.get("result")
+    if params.get("module") == "proxy" and params.get("action") == "eth_blockNumber":
+        return _parse_block(result)
+    if params.get("action") in RANGE_ACTIONS and isinstance(result, list):
+        blocks = [_parse_block(row.get("blockNumber")) for row in result if isinstance(row, dict)]
+        return max((block for block in blocks if block is not None), default=None)
+    return None
+
+
+class ResponseCache:
+    """Byte-bounded LRU cache of GET responses stored one file per entry."""
+
+    def __init__(
+        self,
+        root: Path,
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttls: Mapping[tuple[str, str], float] | None = None,
+        confirmations: int = DEFAULT_CONFIRMATIONS,
+    ):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.confirmations = confirmations
+        self.head: int | None = None
+        self._lock = threading.Lock()
+        self._bytes: int | None = None
+        self._hits = 0
+        self._misses = 0
+        self._stores = 0
+        self._evictions = 0
+
+    def ttl_for(self, params: Mapping[str, str]) -> float | None:
+        """Lifetime in seconds for a request with ``params``; ``None`` means do not cache."""
+        module, action = params.get("module", ""), params.get("action", "")
+        end = _closed_range_end(params) if action in RANGE_ACTIONS else None
+        if end is not None:
+            head = self.head
+            if head is not None and end <= head - self.confirmations:
+                return IMMUTABLE
+            return RECENT_RANGE_TTL
+        ttl = self.ttls.get((module, action))
+        return ttl if ttl and ttl > 0 else None
+
+    def observe_head(self, block: int) -> None:
+        """Record that the chain has reached ``block`` (the head never moves back)."""
+        with self._lock:
+            if self.head is None or block > self.head:
+                self.head = block
+
+    def cacheable(self, url: str) -> bool:
+        """Whether a reply to ``url`` would be stored (before looking at the reply)."""
+        return self.ttl_for(normalize_url(url)[1]) is not None
+
+    def _path(self, normalized: str) -> Path:
+        digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+        return self.root / digest[:2] / f"{digest}.bin"
+
+    def get(self, url: str) -> tuple[int, dict[str, str], bytes] | None:
+        """Return ``(status, headers, body)`` for a fresh entry, counting hits and misses."""
+        normalized, params = normalize_url(url)
+        if self.ttl_for(params) is None:
+            return None
+        path = self._path(normalized)
+        try:
+            with open(path, "rb") as handle:
+                header = json.loads(handle.readline())
+                body = handle.read()
+        except (OSError, ValueError):
+            header = None
+        if header is None or header["url"] != normalized or (
+            header["expiresAt"] is not None and header["expiresAt"] <= time.time()
+        ):
+            with self._lock:
+                self._misses += 1
+            return None
+        try:
+            os.utime(path)  # recency for LRU eviction
+        except OSError:
+            pass
+        with self._lock:
+            self._hits += 1
+        return header["status"], header["headers"], body
+
+    def put(self, url: str, status: int, headers: Mapping[str, str], body: bytes) -> bool:
+        """Store a response if its endpoint is cacheable and it is not an error reply."""
+        normalized, params = normalize_url(url)
+        ttl = self.ttl_for(params)
+        head_probe = params.get("module") == "proxy" and params.get("action") == "eth_blockNumber"
+        if status != 200 or (ttl is None and not head_probe):
+            return False
+        try:
+            payload = json.loads(body.decode("utf-8"))
+        except ValueError:
+            return False
+        block = _highest_block(params, payload)
+        if block is not None:
+            self.observe_head(block)
+            ttl = self.ttl_for(params)
+        if ttl is None or _is_error_reply(payload):
+            return False
+        header = {
+            "url": normalized,
+            "status": status,
+            "headers": {k: v for k, v in headers.items() if k not in ("content-encoding", "content-length")},
+            "storedAt": time.time(),
+            "expiresAt": None if ttl == IMMUTABLE else time.time() + ttl,
+        }
+        data = json.dumps(header, separators=(",", ":")).encode("utf-8") + b"\n" + body
+        path = self._path(normalized)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(data)
+            try:
+                previous = path.stat().st_size
+            except FileNotFoundError:
+                previous = 0
+            os.replace(tmp_name, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except FileNotFoundError:
+                pass
+            raise
+        with self._lock:
+            self._stores += 1
+            if self._bytes is not None:
+                self._bytes += len(data) - previous
+            self._evict()
+        return True
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        for path in self.root.glob("*/*.bin"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict(self) -> None:
+        if self._bytes is None:
+            self._bytes = sum(size for _, size, _ in self._entries())
+        if self._bytes <= self.max_bytes:
+            return
+        # Evict down to a low watermark so the next few stores skip the scan.
+        target = int(self.max_bytes * EVICT_TO)
+        for _, size, path in sorted(self._entries()):
+            if self._bytes <= target:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                continue
+            self._bytes -= size
+            self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            for _, _, path in self._entries():
+                path.unlink(missing_ok=True)
+            self._bytes = 0
+            self._hits = self._misses = self._stores = self._evictions = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            if self._bytes is None:
+                self._bytes = sum(size for _, size, _ in self._entries())
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "stores": self._stores,
+                "evictions": self._evictions,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+def cache_from_env() -> ResponseCache | None:
+    """Build the cache configured by ``GNOMAN_HTTP_CACHE_DIR`` / ``GNOMAN_HTTP_CACHE_MAX_BYTES``."""
+    root = os.getenv("GNOMAN_HTTP_CACHE_DIR")
+    if not root:
+        return None
+    max_bytes = os.getenv("GNOMAN_HTTP_CACHE_MAX_BYTES")
+    return ResponseCache(Path(root), max_bytes=int(max_bytes) if max_bytes else DEFAULT_MAX_BYTES)
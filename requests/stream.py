@@ -0,0 +1,178 @@
+"""Incremental decoding of JSON API replies that wrap one large array.
+
+Etherscan and JSON-RPC replies look like ``{"status": .., "result": [...]}``
+where only the array is large. :class:`JsonArrayStream` consumes the reply
+as byte chunks (e.g. :meth:`requests.Response.iter_content`) and yields the
+elements of the array under ``key`` one at a time, so peak memory follows
+the largest element rather than the whole reply. Every other top-level
+member is decoded normally and collected in :attr:`JsonArrayStream.fields`;
+when ``key`` is not an array (an error string, say) it lands there too.
+A reply whose top level is itself an array is streamed element by element.
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+import re
+from typing import Any, Iterable, Iterator
+
+_WHITESPACE = " \t\n\r"
+_DECODER = json.JSONDecoder()
+_STRUCTURAL = re.compile(r'["\[\]{}]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+_SCALAR_END = re.compile(r"[ \t\n\r,\]}]")
+
+
+class JsonArrayStream:
+    """Iterate the elements of ``reply[key]`` while the reply is still arriving."""
+
+    def __init__(self, chunks: Iterable[bytes], key: str = "result"):
+        self.key = key
+        self.fields: dict[str, Any] = {}
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self._started = False
+        # Progress of the end-of-value scan, relative to ``_pos`` so it survives refills.
+        self._scan = 0
+        self._depth = 0
+        self._in_string = False
+
+    # -- buffer -------------------------------------------------------------------
+
+    def _fill(self) -> bool:
+        """Append the next chunk to the buffer; ``False`` once the input is exhausted."""
+        if self._eof:
+            return False
+        if self._pos > 65536 and self._pos * 2 > len(self._buffer):
+            self._buffer = self._buffer[self._pos :]
+            self._pos = 0
+        for chunk in self._chunks:
+            text = self._utf8.decode(chunk)
+            if text:
+                self._buffer += text
+                return True
+        self._buffer += self._utf8.decode(b"", final=True)
+        self._eof = True
+        return False
+
+    def _peek(self) -> str:
+        """Skip whitespace and return the next character ('' at end of input)."""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, allowed: str) -> str:
+        char = self._peek()
+        if not char or char not in allowed:
+            raise json.JSONDecodeError(f"Expecting one of {allowed!r}", self._buffer, self._pos)
+        self._pos += 1
+        return char
+
+    def _value_end(self) -> int | None:
+        """Index just past the value at the cursor, or ``None`` if it is not all buffered yet.
+
+        The scan resumes where the previous call stopped, so a value spread
+        over many chunks is scanned once. A number (or literal) is complete
+        only at a delimiter or at end of input: ``1.`` may still become ``1.5e3``.
+        """
+        buffer = self._buffer
+        position = self._pos + self._scan
+        if buffer[self._pos] not in '[{"':
+            match = _SCALAR_END.search(buffer, position)
+            if match is not None:
+                return match.start()
+            if self._eof:
+                return len(buffer)
+            self._scan = len(buffer) - self._pos
+            return None
+        while True:
+            if self._in_string:
+                match = _STRING_SPECIAL.search(buffer, position)
+                if match is None:
+                    position = len(buffer)
+                    break
+                if match.group() == "\\":
+                    if match.end() == len(buffer):  # the escaped character is still to come
+                        position = match.start()
+                        break
+                    position = match.end() + 1
+                    continue
+                self._in_string = False
+                position = match.end()
+                if self._depth == 0:
+                    return position
+            else:
+                match = _STRUCTURAL.search(buffer, position)
+                if match is None:
+                    position = len(buffer)
+                    break
+                position = match.end()
+                if match.group() == '"':
+                    self._in_string = True
+                elif match.group() in "[{":
+                    self._depth += 1
+                else:
+                    self._depth -= 1
+                    if self._depth == 0:
+                        return position
+        self._scan = position - self._pos
+        return None
+
+    def _value(self) -> Any:
+        """Decode one complete JSON value at the cursor, reading more input as needed."""
+        if self._peek():
+            self._scan, self._depth, self._in_string = 0, 0, False
+            while self._value_end() is None and self._fill():
+                pass
+        value, end = _DECODER.raw_decode(self._buffer, self._pos)
+        self._pos = end
+        return value
+
+    # -- grammar ------------------------------------------------------------------
+
+    def _array(self) -> Iterator[Any]:
+        self._expect("[")
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self._value()
+            if self._expect(",]") == "]":
+                return
+
+    def __iter__(self) -> Iterator[Any]:
+        if self._started:
+            raise RuntimeError("JsonArrayStream can only be iterated once")
+        self._started = True
+        if self._peek() == "[":
+            yield from self._array()
+        else:
+            yield from self._object()
+        # Read to the end so the source (e.g. a pooled connection) sees EOF.
+        if self._peek():
+            raise json.JSONDecodeError("Extra data", self._buffer, self._pos)
+
+    def _object(self) -> Iterator[Any]:
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            name = self._value()
+            if not isinstance(name, str):
+                raise json.JSONDecodeError("Expecting property name", self._buffer, self._pos)
+            self._expect(":")
+            if name == self.key and self._peek() == "[":
+                yield from self._array()
+            else:
+                self.fields[name] = self._value()
+            if self._expect(",}") == "}":
+                return